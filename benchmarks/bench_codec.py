@@ -0,0 +1,126 @@
+"""
+Micro-benchmark: stdlib json vs orjson on realistic memory payloads.
+
+Times the three paths the codec sits on:
+
+- encode: an update request carrying a translated chapter
+- decode: a select response listing chapter rows
+- tool result: a glossary read serialized for the model, with and
+  without nulls/bookkeeping columns dropped
+
+Run with: python benchmarks/bench_codec.py [--number N]
+"""
+
+import argparse
+import random
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from backend.memory.codec import BOOKKEEPING_COLUMNS, OrjsonCodec, StdlibCodec, orjson
+
+WORDS_EN = "the strategy market customer price value growth team leader plan risk product".split()
+WORDS_ES = "la estrategia mercado cliente precio valor crecimiento equipo líder plan riesgo producto".split()
+
+
+def prose(words, count: int) -> str:
+    rng = random.Random(count)
+    sentences = []
+    for _ in range(count // 12):
+        sentence = " ".join(rng.choice(words) for _ in range(12))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+def chapter_row(number: int, words: int = 6000) -> dict:
+    """A chapter row roughly the size of a translated book chapter."""
+    return {
+        "id": str(uuid.uuid4()),
+        "project_id": str(uuid.uuid4()),
+        "chapter_number": number,
+        "title": f"Chapter {number}",
+        "status": "completed",
+        "original_text": prose(WORDS_EN, words),
+        "translated_text": prose(WORDS_ES, words),
+        "summary": prose(WORDS_EN, 120),
+        "sections": [f"Section {n}" for n in range(1, 8)],
+        "word_count": words,
+        "quality_score": 0.91,
+        "phase_1_complete": True,
+        "phase_2_complete": True,
+        "error_message": None,
+        "created_at": "2024-05-01T10:00:00.000000+00:00",
+        "updated_at": "2024-05-02T11:30:00.000000+00:00",
+    }
+
+
+def glossary(terms: int = 300) -> dict:
+    return {"glossary": [
+        {
+            "id": str(uuid.uuid4()),
+            "project_id": str(uuid.uuid4()),
+            "term_en": f"term {n}",
+            "term_es": f"término {n}",
+            "context": None if n % 3 else "Used in chapter headings",
+            "notes": None,
+            "created_at": "2024-05-01T10:00:00.000000+00:00",
+            "updated_at": "2024-05-01T10:00:00.000000+00:00",
+        }
+        for n in range(terms)
+    ]}
+
+
+def bench(label: str, fn, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<28} {seconds * 1e6:>10.1f} us")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory JSON codecs")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing run")
+    args = parser.parse_args()
+
+    codecs = [StdlibCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson is not installed; timing the stdlib codec only\n")
+
+    request = {"action": "update", "table": "chapters", "data": chapter_row(1), "filters": {"id.eq": "x"}}
+    response_body = StdlibCodec().encode({"success": True, "data": [chapter_row(n) for n in range(1, 6)]})
+    tool_result = glossary()
+
+    print(f"Request body: {len(StdlibCodec().encode(request)) / 1024:.0f} KiB, "
+          f"response body: {len(response_body) / 1024:.0f} KiB\n")
+
+    timings = {}
+    for codec in codecs:
+        print(f"{codec.name}:")
+        timings[codec.name] = [
+            bench("encode chapter update", lambda: codec.encode(request), args.number),
+            bench("decode chapter select", lambda: codec.decode(response_body), args.number),
+            bench("tool result", lambda: codec.dumps(tool_result), args.number),
+            bench("tool result (compact)", lambda: codec.dumps(
+                tool_result, drop_nulls=True, drop_columns=BOOKKEEPING_COLUMNS
+            ), args.number),
+        ]
+
+    full = len(StdlibCodec().dumps(tool_result))
+    compact = len(StdlibCodec().dumps(tool_result, drop_nulls=True, drop_columns=BOOKKEEPING_COLUMNS))
+    print(f"\nTool result size: {full} chars, {compact} compact ({100 * (1 - compact / full):.0f}% smaller)")
+
+    if "orjson" in timings:
+        speedups = ", ".join(
+            f"{label} {std / fast:.1f}x"
+            for label, std, fast in zip(("encode", "decode", "tool", "compact"), timings["stdlib"], timings["orjson"])
+        )
+        print(f"orjson speedup: {speedups}")
+
+
+if __name__ == "__main__":
+    main()
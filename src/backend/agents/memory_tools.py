@@ -7,19 +7,64 @@ These tools are given to each agent so they can:
 - Write their output to the database
 - Log decisions
 
-Each tool maps to a database operation via the Edge Function.
+Each tool maps to a database operation via the Edge Function. Handlers are
+registered against the definitions in MEMORY_TOOLS with @registry.tool(...),
+and tool input is checked against the tool's schema before dispatch (see
+tool_registry.py). execute_tools runs the tool calls of one model turn
+concurrently, keeping writes to the same table or row in their original
+order. Results over the agent's token budget are cut to fit, with a handle
+memory_read_result pages through (see result_budget.py).
 """
 
-from typing import Any, Dict, List, Optional
-import json
-from ..memory.client import db, AdminAPIError
+import atexit
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..config import config
+from ..memory.client import db, AdminAPIError, BulkInsertError
+from ..memory.codec import BOOKKEEPING_COLUMNS, codec
+from ..memory.protocol import CONTEXT_PARTS
+from ..memory.log_buffer import get_log_sink
+from ..memory.mutations import patch_chapter
+from ..memory.queries import CHAPTER_LIST_COLUMNS, CHAPTER_TEXT_COLUMNS, get_agent_context
+from .result_budget import ResultBudget
+from .tool_registry import ToolRegistry, row, tables
 
 
 # =============================================================================
 # TOOL DEFINITIONS (for Claude tool_use)
 # =============================================================================
 
-MEMORY_TOOLS = [
+# Read tools can return only some columns, and only part of long text, so
+# agents don't pull (and keep resending in the history) whole chapters
+FIELDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": "Optional: only return these columns, e.g. ['outline']"
+}
+OFFSET_PROPERTY = {
+    "type": "integer",
+    "description": "Optional: start reading the text at this character (use with length to read one section)"
+}
+LENGTH_PROPERTY = {
+    "type": "integer",
+    "description": "Optional: read at most this many characters from offset"
+}
+MAX_CHARS_PROPERTY = {
+    "type": "integer",
+    "description": "Optional: cut every text value to this many characters (at least 200). "
+                   "Cut values are listed in 'truncated' with their full length"
+}
+
+# Smallest max_chars honoured, so ids and short values are never cut
+MIN_MAX_CHARS = 200
+
+# Identity and version columns, never cut so later writes can refer to the row
+SLICE_EXCLUDED_COLUMNS = frozenset({"id", "project_id", "chapter_id"}) | BOOKKEEPING_COLUMNS
+
+MEMORY_TOOLS: List[Dict[str, Any]] = [
     {
         "name": "memory_read_project",
         "description": "Read project data including status, metadata, and configuration.",
@@ -29,42 +74,51 @@ MEMORY_TOOLS = [
                 "project_id": {
                     "type": "string",
                     "description": "The project ID (UUID)"
-                }
+                },
+                "fields": FIELDS_PROPERTY
             },
             "required": ["project_id"]
         }
     },
     {
         "name": "memory_read_chapter",
-        "description": "Read a chapter's data including content, analysis results, and status.",
+        "description": "Read a chapter's data including content, analysis results, and status. "
+                       "Chapters are large: pass fields to read only what you need, and "
+                       "offset/length to read part of a long text field.",
         "input_schema": {
             "type": "object",
             "properties": {
                 "chapter_id": {
                     "type": "string",
                     "description": "The chapter ID (UUID)"
-                }
+                },
+                "fields": FIELDS_PROPERTY,
+                "offset": OFFSET_PROPERTY,
+                "length": LENGTH_PROPERTY,
+                "max_chars": MAX_CHARS_PROPERTY
             },
             "required": ["chapter_id"]
         }
     },
     {
         "name": "memory_read_chapters",
-        "description": "Read all chapters for a project, ordered by chapter number.",
+        "description": "List all chapters for a project, ordered by chapter number. Returns status and metadata only; use memory_read_chapter for a chapter's content.",
         "input_schema": {
             "type": "object",
             "properties": {
                 "project_id": {
                     "type": "string",
                     "description": "The project ID (UUID)"
-                }
+                },
+                "fields": {**FIELDS_PROPERTY, "description": "Optional: columns to return instead of the default metadata"}
             },
             "required": ["project_id"]
         }
     },
     {
         "name": "memory_read_book_context",
-        "description": "Read book-level context like style guide, structure, or raw markdown.",
+        "description": "Read book-level context like style guide, structure, or raw markdown. "
+                       "raw_markdown is the whole manuscript: read it in ranges with offset/length.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -75,7 +129,10 @@ MEMORY_TOOLS = [
                 "key": {
                     "type": "string",
                     "description": "Context key: 'style_guide', 'structure', 'raw_markdown', 'spanish_style_guide', 'relationships'"
-                }
+                },
+                "offset": OFFSET_PROPERTY,
+                "length": LENGTH_PROPERTY,
+                "max_chars": MAX_CHARS_PROPERTY
             },
             "required": ["project_id", "key"]
         }
@@ -93,7 +150,9 @@ MEMORY_TOOLS = [
                 "chapter_id": {
                     "type": "string",
                     "description": "Optional: filter to specific chapter"
-                }
+                },
+                "fields": FIELDS_PROPERTY,
+                "max_chars": MAX_CHARS_PROPERTY
             },
             "required": ["project_id"]
         }
@@ -107,6 +166,36 @@ MEMORY_TOOLS = [
                 "project_id": {
                     "type": "string",
                     "description": "The project ID"
+                },
+                "fields": FIELDS_PROPERTY,
+                "max_chars": MAX_CHARS_PROPERTY
+            },
+            "required": ["project_id"]
+        }
+    },
+    {
+        "name": "memory_read_agent_context",
+        "description": "Read everything you need to start in one call: any of the project, the chapter, the chapter list, book context (style guide, structure...), glossary, tactics and cross references. Prefer this over several separate reads.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "The project ID"
+                },
+                "chapter_id": {
+                    "type": "string",
+                    "description": "Optional: the chapter you are working on (also narrows tactics and cross_refs to it)"
+                },
+                "parts": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(CONTEXT_PARTS)},
+                    "description": "Parts to read (default: all)"
+                },
+                "keys": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional: book context keys to include, e.g. ['style_guide', 'structure'] (default: all)"
                 }
             },
             "required": ["project_id"]
@@ -126,6 +215,26 @@ MEMORY_TOOLS = [
             "required": ["agent_name"]
         }
     },
+    {
+        "name": "memory_read_result",
+        "description": "Read more of a tool result that was cut to fit your result budget. "
+                       "Pass the result_id and next_offset from its 'continuation'. A field "
+                       "listed in 'field_parts' was split; join its parts in order.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "result_id": {
+                    "type": "string",
+                    "description": "The result_id from the continuation"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Where to continue: next_offset from the continuation"
+                }
+            },
+            "required": ["result_id", "offset"]
+        }
+    },
     {
         "name": "memory_write_chapter",
         "description": "Write/update chapter data. Use for analysis results, content, status updates.",
@@ -257,6 +366,11 @@ MEMORY_TOOLS = [
                 "chapter_id": {
                     "type": "string",
                     "description": "Optional: chapter ID if decision is chapter-specific"
+                },
+                "alternatives": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional: alternatives that were considered"
                 }
             },
             "required": ["project_id", "agent_name", "decision_type", "subject", "decision", "reasoning"]
@@ -321,6 +435,9 @@ MEMORY_TOOLS = [
 ]
 
 
+registry = ToolRegistry(MEMORY_TOOLS)
+
+
 # =============================================================================
 # TOOL IMPLEMENTATIONS
 # =============================================================================
@@ -337,77 +454,176 @@ def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> str:
     Returns:
         JSON string with the result
     """
+    tool = registry.get(tool_name)
+    if tool is None:
+        return _result({"error": f"Unknown tool: {tool_name}"})
+    problems = tool.validate(tool_input)
+    if problems:
+        return _result({"error": f"Invalid input for {tool_name}", "problems": problems})
     try:
-        if tool_name == "memory_read_project":
-            return _read_project(tool_input["project_id"])
+        result = tool(tool_input)
+    except AdminAPIError as e:
+        return _result({"error": f"Database error: {e.message}"})
+    except Exception as e:
+        return _result({"error": f"Tool error: {str(e)}"})
+    budget = _result_budget.get()
+    return budget.fit(result) if budget is not None else result
 
-        elif tool_name == "memory_read_chapter":
-            return _read_chapter(tool_input["chapter_id"])
 
-        elif tool_name == "memory_read_chapters":
-            return _read_chapters(tool_input["project_id"])
+# Long-lived pools tool calls run on, by size. Their threads outlive a turn,
+# so calls keep reusing the memory client's pooled connections.
+_tool_pools: Dict[int, ThreadPoolExecutor] = {}
+_tool_pools_lock = threading.Lock()
 
-        elif tool_name == "memory_read_book_context":
-            return _read_book_context(tool_input["project_id"], tool_input["key"])
 
-        elif tool_name == "memory_read_tactics":
-            return _read_tactics(
-                tool_input["project_id"],
-                tool_input.get("chapter_id")
+def _tool_pool(max_workers: int) -> ThreadPoolExecutor:
+    with _tool_pools_lock:
+        pool = _tool_pools.get(max_workers)
+        if pool is None:
+            pool = _tool_pools[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="memory-tool"
             )
+        return pool
 
-        elif tool_name == "memory_read_glossary":
-            return _read_glossary(tool_input["project_id"])
 
-        elif tool_name == "memory_read_learnings":
-            return _read_learnings(tool_input["agent_name"])
+@atexit.register
+def _shutdown_tool_pools() -> None:
+    with _tool_pools_lock:
+        pools = list(_tool_pools.values())
+        _tool_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
 
-        elif tool_name == "memory_write_chapter":
-            return _write_chapter(tool_input["chapter_id"], tool_input["data"])
 
-        elif tool_name == "memory_write_book_context":
-            return _write_book_context(
-                tool_input["project_id"],
-                tool_input["key"],
-                tool_input["value"]
-            )
+def execute_tools(calls: Sequence[Tuple[str, Dict[str, Any]]], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Execute the tool calls of one model turn, concurrently where they don't conflict.
 
-        elif tool_name == "memory_write_tactic":
-            return _write_tactic(
-                tool_input["project_id"],
-                tool_input["chapter_id"],
-                tool_input["tactic"]
-            )
+    A call waits for the earlier calls that touch the same table or row when
+    either of them writes it (see ToolRegistry.dependencies), so reads run in
+    parallel and writes land in the order the model made them.
 
-        elif tool_name == "memory_write_tactics_batch":
-            return _write_tactics_batch(tool_input["tactics"])
+    Args:
+        calls: (tool name, tool input) pairs in the order the model made them
+        max_workers: Size of the shared pool calls run on (default
+            AGENT_TOOL_PARALLELISM); 1 runs them inline
 
-        elif tool_name == "memory_write_glossary_term":
-            return _write_glossary_term(
-                tool_input["project_id"],
-                tool_input["term"]
-            )
+    Returns:
+        JSON result strings, in the order of calls
+    """
+    if max_workers is None:
+        max_workers = config.agent_tool_parallelism if config is not None else 1
+    if len(calls) <= 1 or max_workers <= 1:
+        return [execute_tool(name, tool_input) for name, tool_input in calls]
+
+    waits = registry.dependencies(calls)
+    futures: List[Future] = []
+
+    def run(i: int) -> str:
+        # Dependencies are earlier calls, submitted earlier to the same FIFO
+        # pool (also when other runs share it), so they are already running
+        # or done
+        for j in waits[i]:
+            futures[j].exception()
+        name, tool_input = calls[i]
+        return execute_tool(name, tool_input)
+
+    pool = _tool_pool(max_workers)
+    for i in range(len(calls)):
+        # Each call gets the turn's context: chapter versions, metrics attribution
+        futures.append(pool.submit(copy_context().run, run, i))
+    return [future.result() for future in futures]
+
+
+# Chapter rows as the current agent run last read or wrote them, by id.
+# Writes to a chapter the run has read are sent as patches against that
+# version (see backend/memory/delta.py), so an edit made by another agent in
+# the meantime makes the write fail instead of being overwritten.
+_chapter_versions: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "chapter_versions", default=None
+)
+
+
+# Size limit on the tool results of the current agent run, and the results
+# it cut (see result_budget.py)
+_result_budget: ContextVar[Optional[ResultBudget]] = ContextVar("result_budget", default=None)
+
+
+@contextmanager
+def tool_session(result_tokens: Optional[int] = None) -> Iterator[Optional[ResultBudget]]:
+    """Scope the chapter versions tracked, and the result budget, for one agent run.
+
+    result_tokens caps the estimated tokens of each tool result (None or 0:
+    no limit). Yields the ResultBudget, if any.
+    """
+    budget = ResultBudget(result_tokens) if result_tokens else None
+    token = _chapter_versions.set({})
+    budget_token = _result_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _result_budget.reset(budget_token)
+        _chapter_versions.reset(token)
+
+
+def _remember_chapter(row: Dict[str, Any]) -> None:
+    versions = _chapter_versions.get()
+    if versions is None or not row.get("id") or not row.get("updated_at"):
+        return
+    # Text cut by a slice isn't what is stored, so edits can't be made against it
+    cut = row.get("truncated") or {}
+    row = {k: v for k, v in row.items() if k not in cut and k != "truncated"}
+    known = versions.get(row["id"])
+    if known is not None and known.get("updated_at") == row["updated_at"]:
+        # Another part of the same version
+        row = {**known, **row}
+    versions[row["id"]] = row
+
+
+def _read_options(
+    fields: Optional[List[str]] = None,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    text_columns: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Select options for a read tool's range arguments.
+
+    offset/length pick a range of the requested fields (text_columns if
+    none were requested, else every text column); max_chars caps it, or on
+    its own every text value. Ids and timestamps are never cut.
+    """
+    if max_chars is not None:
+        max_chars = max(max_chars, MIN_MAX_CHARS)
+    if offset is None and length is None and max_chars is None:
+        return {}
+    columns = [c for c in fields if c not in SLICE_EXCLUDED_COLUMNS] if fields else text_columns
+    if fields and not columns:
+        return {}
+    if offset is None and length is None:
+        text_slice: Dict[str, Any] = {"offset": 0, "length": max_chars}
+    else:
+        if length is None or (max_chars is not None and max_chars < length):
+            length = max_chars
+        text_slice = {"offset": max(offset or 0, 0), "length": length}
+    if columns:
+        text_slice["columns"] = columns
+    return {"slice": text_slice}
 
-        elif tool_name == "memory_log_decision":
-            return _log_decision(tool_input)
 
-        elif tool_name == "memory_flag_issue":
-            return _flag_issue(tool_input)
+def _truncated(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Report values cut by a slice as 'truncated': {column: full length}."""
+    lengths = row.pop("_lengths", None)
+    if lengths:
+        row["truncated"] = lengths
+    return row
 
-        elif tool_name == "memory_append_learnings":
-            return _append_learnings(
-                tool_input["agent_name"],
-                tool_input["learning"],
-                tool_input.get("context", "")
-            )
 
-        else:
-            return json.dumps({"error": f"Unknown tool: {tool_name}"})
-
-    except AdminAPIError as e:
-        return json.dumps({"error": f"Database error: {e.message}"})
-    except Exception as e:
-        return json.dumps({"error": f"Tool error: {str(e)}"})
+def _result(value: Any) -> str:
+    """Serialize a tool result compactly (TOOL_RESULT_COMPACT also drops nulls and timestamps)."""
+    if config is not None and config.tool_result_compact:
+        return codec.dumps(value, drop_nulls=True, drop_columns=BOOKKEEPING_COLUMNS)
+    return codec.dumps(value)
 
 
 # =============================================================================
@@ -415,48 +631,104 @@ def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> str:
 # =============================================================================
 
 
-def _read_project(project_id: str) -> str:
-    result = db.select_single("projects", filters={"id.eq": project_id})
-    return json.dumps(result if result else {"error": "Project not found"})
-
-
-def _read_chapter(chapter_id: str) -> str:
-    result = db.select_single("chapters", filters={"id.eq": chapter_id})
-    return json.dumps(result if result else {"error": "Chapter not found"})
-
-
-def _read_chapters(project_id: str) -> str:
+@registry.tool("memory_read_project", touches=row("projects", "project_id"))
+def _read_project(project_id: str, fields: Optional[List[str]] = None) -> str:
+    rows = db.select("projects", filters={"id.eq": project_id}, columns=fields)
+    return _result(rows[0] if rows else {"error": "Project not found"})
+
+
+@registry.tool("memory_read_chapter", touches=row("chapters", "chapter_id"))
+def _read_chapter(
+    chapter_id: str,
+    fields: Optional[List[str]] = None,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> str:
+    options = _read_options(fields, offset, length, max_chars, text_columns=CHAPTER_TEXT_COLUMNS)
+    # id and updated_at identify the version later writes are made against
+    columns = list(dict.fromkeys(["id", "updated_at", *fields])) if fields else None
+    rows = db.select("chapters", filters={"id.eq": chapter_id}, options=options, columns=columns)
+    if not rows:
+        return _result({"error": "Chapter not found"})
+    result = _truncated(rows[0])
+    _remember_chapter(result)
+    return _result(result)
+
+
+@registry.tool("memory_read_chapters", touches=tables("chapters"))
+def _read_chapters(project_id: str, fields: Optional[List[str]] = None) -> str:
     result = db.select(
         "chapters",
         filters={"project_id.eq": project_id},
-        options={"order": {"column": "chapter_number", "ascending": True}}
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=list(dict.fromkeys(["id", *fields])) if fields else CHAPTER_LIST_COLUMNS
     )
-    return json.dumps({"chapters": result})
-
-
-def _read_book_context(project_id: str, key: str) -> str:
-    result = db.select_single(
+    return _result({"chapters": result})
+
+
+@registry.tool("memory_read_book_context", touches=row("book_context", "project_id", "key"))
+def _read_book_context(
+    project_id: str,
+    key: str,
+    offset: Optional[int] = None,
+    length: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> str:
+    rows = db.select(
         "book_context",
-        filters={"project_id.eq": project_id, "key.eq": key}
+        filters={"project_id.eq": project_id, "key.eq": key},
+        options=_read_options(["value"], offset, length, max_chars),
+        columns=["value"]
     )
-    if result:
-        return json.dumps({"key": key, "value": result.get("value")})
-    return json.dumps({"key": key, "value": None})
-
-
-def _read_tactics(project_id: str, chapter_id: Optional[str] = None) -> str:
+    if rows:
+        return _result(_truncated({"key": key, **rows[0]}))
+    return _result({"key": key, "value": None})
+
+
+@registry.tool("memory_read_tactics", touches=tables("tactics"))
+def _read_tactics(
+    project_id: str,
+    chapter_id: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    max_chars: Optional[int] = None
+) -> str:
     filters = {"project_id.eq": project_id}
     if chapter_id:
         filters["chapter_id.eq"] = chapter_id
-    result = db.select("tactics", filters=filters)
-    return json.dumps({"tactics": result})
+    result = db.select("tactics", filters=filters, options=_read_options(max_chars=max_chars), columns=fields)
+    return _result({"tactics": [_truncated(row) for row in result]})
+
+
+@registry.tool("memory_read_glossary", touches=tables("glossary"))
+def _read_glossary(
+    project_id: str,
+    fields: Optional[List[str]] = None,
+    max_chars: Optional[int] = None
+) -> str:
+    result = db.select(
+        "glossary",
+        filters={"project_id.eq": project_id},
+        options=_read_options(max_chars=max_chars),
+        columns=fields
+    )
+    return _result({"glossary": [_truncated(row) for row in result]})
 
 
-def _read_glossary(project_id: str) -> str:
-    result = db.select("glossary", filters={"project_id.eq": project_id})
-    return json.dumps({"glossary": result})
+@registry.tool("memory_read_agent_context", touches=tables("projects", "chapters", "book_context", "glossary", "tactics", "cross_refs"))
+def _read_agent_context(
+    project_id: str,
+    chapter_id: Optional[str] = None,
+    parts: Optional[List[str]] = None,
+    keys: Optional[List[str]] = None
+) -> str:
+    result = get_agent_context(project_id, chapter_id=chapter_id, parts=parts, keys=keys)
+    if result.get("chapter"):
+        _remember_chapter(result["chapter"])
+    return _result(result)
 
 
+@registry.tool("memory_read_learnings", touches=row("learnings", "agent_name"))
 def _read_learnings(agent_name: str) -> str:
     """Read learnings from filesystem."""
     from pathlib import Path
@@ -479,7 +751,15 @@ def _read_learnings(agent_name: str) -> str:
             "content": agent_path.read_text()
         })
 
-    return json.dumps({"learnings": learnings})
+    return _result({"learnings": learnings})
+
+
+@registry.tool("memory_read_result", touches=row("results", "result_id"))
+def _read_result(result_id: str, offset: int) -> str:
+    budget = _result_budget.get()
+    if budget is None:
+        return _result({"error": "No results were cut in this run"})
+    return _result(budget.expand(result_id, offset))
 
 
 # =============================================================================
@@ -487,87 +767,135 @@ def _read_learnings(agent_name: str) -> str:
 # =============================================================================
 
 
+@registry.tool("memory_write_chapter", touches=row("chapters", "chapter_id"), writes=True)
 def _write_chapter(chapter_id: str, data: Dict[str, Any]) -> str:
     from datetime import datetime
+
+    versions = _chapter_versions.get()
+    chapter = versions.get(chapter_id) if versions is not None else None
+    if chapter is not None:
+        try:
+            row = patch_chapter(chapter, data)
+        except AdminAPIError as e:
+            if e.code != "CONFLICT":
+                raise
+            versions.pop(chapter_id, None)
+            return _result({
+                "error": "Chapter was changed by another agent since you read it. "
+                         "Read it again with memory_read_chapter and reapply your changes.",
+                "conflict": True
+            })
+        if row is not None:
+            _remember_chapter(row)
+        else:
+            # Queued in the write journal: the new updated_at isn't known yet,
+            # so later writes go out as plain updates queued behind this one
+            versions.pop(chapter_id, None)
+        return _result({"success": True, "updated": 1})
+
     data["updated_at"] = datetime.utcnow().isoformat()
     result = db.update("chapters", data=data, filters={"id.eq": chapter_id})
-    return json.dumps({"success": True, "updated": len(result)})
+    return _result({"success": True, "updated": len(result)})
 
 
+@registry.tool("memory_write_book_context", touches=row("book_context", "project_id", "key"), writes=True)
 def _write_book_context(project_id: str, key: str, value: str) -> str:
     from datetime import datetime
 
-    # Check if exists
-    existing = db.select_single(
+    db.upsert(
         "book_context",
-        filters={"project_id.eq": project_id, "key.eq": key}
-    )
-
-    if existing:
-        db.update(
-            "book_context",
-            data={"value": value, "updated_at": datetime.utcnow().isoformat()},
-            filters={"project_id.eq": project_id, "key.eq": key}
-        )
-        return json.dumps({"success": True, "action": "updated"})
-    else:
-        db.insert("book_context", data={
+        data={
             "project_id": project_id,
             "key": key,
-            "value": value
-        })
-        return json.dumps({"success": True, "action": "created"})
+            "value": value,
+            "updated_at": datetime.utcnow().isoformat()
+        },
+        on_conflict="project_id,key"
+    )
+    return _result({"success": True, "action": "saved"})
 
 
+@registry.tool("memory_write_tactic", touches=tables("tactics"), writes=True)
 def _write_tactic(project_id: str, chapter_id: str, tactic: Dict[str, Any]) -> str:
     tactic["project_id"] = project_id
     tactic["chapter_id"] = chapter_id
     result = db.insert("tactics", data=tactic)
-    return json.dumps({"success": True, "tactic_id": result[0].get("id") if result else None})
+    return _result({"success": True, "tactic_id": result[0].get("id") if result else None})
 
 
+@registry.tool("memory_write_tactics_batch", touches=tables("tactics"), writes=True)
 def _write_tactics_batch(tactics: List[Dict[str, Any]]) -> str:
     if not tactics:
-        return json.dumps({"success": True, "count": 0})
-    result = db.insert("tactics", data=tactics)
-    return json.dumps({"success": True, "count": len(result) if isinstance(result, list) else 1})
+        return _result({"success": True, "count": 0})
+    try:
+        result = db.insert_many("tactics", tactics)
+    except BulkInsertError as e:
+        # Report which tactics landed so the agent only resends the rest
+        return _result({
+            "success": False,
+            "count": len(e.inserted),
+            "failed_indices": e.failed,
+            "error": f"Database error: {e.message}"
+        })
+    return _result({"success": True, "count": len(result)})
 
 
+@registry.tool("memory_write_glossary_term", touches=tables("glossary"), writes=True)
 def _write_glossary_term(project_id: str, term: Dict[str, Any]) -> str:
     term["project_id"] = project_id
     result = db.insert("glossary", data=term)
-    return json.dumps({"success": True, "term_id": result[0].get("id") if result else None})
-
-
-def _log_decision(data: Dict[str, Any]) -> str:
-    result = db.insert("decisions", data={
-        "project_id": data["project_id"],
-        "agent_name": data["agent_name"],
-        "decision_type": data["decision_type"],
-        "subject": data["subject"],
-        "decision": data["decision"],
-        "reasoning": data["reasoning"],
-        "confidence": data.get("confidence", "high"),
-        "chapter_id": data.get("chapter_id"),
-        "alternatives": data.get("alternatives", [])
+    return _result({"success": True, "term_id": result[0].get("id") if result else None})
+
+
+@registry.tool("memory_log_decision", touches=tables("decisions"), writes=True)
+def _log_decision(
+    project_id: str,
+    agent_name: str,
+    decision_type: str,
+    subject: str,
+    decision: str,
+    reasoning: str,
+    confidence: str = "high",
+    chapter_id: Optional[str] = None,
+    alternatives: Optional[List[str]] = None
+) -> str:
+    row = get_log_sink().append("decisions", {
+        "project_id": project_id,
+        "agent_name": agent_name,
+        "decision_type": decision_type,
+        "subject": subject,
+        "decision": decision,
+        "reasoning": reasoning,
+        "confidence": confidence,
+        "chapter_id": chapter_id,
+        "alternatives": alternatives or []
     })
-    return json.dumps({"success": True})
-
-
-def _flag_issue(data: Dict[str, Any]) -> str:
+    return _result({"success": True, "decision_id": row["id"]})
+
+
+@registry.tool("memory_flag_issue", touches=tables("issues"), writes=True)
+def _flag_issue(
+    chapter_id: str,
+    issue_type: str,
+    severity: str,
+    description: str,
+    location: str,
+    flagged_by: str
+) -> str:
     result = db.insert("issues", data={
-        "chapter_id": data["chapter_id"],
-        "issue_type": data["issue_type"],
-        "severity": data["severity"],
-        "description": data["description"],
-        "location": data["location"],
-        "flagged_by": data["flagged_by"],
+        "chapter_id": chapter_id,
+        "issue_type": issue_type,
+        "severity": severity,
+        "description": description,
+        "location": location,
+        "flagged_by": flagged_by,
         "status": "open"
     })
-    return json.dumps({"success": True, "issue_id": result[0].get("id") if result else None})
+    return _result({"success": True, "issue_id": result[0].get("id") if result else None})
 
 
-def _append_learnings(agent_name: str, learning: str, context: str) -> str:
+@registry.tool("memory_append_learnings", touches=row("learnings", "agent_name"), writes=True)
+def _append_learnings(agent_name: str, learning: str, context: str = "") -> str:
     """Append learning to filesystem."""
     from pathlib import Path
     from datetime import datetime
@@ -588,7 +916,11 @@ def _append_learnings(agent_name: str, learning: str, context: str) -> str:
         with open(learnings_path, "w") as f:
             f.write(f"# Learnings: {agent_name}\n{entry}")
 
-    return json.dumps({"success": True})
+    return _result({"success": True})
+
+
+# Every tool in MEMORY_TOOLS must have a handler
+registry.check()
 
 
 # =============================================================================
@@ -598,5 +930,8 @@ def _append_learnings(agent_name: str, learning: str, context: str) -> str:
 
 __all__ = [
     "MEMORY_TOOLS",
+    "registry",
     "execute_tool",
+    "execute_tools",
+    "tool_session",
 ]
@@ -0,0 +1,243 @@
+"""
+Result budget - caps the size of the tool results an agent sees.
+
+Every tool result goes back to the model and stays in the conversation, so
+one oversized read (the chapter list of a long book, a whole manuscript)
+can overflow the context window and fail the run. Agents that read such
+results can opt in to a budget (TOOL_RESULT_MAX_TOKENS, or a "Tool result
+budget" line in the prompt file): a result estimated at more than
+max_tokens is cut down to fit and the full result is kept for the rest of
+the agent run. Results are only cut between values, so every part is valid
+JSON:
+
+- a list result such as {"chapters": [...]} keeps as many items as fit
+  (an item over budget on its own keeps the fields that fit);
+- an object keeps as many of its top-level fields as fit, with the
+  estimated size of each field so the agent can re-read only the fields
+  it needs. A field over budget on its own (a chapter's text) is split
+  into parts, marked in "field_parts", that concatenate back to its value;
+- plain text is cut by characters.
+
+Either way the result carries a continuation handle,
+
+    "continuation": {"result_id": "r1", "next_offset": 40, "total": 212, "unit": "items"}
+
+and memory_read_result(result_id, offset) returns the next part, within the
+same budget.
+
+Tokens are estimated from the character count (CHARS_PER_TOKEN), which errs
+on the high side for JSON; no tokenizer is needed.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..memory.codec import codec
+
+# Conservative for JSON (punctuation, ids and non-English text tokenize densely)
+CHARS_PER_TOKEN = 3
+
+# Characters kept free for the continuation handle and field sizes
+ENVELOPE_CHARS = 600
+
+# Full results kept per agent run for memory_read_result
+MAX_SPILLED_RESULTS = 32
+
+# (field name, value or part of it, part index, number of parts, part of the value's JSON text)
+_Segment = Tuple[str, Any, int, int, bool]
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local estimate of the tokens in text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class ResultBudget:
+    """Fits tool results into max_tokens and keeps the full results for paging."""
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self.truncated = 0
+        # result_id -> (unit, key of the paged list or None, full value)
+        self._spilled: "OrderedDict[str, Tuple[str, Optional[str], Any]]" = OrderedDict()
+        self._next_id = 1
+        # Tool calls of one turn run in parallel (see execute_tools)
+        self._lock = threading.Lock()
+
+    @property
+    def max_chars(self) -> int:
+        return max(self.max_tokens * CHARS_PER_TOKEN - ENVELOPE_CHARS, ENVELOPE_CHARS)
+
+    def fit(self, result: str) -> str:
+        """Return result unchanged if it is within budget, else its first part."""
+        if estimate_tokens(result) <= self.max_tokens:
+            return result
+        try:
+            value = codec.decode(result)
+        except ValueError:
+            value = result
+        if isinstance(value, list):
+            value = {"items": value}
+        key = _list_key(value)
+        if key is not None:
+            spilled: Tuple[str, Optional[str], Any] = ("items", key, value)
+        elif isinstance(value, dict):
+            spilled = ("fields", None, self._segments(value))
+        else:
+            spilled = ("chars", None, value if isinstance(value, str) else result)
+        with self._lock:
+            result_id = f"r{self._next_id}"
+            self._next_id += 1
+            self._spilled[result_id] = spilled
+            while len(self._spilled) > MAX_SPILLED_RESULTS:
+                self._spilled.popitem(last=False)
+            self.truncated += 1
+        return codec.dumps(self._page(result_id, spilled, 0))
+
+    def expand(self, result_id: str, offset: int = 0) -> Dict[str, Any]:
+        """The part of a cut result starting at offset (items, fields or characters)."""
+        # Read once: a parallel fit() can evict the entry at any time
+        with self._lock:
+            spilled = self._spilled.get(result_id)
+        if spilled is None:
+            return {"error": f"Unknown or expired result_id: {result_id}. Repeat the original call instead."}
+        return self._page(result_id, spilled, max(offset, 0))
+
+    def _page(self, result_id: str, spilled: Tuple[str, Optional[str], Any], offset: int) -> Dict[str, Any]:
+        unit, key, value = spilled
+        if unit == "chars":
+            return self._text_page(result_id, value, offset)
+        if unit == "fields":
+            return self._field_page(result_id, value, offset)
+
+        items: List[Any] = value[key]
+        end, used = offset, 0
+        while end < len(items):
+            size = len(codec.dumps(items[end])) + 1
+            if used + size > self.max_chars:
+                break
+            used += size
+            end += 1
+
+        page: Dict[str, Any] = {k: v for k, v in value.items() if k != key}
+        if end == offset and offset < len(items):
+            # A single item over budget: show the fields that fit and move past it
+            item = items[offset]
+            if isinstance(item, dict):
+                kept, omitted = self._fitting_fields(item)
+                page[key] = [kept]
+                page["omitted_fields"] = omitted
+            else:
+                page[key] = []
+            page["hint"] = (f"Item {offset} alone is over the result budget; read it directly "
+                            "with fields or offset/length.")
+            end = offset + 1
+        else:
+            page[key] = items[offset:end]
+        page["continuation"] = self._continuation(result_id, end, len(items), "items")
+        return page
+
+    def _field_page(self, result_id: str, segments: List[_Segment], offset: int) -> Dict[str, Any]:
+        page: Dict[str, Any] = {}
+        parts: Dict[str, Dict[str, Any]] = {}
+        end, used = offset, 0
+        while end < len(segments):
+            name, piece, part, count, json_text = segments[end]
+            size = len(codec.dumps({name: piece}))
+            # Always show at least one segment; split fields never exceed the budget
+            if name in page or (end > offset and used + size > self.max_chars):
+                break
+            page[name] = piece
+            if count > 1:
+                parts[name] = {"part": part + 1, "parts": count}
+                if json_text:
+                    parts[name]["json_text"] = True
+            used += size
+            end += 1
+        if parts:
+            page["field_parts"] = parts
+        if offset == 0:
+            page["field_tokens"] = _segment_tokens(segments)
+        page["continuation"] = self._continuation(result_id, end, len(segments), "fields")
+        return page
+
+    def _text_page(self, result_id: str, text: str, offset: int) -> Dict[str, Any]:
+        end = min(offset + self.max_chars, len(text))
+        page: Dict[str, Any] = {"partial": text[offset:end]}
+        page["continuation"] = self._continuation(result_id, end, len(text), "chars")
+        return page
+
+    def _segments(self, value: Dict[str, Any]) -> List[_Segment]:
+        """Top-level fields of value, with fields over budget split into parts."""
+        segments: List[_Segment] = []
+        for name, field in value.items():
+            if len(codec.dumps({name: field})) <= self.max_chars:
+                segments.append((name, field, 0, 1, False))
+                continue
+            # Non-text values are split as their JSON text, marked json_text
+            text = field if isinstance(field, str) else codec.dumps(field)
+            pieces = _split_text(text, self.max_chars - len(codec.dumps(name)) - 3)
+            segments.extend((name, piece, n, len(pieces), not isinstance(field, str))
+                            for n, piece in enumerate(pieces))
+        return segments
+
+    def _fitting_fields(self, item: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """The fields of item that fit the budget, and the estimated tokens of the rest."""
+        kept: Dict[str, Any] = {}
+        omitted: Dict[str, int] = {}
+        used = 0
+        for name, field in item.items():
+            size = len(codec.dumps({name: field}))
+            if used + size <= self.max_chars:
+                kept[name] = field
+                used += size
+            else:
+                omitted[name] = estimate_tokens(codec.dumps(field))
+        return kept, omitted
+
+    def _continuation(self, result_id: str, next_offset: int, total: int, unit: str) -> Dict[str, Any]:
+        continuation: Dict[str, Any] = {"result_id": result_id, "total": total, "unit": unit}
+        if next_offset < total:
+            continuation["next_offset"] = next_offset
+            continuation["hint"] = "Result cut to fit the budget; call memory_read_result for more."
+        return continuation
+
+
+def _list_key(value: Any) -> Optional[str]:
+    """The key of the only list in a dict result, e.g. "chapters"."""
+    if not isinstance(value, dict):
+        return None
+    keys = [k for k, v in value.items() if isinstance(v, list)]
+    return keys[0] if len(keys) == 1 else None
+
+
+def _split_text(text: str, max_chars: int) -> List[str]:
+    """Split text into parts whose JSON encoding is at most max_chars, at line breaks where possible."""
+    pieces: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        # Escapes make the encoding longer; each extra character needs at
+        # least one fewer character of text
+        while end > start + 1:
+            excess = len(codec.dumps(text[start:end])) - max_chars
+            if excess <= 0:
+                break
+            end = max(end - excess, start + 1)
+        if end < len(text):
+            newline = text.rfind("\n", start, end)
+            if newline > start + (end - start) // 2:
+                end = newline + 1
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def _segment_tokens(segments: List[_Segment]) -> Dict[str, int]:
+    """Estimated tokens per top-level field."""
+    tokens: Dict[str, int] = {}
+    for name, piece, _, _, _ in segments:
+        tokens[name] = tokens.get(name, 0) + estimate_tokens(codec.dumps(piece))
+    return tokens
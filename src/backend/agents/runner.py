@@ -29,7 +29,8 @@ from typing import Any, Dict, List, Optional
 import anthropic
 
 from ..config import config
-from .memory_tools import MEMORY_TOOLS, execute_tool
+from ..memory.metrics import attribute_to
+from .memory_tools import MEMORY_TOOLS, execute_tools, tool_session
 
 
 # =============================================================================
@@ -50,6 +51,8 @@ class AgentDefinition:
     validation_checks: List[str]
     depends_on: List[str]
     prompt_file: str
+    # Per-agent override of TOOL_RESULT_MAX_TOKENS
+    tool_result_tokens: Optional[int] = None
 
 
 @dataclass
@@ -63,6 +66,9 @@ class AgentResult:
     input_tokens: int = 0
     output_tokens: int = 0
     tool_calls: int = 0
+    tool_results_truncated: int = 0
+    memory_requests: int = 0
+    memory_ms: int = 0
 
 
 # =============================================================================
@@ -133,6 +139,7 @@ def load_agent_definition(agent_name: str, phase: int) -> AgentDefinition:
         validation_checks=validation,
         depends_on=depends_on,
         prompt_file=str(prompt_file),
+        tool_result_tokens=_extract_result_budget(content),
     )
 
 
@@ -180,6 +187,15 @@ def _extract_saves_to(content: str) -> str:
     return ""
 
 
+def _extract_result_budget(content: str) -> Optional[int]:
+    """Extract the 'Tool result budget' (tokens), if the prompt sets one."""
+    for line in content.split("\n"):
+        if "**Tool result budget**:" in line:
+            value = line.split(":", 1)[1].strip()
+            return int(value) if value.isdigit() else None
+    return None
+
+
 def _extract_validation(content: str) -> List[str]:
     """Extract validation checks."""
     checks = []
@@ -252,6 +268,24 @@ class AgentRunner:
         Returns:
             AgentResult with success status and output
         """
+        result_tokens = agent_def.tool_result_tokens
+        if result_tokens is None:
+            result_tokens = config.tool_result_max_tokens
+        with attribute_to(agent=agent_def.name, chapter_id=chapter_id) as memory_io, \
+                tool_session(result_tokens) as budget:
+            result = self._run(agent_def, project_id, chapter_id, additional_context)
+        result.tool_results_truncated = budget.truncated if budget is not None else 0
+        result.memory_requests = memory_io.requests
+        result.memory_ms = int(memory_io.seconds * 1000)
+        return result
+
+    def _run(
+        self,
+        agent_def: AgentDefinition,
+        project_id: str,
+        chapter_id: Optional[str],
+        additional_context: Optional[str],
+    ) -> AgentResult:
         start_time = time.time()
         tool_calls = 0
         input_tokens = 0
@@ -306,17 +340,19 @@ class AgentRunner:
                 # Add assistant message
                 messages.append({"role": "assistant", "content": assistant_content})
 
-                # If there are tool calls, execute them
+                # If there are tool calls, execute them (concurrently where
+                # they don't conflict; results keep the order of the blocks)
                 tool_uses = [b for b in response.content if b.type == "tool_use"]
                 if tool_uses:
-                    tool_results = []
-                    for tool_use in tool_uses:
-                        result = execute_tool(tool_use.name, tool_use.input)
-                        tool_results.append({
+                    results = execute_tools([(b.name, b.input) for b in tool_uses])
+                    tool_results = [
+                        {
                             "type": "tool_result",
                             "tool_use_id": tool_use.id,
                             "content": result
-                        })
+                        }
+                        for tool_use, result in zip(tool_uses, results)
+                    ]
                     messages.append({"role": "user", "content": tool_results})
                 else:
                     # No more tool calls, agent is done
@@ -371,13 +407,15 @@ class AgentRunner:
 You have access to memory tools to read your input and write your output:
 
 READ TOOLS:
+- memory_read_agent_context: Read any of project, chapter, chapter list, book context, glossary, tactics and cross references in one call
 - memory_read_project: Read project data
-- memory_read_chapter: Read a chapter's data
-- memory_read_chapters: Read all chapters for a project
-- memory_read_book_context: Read book context (style_guide, structure, raw_markdown)
+- memory_read_chapter: Read a chapter's data (pass fields, and offset/length for long text, to read only what you need)
+- memory_read_chapters: List all chapters for a project (metadata only)
+- memory_read_book_context: Read book context (style_guide, structure, raw_markdown; read raw_markdown in ranges)
 - memory_read_tactics: Read tactics
 - memory_read_glossary: Read glossary
 - memory_read_learnings: Read your learnings files
+- memory_read_result: Read more of a result that was cut to fit your budget (see its "continuation")
 
 WRITE TOOLS:
 - memory_write_chapter: Update chapter data
@@ -395,7 +433,7 @@ WRITE TOOLS:
 
 ## Instructions
 1. FIRST, use memory_read_learnings to read your learnings file
-2. Then, use the appropriate read tools to get your input data
+2. Then, get your input data, preferably with a single memory_read_agent_context call
 3. Perform your task as described in your system prompt
 4. Use write tools to save your output to memory
 5. If you learn something valuable, use memory_append_learnings to save it
@@ -541,9 +579,9 @@ def main():
 
     print(f"\n{'='*50}")
     print(f"Success: {result.success}")
-    print(f"Duration: {result.duration_ms}ms")
+    print(f"Duration: {result.duration_ms}ms ({result.memory_ms}ms in {result.memory_requests} memory calls)")
     print(f"Tokens: {result.input_tokens} in, {result.output_tokens} out")
-    print(f"Tool calls: {result.tool_calls}")
+    print(f"Tool calls: {result.tool_calls} ({result.tool_results_truncated} results cut to the budget)")
 
     if result.success:
         print(f"\nOutput:\n{result.output}")
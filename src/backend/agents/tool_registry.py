@@ -0,0 +1,261 @@
+"""
+Tool registry - maps tool names to handlers and validates tool input.
+
+Tool definitions (name, description, JSON schema) are what the model sees;
+handlers are registered against them with a decorator:
+
+    registry = ToolRegistry(MEMORY_TOOLS)
+
+    @registry.tool("memory_read_project")
+    def _read_project(project_id: str) -> str:
+        ...
+
+    # A new tool can carry its definition with it
+    @registry.tool("memory_read_outline", "Read a chapter outline.", {
+        "type": "object",
+        "properties": {"chapter_id": {"type": "string"}},
+        "required": ["chapter_id"],
+    })
+    def _read_outline(chapter_id: str) -> str:
+        ...
+
+Each input schema is compiled into a validator once, when the tool is
+registered. Input that doesn't match comes back as a list of problems
+("chapter_id: required", "parts[0]: must be one of ...") the model can fix
+in one turn, instead of a KeyError from inside the handler. Handlers are
+called with the declared properties present in the input as keyword
+arguments.
+
+Only the JSON Schema keywords the tool definitions use are supported:
+type, properties, required, items, enum and additionalProperties (plus
+description, which is ignored). Anything else fails at registration.
+
+Tools also declare what they touch, so the calls of one model turn can run
+concurrently without reordering writes (see dependencies()):
+
+    @registry.tool("memory_write_chapter", touches=row("chapters", "chapter_id"), writes=True)
+
+A tool that declares nothing is assumed to touch everything.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# (value, path, problems) -> None; appends a message per problem found
+Validator = Callable[[Any, str, List[str]], None]
+
+# (table, row key); a row key of None means every row of the table, and a
+# table of "*" every table
+Resource = Tuple[str, Optional[str]]
+Touches = Callable[[Dict[str, Any]], List[Resource]]
+
+EVERYTHING: List[Resource] = [("*", None)]
+
+SUPPORTED_KEYWORDS = {"type", "properties", "required", "items", "enum", "additionalProperties", "description"}
+
+TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """Compile a JSON schema (the supported subset) into a validator function."""
+    unsupported = set(schema) - SUPPORTED_KEYWORDS
+    if unsupported:
+        raise ValueError(f"Unsupported schema keywords: {', '.join(sorted(unsupported))}")
+
+    checks: List[Validator] = []
+
+    expected = schema.get("type")
+    if expected is not None:
+        if expected not in TYPE_CHECKS:
+            raise ValueError(f"Unsupported schema type: {expected}")
+        is_type = TYPE_CHECKS[expected]
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        listed = ", ".join(map(repr, allowed))
+
+        def check_enum(value: Any, path: str, problems: List[str]) -> None:
+            if value not in allowed:
+                problems.append(f"{path or 'input'}: must be one of {listed}")
+        checks.append(check_enum)
+
+    if expected == "object":
+        properties = {name: compile_schema(sub) for name, sub in (schema.get("properties") or {}).items()}
+        required = list(schema.get("required") or [])
+        extra_allowed = schema.get("additionalProperties", True) is not False
+
+        def check_object(value: Dict[str, Any], path: str, problems: List[str]) -> None:
+            for name in required:
+                if name not in value:
+                    problems.append(f"{_join(path, name)}: required")
+            for name, item in value.items():
+                validate = properties.get(name)
+                if validate is not None:
+                    validate(item, _join(path, name), problems)
+                elif not extra_allowed:
+                    problems.append(f"{_join(path, name)}: unexpected property")
+        checks.append(check_object)
+
+    if expected == "array" and "items" in schema:
+        validate_item = compile_schema(schema["items"])
+
+        def check_items(value: List[Any], path: str, problems: List[str]) -> None:
+            for i, item in enumerate(value):
+                validate_item(item, f"{path}[{i}]", problems)
+        checks.append(check_items)
+
+    def validate(value: Any, path: str, problems: List[str]) -> None:
+        if expected is not None and not is_type(value):
+            problems.append(f"{path or 'input'}: expected {expected}, got {_type_name(value)}")
+            return
+        for check in checks:
+            check(value, path, problems)
+
+    return validate
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _type_name(value: Any) -> str:
+    for name, is_type in TYPE_CHECKS.items():
+        if name != "number" and is_type(value):
+            return name
+    return "number" if TYPE_CHECKS["number"](value) else type(value).__name__
+
+
+def tables(*names: str) -> Touches:
+    """Touches every row of the given tables."""
+    resources = [(name, None) for name in names]
+    return lambda tool_input: resources
+
+
+def row(table: str, *fields: str) -> Touches:
+    """Touches the row of table identified by the given input fields."""
+    def touches(tool_input: Dict[str, Any]) -> List[Resource]:
+        return [(table, ":".join(str(tool_input.get(f)) for f in fields))]
+    return touches
+
+
+def _overlap(a: Resource, b: Resource) -> bool:
+    if a[0] != b[0] and "*" not in (a[0], b[0]):
+        return False
+    return a[1] is None or b[1] is None or a[1] == b[1]
+
+
+@dataclass
+class Tool:
+    """A tool definition bound to its handler."""
+    name: str
+    definition: Dict[str, Any]
+    handler: Callable[..., str]
+    validator: Validator = field(repr=False)
+    parameters: List[str] = field(default_factory=list)
+    touches: Optional[Touches] = field(default=None, repr=False)
+    writes: bool = True
+
+    def resources(self, tool_input: Dict[str, Any]) -> List[Resource]:
+        """What a call with this input reads or writes."""
+        return self.touches(tool_input) if self.touches is not None else EVERYTHING
+
+    def validate(self, tool_input: Any) -> List[str]:
+        """Problems with tool_input, empty if it is valid."""
+        problems: List[str] = []
+        self.validator(tool_input, "", problems)
+        return problems
+
+    def __call__(self, tool_input: Dict[str, Any]) -> str:
+        return self.handler(**{name: tool_input[name] for name in self.parameters if name in tool_input})
+
+
+class ToolRegistry:
+    """Tool definitions and the handlers registered for them."""
+
+    def __init__(self, definitions: List[Dict[str, Any]]):
+        # Shared with the caller: tools registered with a definition are
+        # appended, so the list handed to the model stays complete
+        self.definitions = definitions
+        self._tools: Dict[str, Tool] = {}
+
+    def tool(
+        self,
+        name: str,
+        description: Optional[str] = None,
+        input_schema: Optional[Dict[str, Any]] = None,
+        touches: Optional[Touches] = None,
+        writes: bool = False
+    ) -> Callable[[Callable[..., str]], Callable[..., str]]:
+        """Decorator registering a handler for a tool.
+
+        Pass description and input_schema to define a new tool; otherwise
+        the definition must already be in the registry's definitions.
+        touches and writes say what a call reads or writes (see module
+        docstring); a tool without touches is ordered against every call.
+        """
+        def register(handler: Callable[..., str]) -> Callable[..., str]:
+            if name in self._tools:
+                raise ValueError(f"Tool already registered: {name}")
+            definition = next((d for d in self.definitions if d["name"] == name), None)
+            if input_schema is not None:
+                if definition is not None:
+                    raise ValueError(f"Tool already defined: {name}")
+                definition = {"name": name, "description": description or "", "input_schema": input_schema}
+                self.definitions.append(definition)
+            elif definition is None:
+                raise ValueError(f"No definition for tool: {name}")
+            schema = definition["input_schema"]
+            self._tools[name] = Tool(
+                name=name,
+                definition=definition,
+                handler=handler,
+                validator=compile_schema(schema),
+                parameters=list(schema.get("properties") or {}),
+                touches=touches,
+                writes=writes or touches is None,
+            )
+            return handler
+        return register
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def dependencies(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[List[int]]:
+        """For each (name, input) call, the earlier calls it must wait for.
+
+        Two calls are ordered when they touch the same resource and at least
+        one of them writes it; everything else may run concurrently.
+        """
+        touched: List[Tuple[bool, List[Resource]]] = []
+        for name, tool_input in calls:
+            tool = self._tools.get(name)
+            if tool is None or not isinstance(tool_input, dict):
+                # Fails fast without touching anything
+                touched.append((False, []))
+            else:
+                touched.append((tool.writes, tool.resources(tool_input)))
+
+        waits: List[List[int]] = []
+        for i, (writes, resources) in enumerate(touched):
+            waits.append([
+                j for j, (other_writes, other) in enumerate(touched[:i])
+                if (writes or other_writes) and any(_overlap(a, b) for a in resources for b in other)
+            ])
+        return waits
+
+    def check(self) -> None:
+        """Raise if a defined tool has no handler."""
+        missing = [d["name"] for d in self.definitions if d["name"] not in self._tools]
+        if missing:
+            raise RuntimeError(f"Tools without handlers: {', '.join(missing)}")
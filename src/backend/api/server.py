@@ -15,18 +15,21 @@ from typing import Dict, List, Optional, Any
 from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from ..config import config
 from ..memory.client import db, AdminAPIError
+from ..memory.metrics import metrics
 from ..memory.mutations import (
     update_project_status,
     log_pipeline_event,
 )
 from ..memory.queries import (
     get_project,
-    get_project_chapters,
+    count_chapters_by_status,
+    PROJECT_STATUS_COLUMNS,
 )
 from ..workflows.pipeline import (
     run_pipeline,
@@ -118,6 +121,13 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.on_event("startup")
+    def recover_write_journal():
+        # Writes journaled by a previous process go out before anything new;
+        # new writes queue behind them, so this needn't block startup
+        if db is not None and db.journal is not None:
+            threading.Thread(target=db.journal.recover, name="journal-recover", daemon=True).start()
+
     return app
 
 
@@ -247,13 +257,27 @@ def _run_phase_background(
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    cache_stats = db.cache_stats() if db is not None else None
+    flight_stats = db.flight_stats() if db is not None else None
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "config_loaded": config is not None,
+        "memory_cache": cache_stats.to_dict() if cache_stats else None,
+        "memory_flights": flight_stats.to_dict() if flight_stats else None,
+        "memory_compression": db.compression_stats().to_dict() if db is not None else None,
+        "memory_journal": db.journal.stats() if db is not None and db.journal is not None else None,
     }
 
 
+@app.get("/api/metrics/memory")
+async def memory_metrics(format: str = "json"):
+    """Memory call latency, payload and error metrics (format=prometheus for scraping)."""
+    if format == "prometheus":
+        return PlainTextResponse(metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+    return metrics.snapshot()
+
+
 @app.get("/api/phases", response_model=List[PhaseInfo])
 async def list_phases():
     """List all phases and their agents."""
@@ -284,19 +308,18 @@ async def list_phases():
 async def get_project_status(project_id: str):
     """Get the current status of a project's pipeline."""
     try:
-        project = get_project(project_id)
+        project = get_project(project_id, columns=PROJECT_STATUS_COLUMNS)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        chapters = get_project_chapters(project_id)
-        completed = sum(1 for ch in chapters if ch.get("status") == "completed")
+        status_counts = count_chapters_by_status(project_id)
 
         return PipelineStatusResponse(
             project_id=project_id,
             status=project.get("status", "draft"),
             current_phase=project.get("current_phase", 0),
-            total_chapters=len(chapters),
-            completed_chapters=completed,
+            total_chapters=sum(status_counts.values()),
+            completed_chapters=status_counts.get("completed", 0),
             is_running=project_id in _running_pipelines,
         )
     except AdminAPIError as e:
@@ -490,6 +513,9 @@ async def run_agent(
             "input_tokens": result.input_tokens,
             "output_tokens": result.output_tokens,
             "tool_calls": result.tool_calls,
+            "tool_results_truncated": result.tool_results_truncated,
+            "memory_requests": result.memory_requests,
+            "memory_ms": result.memory_ms,
             "output": result.output,
             "error": result.error,
         }
@@ -12,6 +12,46 @@ class Config:
     claude_api_key: str
     claude_model: str = "claude-sonnet-4-20250514"
 
+    # Admin API transport
+    admin_api_pool_size: int = 10
+    admin_api_connect_timeout: float = 5.0
+    admin_api_read_timeout: float = 60.0
+    admin_api_keep_alive: bool = True
+    admin_api_max_retries: int = 3
+    admin_api_retry_base_delay: float = 1.0
+    admin_api_retry_max_delay: float = 30.0
+    admin_api_compression: bool = True
+    admin_api_compress_threshold: int = 1024
+    admin_api_bulk_max_rows: int = 500
+    admin_api_bulk_max_bytes: int = 1024 * 1024
+    admin_api_bulk_parallelism: int = 4
+
+    # Admin API read cache
+    admin_api_cache_enabled: bool = False
+    admin_api_cache_max_bytes: int = 32 * 1024 * 1024
+    admin_api_cache_ttls: str = ""
+
+    # Write-behind buffer for pipeline_logs, decisions and validation_log
+    log_buffer_enabled: bool = True
+    log_buffer_max_rows: int = 100
+    log_buffer_flush_interval: float = 2.0
+    log_buffer_spill_path: str = ""
+
+    # Write-ahead journal for memory writes
+    memory_journal_enabled: bool = False
+    memory_journal_path: str = ""
+    memory_journal_fsync: bool = True
+    memory_journal_retry_interval: float = 5.0
+
+    # JSON encoding: auto (orjson if installed), orjson or stdlib
+    json_codec: str = "auto"
+    tool_result_compact: bool = False
+
+    # Agents: tool calls from one model turn run at once, and the estimated
+    # tokens a single tool result may take (0 = no limit; agents opt in)
+    agent_tool_parallelism: int = 4
+    tool_result_max_tokens: int = 0
+
     # Processing
     quality_threshold: float = 0.80
     max_retries: int = 3
@@ -22,6 +62,33 @@ class Config:
             admin_api_url=os.environ["ADMIN_API_URL"],
             admin_api_secret=os.environ["ADMIN_API_SECRET"],
             claude_api_key=os.environ["CLAUDE_API_KEY"],
+            admin_api_pool_size=int(os.environ.get("ADMIN_API_POOL_SIZE", "10")),
+            admin_api_connect_timeout=float(os.environ.get("ADMIN_API_CONNECT_TIMEOUT", "5.0")),
+            admin_api_read_timeout=float(os.environ.get("ADMIN_API_READ_TIMEOUT", "60.0")),
+            admin_api_keep_alive=os.environ.get("ADMIN_API_KEEP_ALIVE", "true").lower() == "true",
+            admin_api_max_retries=int(os.environ.get("ADMIN_API_MAX_RETRIES", "3")),
+            admin_api_retry_base_delay=float(os.environ.get("ADMIN_API_RETRY_BASE_DELAY", "1.0")),
+            admin_api_retry_max_delay=float(os.environ.get("ADMIN_API_RETRY_MAX_DELAY", "30.0")),
+            admin_api_compression=os.environ.get("ADMIN_API_COMPRESSION", "true").lower() == "true",
+            admin_api_compress_threshold=int(os.environ.get("ADMIN_API_COMPRESS_THRESHOLD", "1024")),
+            admin_api_bulk_max_rows=int(os.environ.get("ADMIN_API_BULK_MAX_ROWS", "500")),
+            admin_api_bulk_max_bytes=int(os.environ.get("ADMIN_API_BULK_MAX_BYTES", str(1024 * 1024))),
+            admin_api_bulk_parallelism=int(os.environ.get("ADMIN_API_BULK_PARALLELISM", "4")),
+            admin_api_cache_enabled=os.environ.get("ADMIN_API_CACHE_ENABLED", "false").lower() == "true",
+            admin_api_cache_max_bytes=int(os.environ.get("ADMIN_API_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            admin_api_cache_ttls=os.environ.get("ADMIN_API_CACHE_TTLS", ""),
+            log_buffer_enabled=os.environ.get("LOG_BUFFER_ENABLED", "true").lower() == "true",
+            log_buffer_max_rows=int(os.environ.get("LOG_BUFFER_MAX_ROWS", "100")),
+            log_buffer_flush_interval=float(os.environ.get("LOG_BUFFER_FLUSH_INTERVAL", "2.0")),
+            log_buffer_spill_path=os.environ.get("LOG_BUFFER_SPILL_PATH", ""),
+            memory_journal_enabled=os.environ.get("MEMORY_JOURNAL_ENABLED", "false").lower() == "true",
+            memory_journal_path=os.environ.get("MEMORY_JOURNAL_PATH", ""),
+            memory_journal_fsync=os.environ.get("MEMORY_JOURNAL_FSYNC", "true").lower() == "true",
+            memory_journal_retry_interval=float(os.environ.get("MEMORY_JOURNAL_RETRY_INTERVAL", "5.0")),
+            json_codec=os.environ.get("JSON_CODEC", "auto"),
+            tool_result_compact=os.environ.get("TOOL_RESULT_COMPACT", "false").lower() == "true",
+            agent_tool_parallelism=int(os.environ.get("AGENT_TOOL_PARALLELISM", "4")),
+            tool_result_max_tokens=int(os.environ.get("TOOL_RESULT_MAX_TOKENS", "0")),
             claude_model=os.environ.get("CLAUDE_MODEL", "claude-sonnet-4-20250514"),
             quality_threshold=float(os.environ.get("QUALITY_THRESHOLD", "0.80")),
             max_retries=int(os.environ.get("MAX_RETRIES", "3")),
@@ -1,6 +1,30 @@
 # Memory module - Database operations via Admin API Edge Function
-from .client import db, get_admin_client, AdminAPIClient, AdminAPIError
+from .client import db, get_admin_client, AdminAPIClient, AdminAPIError, BulkInsertError
+from .async_client import adb, get_async_admin_client, AsyncAdminAPIClient
+from .cache import ReadCache
+from .log_buffer import get_log_sink, LogBuffer
+from .metrics import metrics, attribute_to
 from . import queries
 from . import mutations
+from . import async_queries
+from . import async_mutations
 
-__all__ = ["db", "get_admin_client", "AdminAPIClient", "AdminAPIError", "queries", "mutations"]
+__all__ = [
+    "db",
+    "get_admin_client",
+    "AdminAPIClient",
+    "AdminAPIError",
+    "BulkInsertError",
+    "adb",
+    "get_async_admin_client",
+    "AsyncAdminAPIClient",
+    "ReadCache",
+    "get_log_sink",
+    "LogBuffer",
+    "metrics",
+    "attribute_to",
+    "queries",
+    "mutations",
+    "async_queries",
+    "async_mutations",
+]
@@ -0,0 +1,486 @@
+"""
+Async client for the admin-api Edge Function.
+
+Same select/insert/update/delete surface as AdminAPIClient, but built on
+httpx.AsyncClient so a single event loop can keep many memory operations
+in flight without a thread per request.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, AsyncGenerator, AsyncIterator, List, Optional, Tuple, Union
+
+import httpx
+
+from ..config import config
+from .client import (
+    db, AdminAPIError, build_payload, keyset_options, merge_chunks, parse_response, single_row, with_columns
+)
+from .batch import AsyncBatch
+from .bulk import ChunkPolicy
+from .protocol import is_local_url
+from .retry import RetryPolicy, is_transient
+from .codec import codec
+from .compression import Compression, CompressionStats
+from .singleflight import AsyncSingleFlight, FlightStats
+from .metrics import current_call, metrics
+from .journal import WriteJournal, queued_result
+from .cache import READ_ACTIONS, ReadCache, CacheStats
+
+logger = logging.getLogger("bookmaker.memory")
+
+
+class AsyncAdminAPIClient:
+    """Async client for the admin-api Edge Function."""
+
+    def __init__(
+        self,
+        url: str,
+        secret: str,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        keep_alive: bool = True,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ReadCache] = None,
+        coalesce: bool = True,
+        compression: Optional[Compression] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        chunking: Optional[ChunkPolicy] = None,
+        journal: Optional[WriteJournal] = None
+    ):
+        self.url = url
+        self.secret = secret
+        self.compression = compression or Compression()
+        self.headers = {
+            "Authorization": f"Bearer {secret}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": self.compression.accept_encoding
+        }
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keep_alive else 0
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.flights = AsyncSingleFlight() if coalesce else None
+        self.chunking = chunking or ChunkPolicy()
+        # Replayed by the sync client the journal is attached to
+        self.journal = journal
+        self.transport = transport
+        # httpx connection pools are bound to the loop that created them, so
+        # each event loop gets its own client, with the generator that closes it
+        self._clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            http = httpx.AsyncClient(
+                headers=self.headers,
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self.transport
+            )
+            closer = self._close_with_loop(loop, http)
+            # Start the generator so the loop tracks it: loop shutdown
+            # (asyncio.run) finalizes it, closing the client while its
+            # connections can still be closed
+            try:
+                closer.asend(None).send(None)
+            except StopIteration:
+                pass
+            entry = self._clients[loop] = (http, closer)
+        return entry[0]
+
+    async def _close_with_loop(
+        self, loop: asyncio.AbstractEventLoop, http: httpx.AsyncClient
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            self._clients.pop(loop, None)
+            await http.aclose()
+
+    async def _request(
+        self,
+        action: str,
+        table: str,
+        data: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Make a request to the Admin API."""
+        return await self._send(build_payload(action, table, data, filters, options))
+
+    async def _send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request body, serving reads from the cache and invalidating on writes."""
+        with metrics.track(payload.get("action", ""), payload.get("table", "*")):
+            if payload.get("action") in READ_ACTIONS:
+                return await self._read(payload)
+            deliver = self._deliver if self.journal is None else self._deliver_journaled
+            try:
+                result = await deliver(payload)
+            except AdminAPIError:
+                self._after_write(payload, None)
+                raise
+            self._after_write(payload, result)
+            return result
+
+    def _after_write(self, payload: Dict[str, Any], result: Optional[Dict[str, Any]]) -> None:
+        """Invalidate cached reads and end read flights that may predate a write."""
+        if self.flights is not None:
+            self.flights.after_write(payload)
+        if self.cache is not None:
+            self.cache.after_write(payload, result)
+
+    async def _read(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a read from the cache, or share an identical in-flight request."""
+        call = current_call()
+        token = 0
+        use_cache = self.cache is not None and self.cache.cacheable(payload)
+        if use_cache:
+            cached, token = self.cache.get(payload)
+            if cached is not None:
+                call.source = "cache"
+                return cached
+
+        async def fetch() -> Dict[str, Any]:
+            call.source = "api"
+            result = await self._deliver(payload)
+            if use_cache:
+                self.cache.put(payload, result, token)
+            return result
+
+        if self.flights is None:
+            return await fetch()
+        # Followers never run fetch, so they stay marked as shared
+        call.source = "shared"
+        return await self.flights.do(self.flights.key(payload), fetch)
+
+    async def _deliver(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a request body to the Admin API, retrying transient failures."""
+        payload = self.retry.prepare(payload)
+        attempt = 0
+        while True:
+            try:
+                return await self._post(payload if attempt == 0 else self.retry.for_retry(payload))
+            except AdminAPIError as e:
+                if not self.retry.should_retry(payload, e, attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Admin API %s %s failed (%s), retry %d/%d in %.1fs",
+                    payload.get("action"), payload.get("table", ""), e,
+                    attempt, self.retry.max_retries, delay
+                )
+                await asyncio.sleep(delay)
+
+    async def _deliver_journaled(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a write in the journal, then send it or leave it queued for replay."""
+        payload = self.retry.prepare(payload)
+        # Journal writes are fsynced, so keep them off the event loop
+        entry = await asyncio.to_thread(self.journal.append, payload)
+        if not entry.queued:
+            try:
+                result = await self._deliver(payload)
+            except AdminAPIError as e:
+                if not is_transient(e):
+                    await asyncio.to_thread(self.journal.done, entry)
+                    raise
+                self.journal.defer(entry, e)
+            else:
+                await asyncio.to_thread(self.journal.done, entry)
+                return result
+        current_call().source = "journal"
+        return queued_result(payload)
+
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and check the result."""
+        call = current_call()
+        try:
+            body, body_headers = self.compression.encode(payload)
+            if call is not None:
+                call.attempts += 1
+                call.request_bytes += len(body)
+            response = await self._client().post(self.url, content=body, headers=body_headers)
+        except httpx.TimeoutException as e:
+            raise AdminAPIError("TIMEOUT", str(e)) from e
+        except httpx.HTTPError as e:
+            raise AdminAPIError("NETWORK_ERROR", str(e)) from e
+        if call is not None:
+            call.response_bytes += response.num_bytes_downloaded
+        self.compression.record_response(
+            len(response.content),
+            response.num_bytes_downloaded,
+            "gzip" in response.headers.get("Content-Encoding", "")
+        )
+        return parse_response(response.status_code, lambda: codec.decode(response.content))
+
+    async def select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Select records from a table, optionally only the given columns."""
+        options = with_columns(options, columns)
+        result = await self._request("select", table, filters=filters, options=options)
+        return result.get("data", [])
+
+    async def iter_select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: str = "created_at",
+        page_size: int = 500,
+        ascending: bool = True,
+        columns: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream all matching records, one keyset page at a time."""
+        after = None
+        while True:
+            options = keyset_options(order_by, ascending, page_size, after, columns)
+            result = await self._request("select", table, filters=filters, options=options)
+            page = result.get("data") or []
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            after = {"value": last[order_by], "id": last["id"]}
+
+    async def select_single(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Select a single record from a table, optionally only the given columns."""
+        result = await self._request(
+            "select",
+            table,
+            filters=filters,
+            options=with_columns({"single": True}, columns)
+        )
+        return single_row(result.get("data"))
+
+    async def insert(
+        self,
+        table: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Insert one or more records into a table."""
+        result = await self._request("insert", table, data=data)
+        return result.get("data", [])
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows in size-bounded chunks, several at a time (see bulk.py).
+
+        Returns the inserted rows in input order. Raises BulkInsertError if
+        any chunk fails.
+        """
+        chunks = self.chunking.chunks(list(rows))
+        semaphore = asyncio.Semaphore(self.chunking.parallelism)
+
+        async def send(chunk: List[Dict[str, Any]]) -> Any:
+            async with semaphore:
+                try:
+                    return await self.insert(table, chunk)
+                except AdminAPIError as e:
+                    return e
+
+        outcomes = await asyncio.gather(*(send(chunk) for _, chunk in chunks))
+        return merge_chunks(chunks, outcomes)
+
+    async def upsert(
+        self,
+        table: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]],
+        on_conflict: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Insert records, or update them where they collide on on_conflict.
+
+        on_conflict names the unique column(s), comma-separated; defaults
+        to the primary key.
+        """
+        options = {"onConflict": on_conflict} if on_conflict else None
+        result = await self._request("upsert", table, data=data, options=options)
+        return result.get("data", [])
+
+    async def update(
+        self,
+        table: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Update records in a table."""
+        result = await self._request("update", table, data=data, filters=filters)
+        return result.get("data", [])
+
+    async def patch(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        data: Optional[Dict[str, Any]] = None,
+        patches: Optional[Dict[str, List[List[Any]]]] = None,
+        if_updated_at: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Update one row, applying text edits to it server-side (see delta.py).
+
+        With if_updated_at the write only happens if the row's updated_at
+        still matches; otherwise AdminAPIError CONFLICT is raised.
+        """
+        options: Dict[str, Any] = {"patches": patches or {}}
+        if if_updated_at is not None:
+            options["ifUpdatedAt"] = if_updated_at
+        result = await self._request("patch", table, data=data or {}, filters=filters, options=options)
+        return result.get("data", [])
+
+    async def delete(
+        self,
+        table: str,
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Delete records from a table."""
+        result = await self._request("delete", table, filters=filters)
+        return result.get("data", [])
+
+    async def count(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Count matching records without transferring them."""
+        result = await self._request("count", table, filters=filters)
+        return result.get("count") or 0
+
+    async def aggregate(
+        self,
+        table: str,
+        group_by: List[str],
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Count matching records per distinct value of the group_by columns.
+
+        Returns one dict per group with the group_by values and a "count".
+        """
+        result = await self._request(
+            "aggregate",
+            table,
+            filters=filters,
+            options={"groupBy": list(group_by)}
+        )
+        return result.get("data") or []
+
+    async def context(
+        self,
+        project_id: str,
+        chapter_id: Optional[str] = None,
+        parts: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch an agent's starting context in one request.
+
+        Returns {part: data} for the requested parts (see CONTEXT_PARTS in
+        protocol.py; default: all of them, "chapter" only when
+        chapter_id is given). book_context comes back as {key: value},
+        limited to keys when given.
+        """
+        data: Dict[str, Any] = {"project_id": project_id}
+        if chapter_id is not None:
+            data["chapter_id"] = chapter_id
+        if parts is not None:
+            data["parts"] = list(parts)
+        if keys is not None:
+            data["keys"] = list(keys)
+        result = await self._send({"action": "context", "data": data})
+        return result.get("data") or {}
+
+    async def execute_batch(
+        self,
+        operations: List[Dict[str, Any]],
+        transaction: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Run several operations in one request. Returns one result per operation."""
+        result = await self._send({
+            "action": "batch",
+            "operations": operations,
+            "transaction": transaction
+        })
+        return result.get("data") or []
+
+    def batch(self, transaction: bool = False) -> AsyncBatch:
+        """Queue operations and send them together when the block exits."""
+        return AsyncBatch(self, transaction)
+
+    def flight_stats(self) -> Optional[FlightStats]:
+        """Reads sent versus shared with an identical in-flight read."""
+        return self.flights.stats() if self.flights is not None else None
+
+    def compression_stats(self) -> CompressionStats:
+        """Bytes before and after compression, both directions."""
+        return self.compression.stats()
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Hit/miss counters for the read cache, or None when caching is off."""
+        return self.cache.stats() if self.cache is not None else None
+
+    async def aclose(self) -> None:
+        """Close the connection pool of the running loop.
+
+        Pools opened on other loops are closed when those loops shut down.
+        """
+        entry = self._clients.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    async def __aenter__(self) -> "AsyncAdminAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def get_async_admin_client() -> AsyncAdminAPIClient:
+    """Get async Admin API client instance."""
+    if config is None:
+        raise RuntimeError("Config not initialized - ensure environment variables are set")
+    transport = None
+    url = config.admin_api_url
+    if is_local_url(url):
+        from .local_backend import LocalAsyncTransport, get_local_api
+        transport = LocalAsyncTransport(get_local_api(url))
+        # httpx needs an http(s) URL; the transport never opens a connection
+        url = "http://local-admin-api/"
+    return AsyncAdminAPIClient(
+        url,
+        config.admin_api_secret,
+        pool_size=config.admin_api_pool_size,
+        connect_timeout=config.admin_api_connect_timeout,
+        read_timeout=config.admin_api_read_timeout,
+        keep_alive=config.admin_api_keep_alive,
+        retry=RetryPolicy(
+            max_retries=config.admin_api_max_retries,
+            base_delay=config.admin_api_retry_base_delay,
+            max_delay=config.admin_api_retry_max_delay,
+        ),
+        # Share the sync client's cache so writes through either invalidate both
+        cache=db.cache if db is not None else None,
+        compression=Compression(
+            enabled=config.admin_api_compression,
+            threshold=config.admin_api_compress_threshold,
+        ),
+        transport=transport,
+        chunking=db.chunking if db is not None else None,
+        journal=db.journal if db is not None else None,
+    )
+
+
+# Initialize client - will be None if config not available
+adb: Optional[AsyncAdminAPIClient] = None
+if config is not None:
+    adb = get_async_admin_client()
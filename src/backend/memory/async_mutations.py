@@ -0,0 +1,435 @@
+"""Async variants of the mutation helpers in mutations.py, backed by AsyncAdminAPIClient."""
+
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from .async_client import adb
+from .delta import build_patch
+from .log_buffer import get_log_sink
+
+
+# Project mutations
+async def update_project_status(project_id: str, status: str, current_phase: Optional[int] = None) -> None:
+    """Update project status and optionally current phase."""
+    data = {"status": status, "updated_at": datetime.utcnow().isoformat()}
+    if current_phase is not None:
+        data["current_phase"] = current_phase
+    await adb.update("projects", data=data, filters={"id.eq": project_id})
+
+
+async def update_project_quality_score(project_id: str, score: float) -> None:
+    """Update overall project quality score."""
+    await adb.update(
+        "projects",
+        data={"overall_quality_score": score, "updated_at": datetime.utcnow().isoformat()},
+        filters={"id.eq": project_id}
+    )
+
+
+# Chapter mutations
+async def create_chapter(project_id: str, chapter_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a single chapter."""
+    chapter_data["project_id"] = project_id
+    result = await adb.insert("chapters", data=chapter_data)
+    return result[0] if isinstance(result, list) else result
+
+
+async def create_chapters(project_id: str, chapters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create multiple chapters for a project."""
+    for ch in chapters:
+        ch["project_id"] = project_id
+    return await adb.insert_many("chapters", chapters)
+
+
+async def update_chapter(chapter_id: str, data: Dict[str, Any]) -> None:
+    """Update a chapter with arbitrary data."""
+    data["updated_at"] = datetime.utcnow().isoformat()
+    await adb.update("chapters", data=data, filters={"id.eq": chapter_id})
+
+
+async def patch_chapter(chapter: Dict[str, Any], changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply changes to a chapter row as read, uploading only the edited text.
+
+    Raises AdminAPIError with code CONFLICT if the chapter was updated since
+    it was read. Returns the updated row, or None if the write was queued in
+    the write journal (see journal.py).
+    """
+    data, patches = build_patch(chapter, changes)
+    if not data and not patches:
+        return chapter
+    rows = await adb.patch(
+        "chapters",
+        filters={"id.eq": chapter["id"]},
+        data=data,
+        patches=patches,
+        if_updated_at=chapter["updated_at"]
+    )
+    return rows[0] if rows else None
+
+
+async def update_chapter_status(chapter_id: str, status: str, current_phase: Optional[int] = None) -> None:
+    """Update chapter status and optionally current phase."""
+    data = {"status": status, "updated_at": datetime.utcnow().isoformat()}
+    if current_phase is not None:
+        data["current_phase"] = current_phase
+    await adb.update("chapters", data=data, filters={"id.eq": chapter_id})
+
+
+async def update_chapter_content(chapter_id: str, field: str, content: str) -> None:
+    """Update a specific content field of a chapter."""
+    await adb.update(
+        "chapters",
+        data={field: content, "updated_at": datetime.utcnow().isoformat()},
+        filters={"id.eq": chapter_id}
+    )
+
+
+async def mark_chapter_phase_complete(chapter_id: str, phase: int) -> None:
+    """Mark a phase as complete for a chapter."""
+    phase_field = f"phase_{phase}_complete"
+    await adb.update(
+        "chapters",
+        data={phase_field: True, "updated_at": datetime.utcnow().isoformat()},
+        filters={"id.eq": chapter_id}
+    )
+
+
+async def update_chapter_analysis(chapter_id: str, stories: List[Dict], quotes: List[Dict]) -> None:
+    """Update chapter analysis results."""
+    await adb.update(
+        "chapters",
+        data={
+            "analysis_stories": stories,
+            "analysis_quotes": quotes,
+            "updated_at": datetime.utcnow().isoformat()
+        },
+        filters={"id.eq": chapter_id}
+    )
+
+
+async def update_chapter_outline(chapter_id: str, outline: str, sections: List[Dict]) -> None:
+    """Update chapter outline and sections."""
+    await adb.update(
+        "chapters",
+        data={
+            "outline": outline,
+            "sections": sections,
+            "updated_at": datetime.utcnow().isoformat()
+        },
+        filters={"id.eq": chapter_id}
+    )
+
+
+# Tactics mutations
+async def create_tactic(project_id: str, chapter_id: str, tactic: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a tactic."""
+    tactic["project_id"] = project_id
+    tactic["chapter_id"] = chapter_id
+    result = await adb.insert("tactics", data=tactic)
+    return result[0] if isinstance(result, list) else result
+
+
+async def create_tactics_batch(tactics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create multiple tactics at once."""
+    return await adb.insert_many("tactics", tactics)
+
+
+async def update_tactic(tactic_id: str, data: Dict[str, Any]) -> None:
+    """Update a tactic."""
+    await adb.update("tactics", data=data, filters={"id.eq": tactic_id})
+
+
+async def mark_tactic_duplicate(tactic_id: str, duplicate_of: str) -> None:
+    """Mark a tactic as a duplicate of another."""
+    await adb.update("tactics", data={"duplicate_of": duplicate_of}, filters={"id.eq": tactic_id})
+
+
+async def update_tactic_usage(tactic_id: str, used_in_chapters: List[str]) -> None:
+    """Update which chapters use this tactic."""
+    await adb.update("tactics", data={"used_in_chapters": used_in_chapters}, filters={"id.eq": tactic_id})
+
+
+# Glossary mutations
+async def create_glossary_term(project_id: str, term: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a glossary term."""
+    term["project_id"] = project_id
+    result = await adb.insert("glossary", data=term)
+    return result[0] if isinstance(result, list) else result
+
+
+async def create_glossary_batch(project_id: str, terms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create multiple glossary terms."""
+    for term in terms:
+        term["project_id"] = project_id
+    return await adb.insert_many("glossary", terms)
+
+
+async def update_glossary_spanish(term_id: str, spanish_term: str, spanish_definition: Optional[str] = None) -> None:
+    """Add Spanish translation to a glossary term."""
+    data = {"spanish_term": spanish_term}
+    if spanish_definition:
+        data["spanish_definition"] = spanish_definition
+    await adb.update("glossary", data=data, filters={"id.eq": term_id})
+
+
+# Diagram mutations
+async def create_diagram(chapter_id: str, diagram: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a diagram."""
+    diagram["chapter_id"] = chapter_id
+    result = await adb.insert("diagrams", data=diagram)
+    return result[0] if isinstance(result, list) else result
+
+
+async def update_diagram(diagram_id: str, data: Dict[str, Any]) -> None:
+    """Update a diagram."""
+    await adb.update("diagrams", data=data, filters={"id.eq": diagram_id})
+
+
+async def mark_diagram_valid(diagram_id: str, valid: bool = True) -> None:
+    """Mark a diagram as render-valid or invalid."""
+    await adb.update("diagrams", data={"render_valid": valid}, filters={"id.eq": diagram_id})
+
+
+async def update_diagram_captions(diagram_id: str, caption_en: str, caption_es: Optional[str] = None) -> None:
+    """Update diagram captions."""
+    data = {"caption_en": caption_en}
+    if caption_es:
+        data["caption_es"] = caption_es
+    await adb.update("diagrams", data=data, filters={"id.eq": diagram_id})
+
+
+# Quality mutations
+async def create_quality_score(chapter_id: str, scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a quality score record for a chapter."""
+    scores["chapter_id"] = chapter_id
+    result = await adb.insert("quality_scores", data=scores)
+    return result[0] if isinstance(result, list) else result
+
+
+# Issues mutations
+async def create_issue(chapter_id: str, issue: Dict[str, Any]) -> Dict[str, Any]:
+    """Create an issue for a chapter."""
+    issue["chapter_id"] = chapter_id
+    issue["status"] = issue.get("status", "open")
+    result = await adb.insert("issues", data=issue)
+    return result[0] if isinstance(result, list) else result
+
+
+async def flag_issue(
+    chapter_id: str,
+    issue_type: str,
+    severity: str,
+    description: str,
+    location: str,
+    flagged_by: str
+) -> Dict[str, Any]:
+    """Flag a new issue found by an agent."""
+    issue = {
+        "chapter_id": chapter_id,
+        "issue_type": issue_type,
+        "severity": severity,
+        "description": description,
+        "location": location,
+        "flagged_by": flagged_by,
+        "status": "open"
+    }
+    result = await adb.insert("issues", data=issue)
+    return result[0] if isinstance(result, list) else result
+
+
+async def resolve_issue(issue_id: str, resolution: str, resolved_by: str) -> None:
+    """Resolve an issue."""
+    await adb.update(
+        "issues",
+        data={
+            "status": "resolved",
+            "resolution": resolution,
+            "resolved_by": resolved_by,
+            "resolved_at": datetime.utcnow().isoformat()
+        },
+        filters={"id.eq": issue_id}
+    )
+
+
+async def ignore_issue(issue_id: str, reason: str, ignored_by: str) -> None:
+    """Mark an issue as ignored."""
+    await adb.update(
+        "issues",
+        data={
+            "status": "ignored",
+            "resolution": reason,
+            "resolved_by": ignored_by,
+            "resolved_at": datetime.utcnow().isoformat()
+        },
+        filters={"id.eq": issue_id}
+    )
+
+
+# Cross-reference mutations
+async def create_cross_ref(
+    project_id: str,
+    from_chapter_id: str,
+    to_chapter_id: str,
+    reason: str,
+    location_hint: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a cross-reference between chapters."""
+    data = {
+        "project_id": project_id,
+        "from_chapter_id": from_chapter_id,
+        "to_chapter_id": to_chapter_id,
+        "reason": reason,
+        "verified": False
+    }
+    if location_hint:
+        data["location_hint"] = location_hint
+    result = await adb.insert("cross_refs", data=data)
+    return result[0] if isinstance(result, list) else result
+
+
+async def verify_cross_ref(cross_ref_id: str, reference_text: str) -> None:
+    """Verify a cross-reference and set its text."""
+    await adb.update(
+        "cross_refs",
+        data={"verified": True, "reference_text": reference_text},
+        filters={"id.eq": cross_ref_id}
+    )
+
+
+async def delete_cross_ref(cross_ref_id: str) -> None:
+    """Delete a cross-reference."""
+    await adb.delete("cross_refs", filters={"id.eq": cross_ref_id})
+
+
+# Book context mutations
+async def set_book_context(project_id: str, key: str, value: str) -> Dict[str, Any]:
+    """Set a book context value (upsert on project_id + key)."""
+    result = await adb.upsert(
+        "book_context",
+        data={
+            "project_id": project_id,
+            "key": key,
+            "value": value,
+            "updated_at": datetime.utcnow().isoformat()
+        },
+        on_conflict="project_id,key"
+    )
+    return result[0] if isinstance(result, list) else result
+
+
+async def save_style_guide(project_id: str, style_guide: str) -> None:
+    """Save the style guide for a project."""
+    await set_book_context(project_id, "style_guide", style_guide)
+
+
+async def save_book_structure(project_id: str, structure: str) -> None:
+    """Save the book structure for a project."""
+    await set_book_context(project_id, "structure", structure)
+
+
+async def save_spanish_style_guide(project_id: str, style_guide: str) -> None:
+    """Save the Spanish style guide for a project."""
+    await set_book_context(project_id, "spanish_style_guide", style_guide)
+
+
+async def save_raw_markdown(project_id: str, markdown: str) -> None:
+    """Save the raw markdown for a project."""
+    await set_book_context(project_id, "raw_markdown", markdown)
+
+
+# Decision mutations
+async def log_decision(
+    project_id: str,
+    agent_name: str,
+    decision_type: str,
+    subject: str,
+    decision: str,
+    reasoning: str,
+    confidence: str = "high",
+    chapter_id: Optional[str] = None,
+    alternatives: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Log an agent decision for audit purposes."""
+    data = {
+        "project_id": project_id,
+        "agent_name": agent_name,
+        "decision_type": decision_type,
+        "subject": subject,
+        "decision": decision,
+        "reasoning": reasoning,
+        "confidence": confidence
+    }
+    if chapter_id:
+        data["chapter_id"] = chapter_id
+    if alternatives:
+        data["alternatives"] = alternatives
+    return await _append_log("decisions", data)
+
+
+# Validation log mutations
+async def log_validation(
+    project_id: str,
+    validator_name: str,
+    phase: int,
+    passed: bool,
+    failures: Optional[List[Dict]] = None,
+    chapter_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Log a validation result."""
+    data = {
+        "project_id": project_id,
+        "validator_name": validator_name,
+        "phase": phase,
+        "passed": passed
+    }
+    if chapter_id:
+        data["chapter_id"] = chapter_id
+    if failures:
+        data["failures"] = failures
+    return await _append_log("validation_log", data)
+
+
+# Pipeline logging
+async def log_pipeline_event(
+    project_id: str,
+    phase: int,
+    agent_name: str,
+    log_level: str,
+    message: str,
+    chapter_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Log a pipeline event."""
+    data = {
+        "project_id": project_id,
+        "phase": phase,
+        "agent_name": agent_name,
+        "log_level": log_level,
+        "message": message
+    }
+    if chapter_id:
+        data["chapter_id"] = chapter_id
+    if details:
+        data["details"] = details
+    return await _append_log("pipeline_logs", data)
+
+
+async def _append_log(table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    # Queue on the shared write-behind buffer; insert directly when it's off
+    sink = get_log_sink()
+    if sink.enabled:
+        return sink.append(table, data)
+    result = await adb.insert(table, data=data)
+    return result[0] if isinstance(result, list) else result
+
+
+# Output files
+async def create_output_file(project_id: str, format: str, language: str, file_path: str, file_size: int) -> Dict[str, Any]:
+    """Record an output file."""
+    result = await adb.insert("output_files", data={
+        "project_id": project_id,
+        "format": format,
+        "language": language,
+        "file_path": file_path,
+        "file_size": file_size
+    })
+    return result[0] if isinstance(result, list) else result
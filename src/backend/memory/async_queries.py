@@ -0,0 +1,405 @@
+"""Async variants of the query helpers in queries.py, backed by AsyncAdminAPIClient."""
+
+from typing import Optional, List, Dict, Any, AsyncIterator
+from .async_client import adb
+from .queries import CHAPTER_SUMMARY_COLUMNS
+
+
+# Project queries
+async def get_project(project_id: str, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get a project by ID."""
+    return await adb.select_single("projects", filters={"id.eq": project_id}, columns=columns)
+
+
+async def get_project_chapters(project_id: str, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Get all chapters for a project, ordered by chapter_number."""
+    return await adb.select(
+        "chapters",
+        filters={"project_id.eq": project_id},
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=columns
+    )
+
+
+# Chapter queries
+async def get_chapter(chapter_id: str) -> Dict[str, Any]:
+    """Get a chapter by ID."""
+    return await adb.select_single("chapters", filters={"id.eq": chapter_id})
+
+
+async def get_chapter_by_number(project_id: str, chapter_number: int) -> Dict[str, Any]:
+    """Get a chapter by project ID and chapter number."""
+    return await adb.select_single(
+        "chapters",
+        filters={"project_id.eq": project_id, "chapter_number.eq": chapter_number}
+    )
+
+
+async def get_chapters_by_phase(project_id: str, phase: int, complete: bool = True) -> List[Dict[str, Any]]:
+    """Get chapters that have completed (or not) a specific phase."""
+    phase_field = f"phase_{phase}_complete"
+    return await adb.select(
+        "chapters",
+        filters={"project_id.eq": project_id, f"{phase_field}.eq": complete},
+        options={"order": {"column": "chapter_number", "ascending": True}}
+    )
+
+
+# Progress counts (computed server-side, no rows transferred)
+async def count_chapters(project_id: str) -> int:
+    """Count chapters in a project."""
+    return await adb.count("chapters", filters={"project_id.eq": project_id})
+
+
+async def count_chapters_by_status(project_id: str) -> Dict[str, int]:
+    """Count a project's chapters per status, e.g. {"completed": 12, "pending": 3}."""
+    groups = await adb.aggregate("chapters", ["status"], filters={"project_id.eq": project_id})
+    return {g["status"]: g["count"] for g in groups}
+
+
+async def count_chapters_by_current_phase(project_id: str) -> Dict[int, int]:
+    """Count a project's chapters per current_phase."""
+    groups = await adb.aggregate("chapters", ["current_phase"], filters={"project_id.eq": project_id})
+    return {g["current_phase"]: g["count"] for g in groups}
+
+
+async def count_chapters_phase_complete(project_id: str) -> Dict[int, int]:
+    """Count how many of a project's chapters have completed each phase (1-9)."""
+    phase_fields = [f"phase_{n}_complete" for n in range(1, 10)]
+    groups = await adb.aggregate("chapters", phase_fields, filters={"project_id.eq": project_id})
+    return {
+        n: sum(g["count"] for g in groups if g.get(f"phase_{n}_complete"))
+        for n in range(1, 10)
+    }
+
+
+# Tactics queries
+async def get_project_tactics(project_id: str) -> List[Dict[str, Any]]:
+    """Get all tactics for a project."""
+    return await adb.select("tactics", filters={"project_id.eq": project_id})
+
+
+async def get_chapter_tactics(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get tactics for a specific chapter."""
+    return await adb.select("tactics", filters={"chapter_id.eq": chapter_id})
+
+
+async def get_tactics_by_category(project_id: str, category: str) -> List[Dict[str, Any]]:
+    """Get tactics filtered by category."""
+    return await adb.select(
+        "tactics",
+        filters={"project_id.eq": project_id, "category.eq": category}
+    )
+
+
+async def get_non_duplicate_tactics(project_id: str) -> List[Dict[str, Any]]:
+    """Get tactics that are not duplicates."""
+    return await adb.select(
+        "tactics",
+        filters={"project_id.eq": project_id, "duplicate_of.is": None}
+    )
+
+
+# Glossary queries
+async def get_glossary(project_id: str) -> List[Dict[str, Any]]:
+    """Get glossary terms for a project."""
+    return await adb.select("glossary", filters={"project_id.eq": project_id})
+
+
+async def get_glossary_term(project_id: str, term: str) -> Optional[Dict[str, Any]]:
+    """Get a specific glossary term."""
+    return await adb.select_single(
+        "glossary",
+        filters={"project_id.eq": project_id, "english_term.eq": term}
+    )
+
+
+async def get_spanish_glossary(project_id: str) -> List[Dict[str, Any]]:
+    """Get glossary terms that have Spanish translations."""
+    return await adb.select(
+        "glossary",
+        filters={"project_id.eq": project_id, "spanish_term.neq": None}
+    )
+
+
+# Diagram queries
+async def get_chapter_diagrams(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get diagrams for a chapter."""
+    return await adb.select("diagrams", filters={"chapter_id.eq": chapter_id})
+
+
+async def get_valid_diagrams(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get diagrams that have been validated."""
+    return await adb.select(
+        "diagrams",
+        filters={"chapter_id.eq": chapter_id, "render_valid.eq": True}
+    )
+
+
+# Quality queries
+async def get_chapter_quality(chapter_id: str) -> Optional[Dict[str, Any]]:
+    """Get most recent quality score for a chapter."""
+    results = await adb.select(
+        "quality_scores",
+        filters={"chapter_id.eq": chapter_id},
+        options={
+            "order": {"column": "created_at", "ascending": False},
+            "limit": 1
+        }
+    )
+    return results[0] if results else None
+
+
+# Issues queries
+async def get_chapter_issues(chapter_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get issues for a chapter, optionally filtered by status."""
+    filters = {"chapter_id.eq": chapter_id}
+    if status:
+        filters["status.eq"] = status
+    return await adb.select("issues", filters=filters)
+
+
+async def get_open_issues(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get unresolved issues for a chapter."""
+    return await adb.select(
+        "issues",
+        filters={"chapter_id.eq": chapter_id, "status.eq": "open"}
+    )
+
+
+async def get_issues_by_severity(chapter_id: str, severity: str) -> List[Dict[str, Any]]:
+    """Get issues filtered by severity."""
+    return await adb.select(
+        "issues",
+        filters={"chapter_id.eq": chapter_id, "severity.eq": severity}
+    )
+
+
+# Cross-reference queries
+async def get_cross_refs_from(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get cross-references originating from a chapter."""
+    return await adb.select("cross_refs", filters={"from_chapter_id.eq": chapter_id})
+
+
+async def get_cross_refs_to(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get cross-references pointing to a chapter."""
+    return await adb.select("cross_refs", filters={"to_chapter_id.eq": chapter_id})
+
+
+async def get_project_cross_refs(project_id: str) -> List[Dict[str, Any]]:
+    """Get all cross-references for a project."""
+    return await adb.select("cross_refs", filters={"project_id.eq": project_id})
+
+
+async def get_verified_cross_refs(project_id: str) -> List[Dict[str, Any]]:
+    """Get verified cross-references."""
+    return await adb.select(
+        "cross_refs",
+        filters={"project_id.eq": project_id, "verified.eq": True}
+    )
+
+
+# Book context queries
+async def get_book_context(project_id: str, key: str) -> Optional[Dict[str, Any]]:
+    """Get a specific book context value."""
+    return await adb.select_single(
+        "book_context",
+        filters={"project_id.eq": project_id, "key.eq": key}
+    )
+
+
+async def get_all_book_context(project_id: str) -> List[Dict[str, Any]]:
+    """Get all book context entries for a project."""
+    return await adb.select("book_context", filters={"project_id.eq": project_id})
+
+
+async def get_agent_context(
+    project_id: str,
+    chapter_id: Optional[str] = None,
+    parts: Optional[List[str]] = None,
+    keys: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Get everything an agent reads before it starts, in one request.
+
+    parts picks from project, chapter, chapters, book_context, glossary,
+    tactics and cross_refs; keys limits the book_context entries.
+    """
+    return await adb.context(project_id, chapter_id=chapter_id, parts=parts, keys=keys)
+
+
+async def get_style_guide(project_id: str) -> Optional[str]:
+    """Get the style guide for a project."""
+    result = await get_book_context(project_id, "style_guide")
+    return result.get("value") if result else None
+
+
+async def get_book_structure(project_id: str) -> Optional[str]:
+    """Get the book structure for a project."""
+    result = await get_book_context(project_id, "structure")
+    return result.get("value") if result else None
+
+
+async def get_spanish_style_guide(project_id: str) -> Optional[str]:
+    """Get the Spanish style guide for a project."""
+    result = await get_book_context(project_id, "spanish_style_guide")
+    return result.get("value") if result else None
+
+
+# Decision queries
+async def get_chapter_decisions(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get all decisions made for a chapter."""
+    return [row async for row in iter_chapter_decisions(chapter_id)]
+
+
+async def get_agent_decisions(project_id: str, agent_name: str) -> List[Dict[str, Any]]:
+    """Get all decisions made by a specific agent."""
+    return await adb.select(
+        "decisions",
+        filters={"project_id.eq": project_id, "agent_name.eq": agent_name}
+    )
+
+
+# Validation log queries
+async def get_chapter_validations(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get all validation results for a chapter."""
+    return [row async for row in iter_chapter_validations(chapter_id)]
+
+
+async def get_phase_validations(project_id: str, phase: int) -> List[Dict[str, Any]]:
+    """Get validation results for a specific phase."""
+    return await adb.select(
+        "validation_log",
+        filters={"project_id.eq": project_id, "phase.eq": phase}
+    )
+
+
+async def get_failed_validations(project_id: str) -> List[Dict[str, Any]]:
+    """Get all failed validations for a project."""
+    return await adb.select(
+        "validation_log",
+        filters={"project_id.eq": project_id, "passed.eq": False}
+    )
+
+
+# Previous chapter summaries (for continuity)
+async def get_previous_chapter_summaries(project_id: str, before_chapter: int) -> List[Dict[str, Any]]:
+    """Get summaries of chapters before a given chapter number."""
+    return await adb.select(
+        "chapters",
+        filters={"project_id.eq": project_id, "chapter_number.lt": before_chapter},
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=CHAPTER_SUMMARY_COLUMNS
+    )
+
+
+async def get_all_chapter_summaries(project_id: str) -> List[Dict[str, Any]]:
+    """Get summaries of all chapters."""
+    return await adb.select(
+        "chapters",
+        filters={"project_id.eq": project_id},
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=CHAPTER_SUMMARY_COLUMNS
+    )
+
+
+# Pipeline logs queries
+async def get_project_logs(project_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+    """Get recent pipeline logs for a project."""
+    return await adb.select(
+        "pipeline_logs",
+        filters={"project_id.eq": project_id},
+        options={
+            "order": {"column": "created_at", "ascending": False},
+            "limit": limit
+        }
+    )
+
+
+async def get_chapter_logs(chapter_id: str) -> List[Dict[str, Any]]:
+    """Get pipeline logs for a specific chapter."""
+    return await adb.select(
+        "pipeline_logs",
+        filters={"chapter_id.eq": chapter_id},
+        options={"order": {"column": "created_at", "ascending": False}}
+    )
+
+
+async def get_agent_logs(project_id: str, agent_name: str) -> List[Dict[str, Any]]:
+    """Get logs for a specific agent."""
+    return [row async for row in iter_agent_logs(project_id, agent_name)]
+
+
+# Streaming reads for large append-only tables (keyset-paginated)
+def iter_project_logs(project_id: str, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream a project's pipeline logs, newest first."""
+    return adb.iter_select(
+        "pipeline_logs",
+        filters={"project_id.eq": project_id},
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
+    )
+
+
+def iter_agent_logs(project_id: str, agent_name: str, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream logs for a specific agent, newest first."""
+    return adb.iter_select(
+        "pipeline_logs",
+        filters={"project_id.eq": project_id, "agent_name.eq": agent_name},
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
+    )
+
+
+def iter_chapter_decisions(chapter_id: str, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream all decisions made for a chapter, oldest first."""
+    return adb.iter_select(
+        "decisions",
+        filters={"chapter_id.eq": chapter_id},
+        order_by="created_at",
+        page_size=page_size
+    )
+
+
+def iter_project_decisions(project_id: str, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream all decisions made for a project, oldest first."""
+    return adb.iter_select(
+        "decisions",
+        filters={"project_id.eq": project_id},
+        order_by="created_at",
+        page_size=page_size
+    )
+
+
+def iter_chapter_validations(chapter_id: str, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """Stream all validation results for a chapter, newest first."""
+    return adb.iter_select(
+        "validation_log",
+        filters={"chapter_id.eq": chapter_id},
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
+    )
+
+
+# Output files queries
+async def get_project_outputs(project_id: str) -> List[Dict[str, Any]]:
+    """Get output files for a project."""
+    return await adb.select("output_files", filters={"project_id.eq": project_id})
+
+
+async def get_outputs_by_format(project_id: str, format: str) -> List[Dict[str, Any]]:
+    """Get output files by format."""
+    return await adb.select(
+        "output_files",
+        filters={"project_id.eq": project_id, "format.eq": format}
+    )
+
+
+async def get_outputs_by_language(project_id: str, language: str) -> List[Dict[str, Any]]:
+    """Get output files by language."""
+    return await adb.select(
+        "output_files",
+        filters={"project_id.eq": project_id, "language.eq": language}
+    )
@@ -0,0 +1,147 @@
+"""
+Batched Admin API operations.
+
+Queue select/insert/update/upsert/delete operations and send them to the
+admin-api "batch" action in a single request:
+
+    with db.batch() as b:
+        b.update("chapters", {"phase_4_complete": True}, {"id.eq": chapter_id})
+        b.insert("decisions", decision)
+        b.insert("validation_log", validation)
+
+    b.results  # one entry per queued operation, in order
+
+With transaction=True the whole batch commits or rolls back together.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+
+class BatchQueue:
+    """Ordered list of queued Admin API operations."""
+
+    def __init__(self, transaction: bool = False):
+        self.transaction = transaction
+        self.operations: List[Dict[str, Any]] = []
+        self.results: List[Any] = []
+
+    def _queue(
+        self,
+        action: str,
+        table: str,
+        data: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> int:
+        operation: Dict[str, Any] = {"action": action, "table": table}
+        if data is not None:
+            operation["data"] = data
+        if filters is not None:
+            operation["filters"] = filters
+        if options is not None:
+            operation["options"] = options
+        self.operations.append(operation)
+        # Index into self.results once the batch has been flushed
+        return len(self.results) + len(self.operations) - 1
+
+    def select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
+    ) -> int:
+        """Queue a select. Returns the index of its result."""
+        if columns:
+            options = {**(options or {}), "columns": list(columns)}
+        return self._queue("select", table, filters=filters, options=options)
+
+    def insert(
+        self,
+        table: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> int:
+        """Queue an insert. Returns the index of its result."""
+        return self._queue("insert", table, data=data)
+
+    def update(
+        self,
+        table: str,
+        data: Dict[str, Any],
+        filters: Dict[str, Any]
+    ) -> int:
+        """Queue an update. Returns the index of its result."""
+        return self._queue("update", table, data=data, filters=filters)
+
+    def upsert(
+        self,
+        table: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]],
+        on_conflict: Optional[str] = None
+    ) -> int:
+        """Queue an upsert. Returns the index of its result."""
+        options = {"onConflict": on_conflict} if on_conflict else None
+        return self._queue("upsert", table, data=data, options=options)
+
+    def delete(self, table: str, filters: Dict[str, Any]) -> int:
+        """Queue a delete. Returns the index of its result."""
+        return self._queue("delete", table, filters=filters)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        operations = self.operations
+        self.operations = []
+        return operations
+
+    def _store(self, data: List[Dict[str, Any]]) -> List[Any]:
+        results = [item.get("data") for item in data]
+        self.results.extend(results)
+        return results
+
+
+class Batch(BatchQueue):
+    """Batch bound to a sync AdminAPIClient. Flushes on context exit."""
+
+    def __init__(self, client, transaction: bool = False):
+        super().__init__(transaction)
+        self.client = client
+
+    def flush(self) -> List[Any]:
+        """Send queued operations in one request and return their results."""
+        operations = self._take()
+        if not operations:
+            return []
+        return self._store(self.client.execute_batch(operations, self.transaction))
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Don't send half-built batches when the block raised
+        if exc_type is None:
+            self.flush()
+        else:
+            self.operations = []
+
+
+class AsyncBatch(BatchQueue):
+    """Batch bound to an AsyncAdminAPIClient. Flushes on context exit."""
+
+    def __init__(self, client, transaction: bool = False):
+        super().__init__(transaction)
+        self.client = client
+
+    async def flush(self) -> List[Any]:
+        """Send queued operations in one request and return their results."""
+        operations = self._take()
+        if not operations:
+            return []
+        return self._store(await self.client.execute_batch(operations, self.transaction))
+
+    async def __aenter__(self) -> "AsyncBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+        else:
+            self.operations = []
@@ -0,0 +1,47 @@
+"""
+Size-aware chunking for bulk inserts.
+
+Creating every chapter, tactic or glossary term of a large book in one POST
+can exceed the Edge Function's request body limit, and a failed request
+has to resend everything. insert_many() on the memory clients splits the
+rows into chunks bounded by row count and estimated JSON size, sends up to
+`parallelism` chunks at once and merges the returned rows back into input
+order:
+
+    rows = db.insert_many("tactics", tactics)
+
+Each chunk is an ordinary insert, so it is retried on its own (see
+retry.py). If some chunks still fail, BulkInsertError reports the rows that
+landed and the input positions of those that didn't.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from .codec import codec
+
+
+@dataclass
+class ChunkPolicy:
+    """How bulk inserts are split and how many chunks run at once."""
+    max_rows: int = 500
+    max_bytes: int = 1024 * 1024
+    parallelism: int = 4
+
+    def chunks(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        """Split rows into (start index, rows) chunks within max_rows and max_bytes.
+
+        A single row larger than max_bytes gets a chunk of its own.
+        """
+        chunks: List[Tuple[int, List[Dict[str, Any]]]] = []
+        start, size = 0, 0
+        for i, row in enumerate(rows):
+            # +1 for the separating comma
+            row_size = len(codec.encode(row)) + 1
+            if i > start and (i - start >= self.max_rows or size + row_size > self.max_bytes):
+                chunks.append((start, rows[start:i]))
+                start, size = i, 0
+            size += row_size
+        if start < len(rows):
+            chunks.append((start, rows[start:]))
+        return chunks
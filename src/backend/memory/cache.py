@@ -0,0 +1,340 @@
+"""
+Read-through cache for Admin API reads.
+
+Agents re-read the same per-phase data (style guide, structure, glossary,
+the project row) many times over a run. ReadCache keeps recent select,
+count and aggregate results keyed on the exact request, with:
+
+- a TTL per table (tables without one are never cached),
+- LRU eviction once the cached responses exceed max_bytes,
+- invalidation when a write through the same client touches the table.
+
+Invalidation is row-aware: a write only evicts cached reads whose filters
+could have matched a row before or after the write. Cached selects on other
+projects or chapters survive, and so does a project's cached glossary when
+one of its chapters is updated. Counts and aggregates on the written table
+are always evicted.
+
+TTLs bound how stale a read can get from writes made elsewhere (other
+workers, the frontend), so tables that change outside the backend keep
+short TTLs. Since such reads can still be stale, the shared clients only
+use the cache with ADMIN_API_CACHE_ENABLED=true.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .codec import codec
+
+# Read-only actions; their results can be cached and coalesced
+READ_ACTIONS = {"select", "count", "aggregate"}
+
+# Actions that change rows and invalidate cached reads
+WRITE_ACTIONS = {"insert", "update", "patch", "upsert", "delete"}
+
+# Seconds each table's reads stay cached
+DEFAULT_TTLS: Dict[str, float] = {
+    "book_context": 300.0,
+    "glossary": 120.0,
+    "cross_refs": 60.0,
+    "tactics": 60.0,
+    "diagrams": 60.0,
+    "projects": 30.0,
+    "chapters": 10.0,
+}
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+@dataclass
+class _Entry:
+    table: str
+    action: str
+    filters: Dict[str, Any]
+    body: bytes
+    expires: float
+
+
+class ReadCache:
+    """LRU cache of Admin API read results, bounded in bytes."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = 32 * 1024 * 1024
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def cacheable(self, payload: Dict[str, Any]) -> bool:
+        """Whether a request's result may be served from the cache."""
+        return (
+            payload.get("action") in READ_ACTIONS
+            and self.ttls.get(payload.get("table"), 0) > 0
+        )
+
+    def get(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Look up a read. Returns (result or None, token to pass to put)."""
+        key = cache_key(payload)
+        table = payload["table"]
+        with self._lock:
+            token = self._generations.get(table, 0)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None, token
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            body = entry.body
+        # Decode a fresh copy so callers can't mutate the cached result
+        return codec.decode(body), token
+
+    def put(self, payload: Dict[str, Any], result: Dict[str, Any], token: int) -> None:
+        """Cache a read result fetched after get() returned token."""
+        table = payload["table"]
+        body = codec.encode(result)
+        key = cache_key(payload)
+        size = len(key) + len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A write to the table landed while this read was in flight
+            if self._generations.get(table, 0) != token:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(
+                table=table,
+                action=payload["action"],
+                filters=payload.get("filters") or {},
+                body=body,
+                expires=time.monotonic() + self.ttls[table],
+            )
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def record_write(self, payload: Dict[str, Any], rows: Any) -> None:
+        """Invalidate cached reads that a completed write could have changed.
+
+        rows is the write's returned data (the rows as written, or as they
+        were before a delete). When it isn't available, every cached read
+        on the table is dropped.
+        """
+        table = payload.get("table")
+        action = payload.get("action")
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not isinstance(rows, list):
+            self.invalidate_table(table)
+            return
+
+        # Columns whose value before the write is unknown. Filters on them
+        # can't be checked against the old row, so they count as matching.
+        if action == "update":
+            changed = set((payload.get("data") or {}).keys())
+        elif action == "patch":
+            patches = (payload.get("options") or {}).get("patches") or {}
+            changed = set((payload.get("data") or {}).keys()) | set(patches) | {"updated_at"}
+        elif action == "upsert":
+            conflict = (payload.get("options") or {}).get("onConflict") or "id"
+            keys = {c.strip() for c in conflict.split(",")}
+            changed = {col for row in rows for col in row.keys()} - keys
+        else:
+            changed = set()
+
+        def affected(entry: _Entry) -> bool:
+            if entry.action != "select":
+                return True
+            return any(row_matches(row, entry.filters, skip=changed) for row in rows)
+
+        self._invalidate(table, affected if rows else None)
+
+    def after_write(self, payload: Dict[str, Any], result: Optional[Dict[str, Any]]) -> None:
+        """Invalidate for every write in a request or batch.
+
+        Pass result=None when the request failed: a failed batch may still
+        have applied some of its operations, so their tables are dropped.
+        """
+        batch = payload.get("action") == "batch"
+        results = (result or {}).get("data") if batch else None
+        for op, index in write_operations(payload):
+            if result is None:
+                self.invalidate_table(op.get("table"))
+            elif batch:
+                item = results[index] if isinstance(results, list) and index < len(results) else None
+                self.record_write(op, item.get("data") if isinstance(item, dict) else None)
+            else:
+                self.record_write(op, result.get("data"))
+
+    def invalidate_table(self, table: Optional[str]) -> None:
+        """Drop every cached read on a table."""
+        self._invalidate(table, lambda entry: True)
+
+    def clear(self) -> None:
+        """Drop everything."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generations = {t: g + 1 for t, g in self._generations.items()}
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit/miss counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _invalidate(self, table: Optional[str], affected) -> None:
+        if table is None or table not in self.ttls:
+            return
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            if affected is None:
+                return
+            for key in [k for k, e in self._entries.items() if e.table == table and affected(e)]:
+                self._remove(key)
+                self._stats.invalidations += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(key) + len(entry.body)
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Canonical key for a read request."""
+    return json.dumps(
+        [payload.get("action"), payload.get("table"), payload.get("filters"), payload.get("options")],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "table=seconds,table=seconds" overrides on top of DEFAULT_TTLS."""
+    ttls = dict(DEFAULT_TTLS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        table, _, seconds = item.partition("=")
+        ttls[table.strip()] = float(seconds)
+    return ttls
+
+
+def write_operations(payload: Dict[str, Any]) -> Iterable[Tuple[Dict[str, Any], int]]:
+    """(operation, index) for every write in a request or batch."""
+    operations = payload.get("operations") if payload.get("action") == "batch" else [payload]
+    for index, op in enumerate(operations or []):
+        if op.get("action") in WRITE_ACTIONS:
+            yield op, index
+
+
+# ---------------------------------------------------------------------------
+# Filter evaluation (mirrors the admin-api filter operators)
+# ---------------------------------------------------------------------------
+
+def row_matches(row: Dict[str, Any], filters: Dict[str, Any], skip: Iterable[str] = ()) -> bool:
+    """Whether a row could satisfy admin-api filters.
+
+    Errs towards True: filters on columns in skip, on columns missing from
+    the row, or with operators that can't be evaluated locally all count as
+    matching.
+    """
+    skip = set(skip)
+    for key, value in filters.items():
+        column, _, op = key.partition(".")
+        if column in skip or column not in row:
+            continue
+        if not _matches(row[column], op or "eq", value):
+            return False
+    return True
+
+
+def _matches(actual: Any, op: str, expected: Any) -> bool:
+    if op == "eq":
+        return _text(actual) == _text(expected)
+    if op == "neq":
+        return _text(actual) != _text(expected)
+    if op == "is":
+        return _text(actual) == _text(expected)
+    if op == "in":
+        return _text(actual) in {_text(v) for v in expected or []}
+    if op in ("gt", "gte", "lt", "lte"):
+        return _compare(actual, op, expected)
+    if op in ("like", "ilike") and isinstance(actual, str) and isinstance(expected, str):
+        flags = re.IGNORECASE if op == "ilike" else 0
+        return re.fullmatch(_like_pattern(expected), actual, flags | re.DOTALL) is not None
+    return True
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _compare(actual: Any, op: str, expected: Any) -> bool:
+    if actual is None or expected is None:
+        return False
+    try:
+        a, b = float(actual), float(expected)
+    except (TypeError, ValueError):
+        a, b = str(actual), str(expected)
+    if op == "gt":
+        return a > b
+    if op == "gte":
+        return a >= b
+    if op == "lt":
+        return a < b
+    return a <= b
+
+
+def _like_pattern(pattern: str) -> str:
+    parts: List[str] = []
+    for char in pattern:
+        if char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
@@ -0,0 +1,263 @@
+"""
+Incremental change feed over a project's tables.
+
+A local cache or index over project data can catch up by asking for the
+rows changed since it last looked, instead of re-reading whole tables:
+
+    changes = changes_since(project_id, ["chapters", "glossary"], watermark)
+    changes.rows["glossary"]      # rows inserted or updated since watermark
+    watermark = changes.watermark
+
+A watermark holds, per table, the (change column, id) of the last row seen.
+Tables with an updated_at column are tracked on it (kept current by the
+update_updated_at_column trigger); append-only tables on recorded_at, which
+the database sets on insert. Not created_at: the log buffer (log_buffer.py)
+stamps that when a row is queued, and the row may be written seconds - or,
+replayed after an outage, minutes - later, behind the watermark. All
+tables are read in one batch request per round of keyset pages over their
+(project_id, <change column>, id) indexes. A table missing from the
+watermark is read from the start.
+
+Deleted rows don't show up in the feed: tables that allow deletes (tactics,
+glossary, cross_refs) need an occasional full re-read to drop them.
+
+ChangeSubscriber polls the feed from a background thread and hands each
+batch of changes to its listeners; ProjectMirror keeps an in-process copy
+of the tables from them:
+
+    subscriber = ChangeSubscriber(project_id, ["glossary", "book_context"], cache=db.cache)
+    mirror = ProjectMirror(subscriber)
+    subscriber.start()
+    mirror.rows("glossary")
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .cache import ReadCache
+from .client import AdminAPIClient, db
+
+logger = logging.getLogger("bookmaker.memory")
+
+# Column each table's changes are tracked on
+CHANGE_COLUMNS = {
+    "projects": "updated_at",
+    "chapters": "updated_at",
+    "tactics": "updated_at",
+    "glossary": "updated_at",
+    "cross_refs": "updated_at",
+    "book_context": "updated_at",
+    "decisions": "recorded_at",
+    "validation_log": "recorded_at",
+    "pipeline_logs": "recorded_at",
+}
+
+# Sorts before every real id, for cursors that should include a whole timestamp
+MIN_ID = "00000000-0000-0000-0000-000000000000"
+
+Watermark = Dict[str, Dict[str, Any]]  # table -> {"value": change column value, "id": row id}
+Listener = Callable[[str, List[Dict[str, Any]]], None]
+
+
+@dataclass
+class ChangeSet:
+    """Rows changed since a watermark, and the watermark to pass next time."""
+    rows: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    watermark: Watermark = field(default_factory=dict)
+
+    def count(self) -> int:
+        return sum(len(rows) for rows in self.rows.values())
+
+
+def changes_since(
+    project_id: str,
+    tables: Optional[List[str]] = None,
+    watermark: Optional[Watermark] = None,
+    page_size: int = 500,
+    client: Optional[AdminAPIClient] = None
+) -> ChangeSet:
+    """Rows of a project inserted or updated after watermark, oldest first per table."""
+    client = client or db
+    tables = list(tables or CHANGE_COLUMNS)
+    for table in tables:
+        if table not in CHANGE_COLUMNS:
+            raise ValueError(f"Table '{table}' is not in the change feed")
+
+    result = ChangeSet(rows={table: [] for table in tables}, watermark=dict(watermark or {}))
+    remaining = tables
+    while remaining:
+        operations = [
+            {
+                "action": "select",
+                "table": table,
+                "filters": {("id.eq" if table == "projects" else "project_id.eq"): project_id},
+                "options": {
+                    "keyset": {"column": CHANGE_COLUMNS[table], "ascending": True,
+                               "after": result.watermark.get(table)},
+                    "limit": page_size,
+                },
+            }
+            for table in remaining
+        ]
+        pages = client.execute_batch(operations)
+        full = []
+        for table, page in zip(remaining, pages):
+            rows = page.get("data") or []
+            if not rows:
+                continue
+            result.rows[table].extend(rows)
+            last = rows[-1]
+            result.watermark[table] = {"value": last[CHANGE_COLUMNS[table]], "id": last["id"]}
+            if len(rows) == page_size:
+                full.append(table)
+        remaining = full
+    return result
+
+
+def _timestamp(value: str) -> datetime:
+    """Parse a change column value; naive timestamps (e.g. backfilled log rows) are UTC."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+class ChangeSubscriber:
+    """Polls changes_since for one project and passes new rows to listeners.
+
+    Each poll re-reads the last `lookback` seconds and skips rows it has
+    already delivered: change columns are set by the database at the start
+    of the writing transaction, which can commit after rows with later
+    timestamps were read, and would otherwise be missed. lookback must be
+    longer than any write transaction takes.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        tables: Optional[List[str]] = None,
+        interval: float = 5.0,
+        lookback: float = 5.0,
+        cache: Optional[ReadCache] = None,
+        client: Optional[AdminAPIClient] = None
+    ):
+        self.project_id = project_id
+        self.tables = list(tables or CHANGE_COLUMNS)
+        self.interval = interval
+        self.lookback = lookback
+        self.cache = cache
+        self.client = client
+        self.watermark: Watermark = {}
+        self._listeners: List[Listener] = []
+        # Per table: id -> change column value of rows delivered within the lookback window
+        self._seen: Dict[str, Dict[str, Any]] = {table: {} for table in self.tables}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call listener(table, rows) with every batch of new or changed rows."""
+        self._listeners.append(listener)
+
+    def poll(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch and deliver changes now. Returns the rows delivered, by table."""
+        with self._lock:
+            cursor = {table: self._rewound(mark) for table, mark in self.watermark.items()}
+            changes = changes_since(self.project_id, self.tables, cursor, client=self.client)
+            delivered: Dict[str, List[Dict[str, Any]]] = {}
+            for table, rows in changes.rows.items():
+                column = CHANGE_COLUMNS[table]
+                seen = self._seen[table]
+                fresh = [row for row in rows if seen.get(row["id"]) != row[column]]
+                for row in rows:
+                    seen[row["id"]] = row[column]
+                if rows:
+                    mark = changes.watermark[table]
+                    if self._after(mark, self.watermark.get(table)):
+                        self.watermark[table] = mark
+                    self._forget_before(table)
+                if fresh:
+                    delivered[table] = fresh
+
+            for table, rows in delivered.items():
+                if self.cache is not None:
+                    self.cache.invalidate_table(table)
+                for listener in self._listeners:
+                    try:
+                        listener(table, rows)
+                    except Exception as e:
+                        logger.error("Change listener failed for %s: %s", table, e)
+            return delivered
+
+    def start(self) -> None:
+        """Poll every interval seconds from a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Change feed poll for project %s failed: %s", self.project_id, e)
+            self._wake.wait(self.interval)
+
+    def _rewound(self, mark: Dict[str, Any]) -> Dict[str, Any]:
+        """The cursor lookback seconds before mark."""
+        if not self.lookback or mark.get("value") is None:
+            return mark
+        value = _timestamp(mark["value"]) - timedelta(seconds=self.lookback)
+        return {"value": value.isoformat(), "id": MIN_ID}
+
+    def _forget_before(self, table: str) -> None:
+        """Drop seen rows older than the lookback window."""
+        mark = self.watermark.get(table)
+        if mark is None or mark.get("value") is None:
+            return
+        cutoff = _timestamp(self._rewound(mark)["value"])
+        seen = self._seen[table]
+        for row_id, value in list(seen.items()):
+            if value is not None and _timestamp(value) < cutoff:
+                del seen[row_id]
+
+    @staticmethod
+    def _after(mark: Dict[str, Any], other: Optional[Dict[str, Any]]) -> bool:
+        if other is None or other.get("value") is None:
+            return True
+        if mark.get("value") is None:
+            return False
+        return (_timestamp(mark["value"]), mark["id"]) > (_timestamp(other["value"]), other["id"])
+
+
+class ProjectMirror:
+    """In-process copy of a project's tables, kept current by a ChangeSubscriber."""
+
+    def __init__(self, subscriber: ChangeSubscriber):
+        self._tables: Dict[str, Dict[str, Dict[str, Any]]] = {table: {} for table in subscriber.tables}
+        self._lock = threading.Lock()
+        subscriber.subscribe(self.apply)
+
+    def apply(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            mirror = self._tables.setdefault(table, {})
+            for row in rows:
+                mirror[row["id"]] = row
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        """Every mirrored row of a table."""
+        with self._lock:
+            return list(self._tables.get(table, {}).values())
+
+    def get(self, table: str, row_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._tables.get(table, {}).get(row_id)
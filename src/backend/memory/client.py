@@ -1,26 +1,220 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
 import requests
-from typing import Dict, Any, List, Optional, Union
+
 from ..config import config
+from .transport import PooledTransport, TransportStats
+from .protocol import is_local_url
+from .batch import Batch
+from .bulk import ChunkPolicy
+from .retry import RetryPolicy, is_transient
+from .codec import codec
+from .compression import Compression, CompressionStats
+from .singleflight import SingleFlight, FlightStats
+from .metrics import current_call, metrics
+from .journal import WriteJournal, get_write_journal, queued_result
+from .cache import READ_ACTIONS, ReadCache, CacheStats, parse_ttls
+
+logger = logging.getLogger("bookmaker.memory")
 
 
 class AdminAPIError(Exception):
     """Exception raised when Admin API returns an error."""
-    def __init__(self, code: str, message: str):
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        index: Optional[int] = None,
+        data: Any = None,
+        status: Optional[int] = None
+    ):
         self.code = code
         self.message = message
+        self.status = status
+        # For batch requests: failing operation index and results that landed
+        self.index = index
+        self.data = data
         super().__init__(f"{code}: {message}")
 
 
+class BulkInsertError(AdminAPIError):
+    """Some chunks of an insert_many() failed.
+
+    inserted holds the rows that landed, in input order, and failed the
+    input positions of the rows that didn't; errors has one error per
+    failed chunk.
+    """
+    def __init__(
+        self,
+        errors: List[AdminAPIError],
+        inserted: List[Dict[str, Any]],
+        failed: List[int]
+    ):
+        first = errors[0]
+        super().__init__(
+            first.code,
+            f"{len(failed)} rows in {len(errors)} chunk(s) failed: {first.message}",
+            data=inserted,
+            status=first.status
+        )
+        self.errors = errors
+        self.inserted = inserted
+        self.failed = failed
+
+
+def build_payload(
+    action: str,
+    table: str,
+    data: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the JSON body for an Admin API request."""
+    payload = {
+        "action": action,
+        "table": table
+    }
+    if data is not None:
+        payload["data"] = data
+    if filters is not None:
+        payload["filters"] = filters
+    if options is not None:
+        payload["options"] = options
+    return payload
+
+
+def with_columns(
+    options: Optional[Dict[str, Any]],
+    columns: Optional[List[str]]
+) -> Optional[Dict[str, Any]]:
+    """Add a column projection to select options."""
+    if not columns:
+        return options
+    return {**(options or {}), "columns": list(columns)}
+
+
+def keyset_options(
+    order_by: str,
+    ascending: bool,
+    page_size: int,
+    after: Optional[Dict[str, Any]],
+    columns: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Build select options for one page of a keyset-paginated scan."""
+    options: Dict[str, Any] = {
+        "keyset": {"column": order_by, "ascending": ascending, "after": after},
+        "limit": page_size
+    }
+    if columns:
+        # The cursor needs the ordering column and id from every row
+        options["columns"] = list(dict.fromkeys([*columns, order_by, "id"]))
+    return options
+
+
+def check_result(result: Dict[str, Any], status: Optional[int] = None) -> Dict[str, Any]:
+    """Raise AdminAPIError if the Admin API reported a failure."""
+    if not result.get("success", False):
+        error = result.get("error") or {}
+        raise AdminAPIError(
+            code=error.get("code", "UNKNOWN_ERROR"),
+            message=error.get("message", "Unknown error occurred"),
+            index=error.get("index"),
+            data=result.get("data"),
+            status=status
+        )
+    return result
+
+
+def parse_response(status: int, body: Any) -> Dict[str, Any]:
+    """Decode an Admin API response body and check it for errors.
+
+    body is a zero-argument callable returning the decoded JSON, so
+    gateway errors that aren't JSON (e.g. an HTML 502) become an
+    AdminAPIError carrying the HTTP status.
+    """
+    try:
+        result = body()
+    except ValueError:
+        raise AdminAPIError(
+            code="BAD_RESPONSE",
+            message=f"Non-JSON response from Admin API (HTTP {status})",
+            status=status
+        )
+    if not isinstance(result, dict):
+        raise AdminAPIError(
+            code="BAD_RESPONSE",
+            message=f"Unexpected response from Admin API (HTTP {status})",
+            status=status
+        )
+    return check_result(result, status)
+
+
+def merge_chunks(
+    chunks: List[Tuple[int, List[Dict[str, Any]]]],
+    outcomes: List[Any]
+) -> List[Dict[str, Any]]:
+    """Concatenate per-chunk insert results in order, or raise BulkInsertError."""
+    inserted: List[Dict[str, Any]] = []
+    failed: List[int] = []
+    errors: List[AdminAPIError] = []
+    for (start, rows), outcome in zip(chunks, outcomes):
+        if isinstance(outcome, AdminAPIError):
+            failed.extend(range(start, start + len(rows)))
+            errors.append(outcome)
+        else:
+            inserted.extend(outcome if isinstance(outcome, list) else [outcome])
+    if errors:
+        raise BulkInsertError(errors, inserted, failed)
+    return inserted
+
+
+def single_row(data: Any) -> Optional[Dict[str, Any]]:
+    """Normalize a single-select result to one row or None."""
+    # Handle both single object and array with one item
+    if isinstance(data, list):
+        return data[0] if data else None
+    return data
+
+
 class AdminAPIClient:
     """Client for the admin-api Edge Function."""
 
-    def __init__(self, url: str, secret: str):
+    def __init__(
+        self,
+        url: str,
+        secret: str,
+        transport: Optional[PooledTransport] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[ReadCache] = None,
+        coalesce: bool = True,
+        compression: Optional[Compression] = None,
+        chunking: Optional[ChunkPolicy] = None,
+        journal: Optional[WriteJournal] = None
+    ):
         self.url = url
         self.secret = secret
+        self.compression = compression or Compression()
         self.headers = {
             "Authorization": f"Bearer {secret}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Accept-Encoding": self.compression.accept_encoding
         }
+        self.transport = transport or PooledTransport()
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.flights = SingleFlight() if coalesce else None
+        self.chunking = chunking or ChunkPolicy()
+        # Sends insert_many chunks; created on first use, shared by all calls
+        self._bulk_pool: Optional[ThreadPoolExecutor] = None
+        self._bulk_lock = threading.Lock()
+        self.journal = journal
+        if journal is not None:
+            journal.attach(self._replay)
 
     def _request(
         self,
@@ -31,58 +225,172 @@ class AdminAPIClient:
         options: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Make a request to the Admin API."""
-        payload = {
-            "action": action,
-            "table": table
-        }
-        if data is not None:
-            payload["data"] = data
-        if filters is not None:
-            payload["filters"] = filters
-        if options is not None:
-            payload["options"] = options
-
-        response = requests.post(self.url, json=payload, headers=self.headers)
-
-        # Parse response
-        result = response.json()
-
-        if not result.get("success", False):
-            error = result.get("error", {})
-            raise AdminAPIError(
-                code=error.get("code", "UNKNOWN_ERROR"),
-                message=error.get("message", "Unknown error occurred")
-            )
+        return self._send(build_payload(action, table, data, filters, options))
+
+    def _send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request body, serving reads from the cache and invalidating on writes."""
+        with metrics.track(payload.get("action", ""), payload.get("table", "*")):
+            if payload.get("action") in READ_ACTIONS:
+                return self._read(payload)
+            deliver = self._deliver if self.journal is None else self._deliver_journaled
+            try:
+                result = deliver(payload)
+            except AdminAPIError:
+                self._after_write(payload, None)
+                raise
+            self._after_write(payload, result)
+            return result
+
+    def _after_write(self, payload: Dict[str, Any], result: Optional[Dict[str, Any]]) -> None:
+        """Invalidate cached reads and end read flights that may predate a write."""
+        if self.flights is not None:
+            self.flights.after_write(payload)
+        if self.cache is not None:
+            self.cache.after_write(payload, result)
+
+    def _read(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a read from the cache, or share an identical in-flight request."""
+        call = current_call()
+        token = 0
+        use_cache = self.cache is not None and self.cache.cacheable(payload)
+        if use_cache:
+            cached, token = self.cache.get(payload)
+            if cached is not None:
+                call.source = "cache"
+                return cached
+
+        def fetch() -> Dict[str, Any]:
+            call.source = "api"
+            result = self._deliver(payload)
+            if use_cache:
+                self.cache.put(payload, result, token)
+            return result
+
+        if self.flights is None:
+            return fetch()
+        # Followers never run fetch, so they stay marked as shared
+        call.source = "shared"
+        return self.flights.do(self.flights.key(payload), fetch)
+
+    def _deliver(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a request body to the Admin API, retrying transient failures."""
+        payload = self.retry.prepare(payload)
+        attempt = 0
+        while True:
+            try:
+                return self._post(payload if attempt == 0 else self.retry.for_retry(payload))
+            except AdminAPIError as e:
+                if not self.retry.should_retry(payload, e, attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Admin API %s %s failed (%s), retry %d/%d in %.1fs",
+                    payload.get("action"), payload.get("table", ""), e,
+                    attempt, self.retry.max_retries, delay
+                )
+                time.sleep(delay)
 
+    def _deliver_journaled(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a write in the journal, then send it or leave it queued for replay."""
+        payload = self.retry.prepare(payload)
+        entry = self.journal.append(payload)
+        if not entry.queued:
+            try:
+                result = self._deliver(payload)
+            except AdminAPIError as e:
+                if not is_transient(e):
+                    self.journal.done(entry)
+                    raise
+                self.journal.defer(entry, e)
+            else:
+                self.journal.done(entry)
+                return result
+        current_call().source = "journal"
+        return queued_result(payload)
+
+    def _replay(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a journaled write (see journal.py)."""
+        result = self._deliver(self.retry.for_retry(payload))
+        # Reads cached or in flight while the write was queued may predate it
+        self._after_write(payload, None)
         return result
 
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and check the result."""
+        call = current_call()
+        try:
+            body, body_headers = self.compression.encode(payload)
+            if call is not None:
+                call.attempts += 1
+                call.request_bytes += len(body)
+            response = self.transport.post(
+                self.url, data=body, headers={**self.headers, **body_headers}
+            )
+            content = response.content
+        except requests.Timeout as e:
+            raise AdminAPIError("TIMEOUT", str(e)) from e
+        except requests.RequestException as e:
+            raise AdminAPIError("NETWORK_ERROR", str(e)) from e
+        # raw.tell() counts bytes off the wire, before gzip decoding
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else len(content)
+        if call is not None:
+            call.response_bytes += wire
+        self.compression.record_response(
+            len(content), wire, "gzip" in response.headers.get("Content-Encoding", "")
+        )
+        return parse_response(response.status_code, lambda: codec.decode(content))
+
     def select(
         self,
         table: str,
         filters: Optional[Dict[str, Any]] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Select records from a table."""
+        """Select records from a table, optionally only the given columns."""
+        options = with_columns(options, columns)
         result = self._request("select", table, filters=filters, options=options)
         return result.get("data", [])
 
+    def iter_select(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: str = "created_at",
+        page_size: int = 500,
+        ascending: bool = True,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream all matching records, one page at a time.
+
+        Pages are walked by keyset on (order_by, id), so each page is an
+        indexed range scan no matter how deep into the table it is.
+        """
+        after = None
+        while True:
+            options = keyset_options(order_by, ascending, page_size, after, columns)
+            page = self._request("select", table, filters=filters, options=options).get("data") or []
+            yield from page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            after = {"value": last[order_by], "id": last["id"]}
+
     def select_single(
         self,
         table: str,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
     ) -> Optional[Dict[str, Any]]:
-        """Select a single record from a table."""
+        """Select a single record from a table, optionally only the given columns."""
         result = self._request(
             "select",
             table,
             filters=filters,
-            options={"single": True}
+            options=with_columns({"single": True}, columns)
         )
-        data = result.get("data")
-        # Handle both single object and array with one item
-        if isinstance(data, list):
-            return data[0] if data else None
-        return data
+        return single_row(result.get("data"))
 
     def insert(
         self,
@@ -93,6 +401,56 @@ class AdminAPIClient:
         result = self._request("insert", table, data=data)
         return result.get("data", [])
 
+    def insert_many(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows in size-bounded chunks, several at a time (see bulk.py).
+
+        Returns the inserted rows in input order. Raises BulkInsertError if
+        any chunk fails.
+        """
+        chunks = self.chunking.chunks(list(rows))
+
+        def send(chunk: List[Dict[str, Any]]) -> Any:
+            try:
+                return self.insert(table, chunk)
+            except AdminAPIError as e:
+                return e
+
+        if len(chunks) <= 1:
+            return merge_chunks(chunks, [send(chunk) for _, chunk in chunks])
+        pool = self._bulk_executor()
+        # Each chunk runs in a copy of this context so metrics stay attributed
+        futures = [pool.submit(contextvars.copy_context().run, send, chunk) for _, chunk in chunks]
+        return merge_chunks(chunks, [future.result() for future in futures])
+
+    def _bulk_executor(self) -> ThreadPoolExecutor:
+        """The long-lived pool chunks are sent on, at most chunking.parallelism at once.
+
+        Its threads live as long as the client, so they keep reusing the
+        transport's pooled connections.
+        """
+        with self._bulk_lock:
+            if self._bulk_pool is None:
+                self._bulk_pool = ThreadPoolExecutor(
+                    max_workers=max(self.chunking.parallelism, 1),
+                    thread_name_prefix="insert-many"
+                )
+            return self._bulk_pool
+
+    def upsert(
+        self,
+        table: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]],
+        on_conflict: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Insert records, or update them where they collide on on_conflict.
+
+        on_conflict names the unique column(s), comma-separated; defaults
+        to the primary key.
+        """
+        options = {"onConflict": on_conflict} if on_conflict else None
+        result = self._request("upsert", table, data=data, options=options)
+        return result.get("data", [])
+
     def update(
         self,
         table: str,
@@ -103,6 +461,25 @@ class AdminAPIClient:
         result = self._request("update", table, data=data, filters=filters)
         return result.get("data", [])
 
+    def patch(
+        self,
+        table: str,
+        filters: Dict[str, Any],
+        data: Optional[Dict[str, Any]] = None,
+        patches: Optional[Dict[str, List[List[Any]]]] = None,
+        if_updated_at: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Update one row, applying text edits to it server-side (see delta.py).
+
+        With if_updated_at the write only happens if the row's updated_at
+        still matches; otherwise AdminAPIError CONFLICT is raised.
+        """
+        options: Dict[str, Any] = {"patches": patches or {}}
+        if if_updated_at is not None:
+            options["ifUpdatedAt"] = if_updated_at
+        result = self._request("patch", table, data=data or {}, filters=filters, options=options)
+        return result.get("data", [])
+
     def delete(
         self,
         table: str,
@@ -112,12 +489,143 @@ class AdminAPIClient:
         result = self._request("delete", table, filters=filters)
         return result.get("data", [])
 
+    def count(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Count matching records without transferring them."""
+        result = self._request("count", table, filters=filters)
+        return result.get("count") or 0
+
+    def aggregate(
+        self,
+        table: str,
+        group_by: List[str],
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Count matching records per distinct value of the group_by columns.
+
+        Returns one dict per group with the group_by values and a "count".
+        """
+        result = self._request(
+            "aggregate",
+            table,
+            filters=filters,
+            options={"groupBy": list(group_by)}
+        )
+        return result.get("data") or []
+
+    def context(
+        self,
+        project_id: str,
+        chapter_id: Optional[str] = None,
+        parts: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch an agent's starting context in one request.
+
+        Returns {part: data} for the requested parts (see CONTEXT_PARTS in
+        protocol.py; default: all of them, "chapter" only when
+        chapter_id is given). book_context comes back as {key: value},
+        limited to keys when given.
+        """
+        data: Dict[str, Any] = {"project_id": project_id}
+        if chapter_id is not None:
+            data["chapter_id"] = chapter_id
+        if parts is not None:
+            data["parts"] = list(parts)
+        if keys is not None:
+            data["keys"] = list(keys)
+        result = self._send({"action": "context", "data": data})
+        return result.get("data") or {}
+
+    def execute_batch(
+        self,
+        operations: List[Dict[str, Any]],
+        transaction: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Run several operations in one request. Returns one result per operation."""
+        result = self._send({
+            "action": "batch",
+            "operations": operations,
+            "transaction": transaction
+        })
+        return result.get("data") or []
+
+    def batch(self, transaction: bool = False) -> Batch:
+        """Queue operations and send them together when the block exits."""
+        return Batch(self, transaction)
+
+    def transport_stats(self) -> TransportStats:
+        """Connection reuse counters for this client's pooled transport."""
+        return self.transport.stats()
+
+    def flight_stats(self) -> Optional[FlightStats]:
+        """Reads sent versus shared with an identical in-flight read."""
+        return self.flights.stats() if self.flights is not None else None
+
+    def compression_stats(self) -> CompressionStats:
+        """Bytes before and after compression, both directions."""
+        return self.compression.stats()
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Hit/miss counters for the read cache, or None when caching is off."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def close(self) -> None:
+        """Release pooled connections and the bulk insert threads."""
+        with self._bulk_lock:
+            pool, self._bulk_pool = self._bulk_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self.transport.close()
+
 
 def get_admin_client() -> AdminAPIClient:
     """Get Admin API client instance."""
     if config is None:
         raise RuntimeError("Config not initialized - ensure environment variables are set")
-    return AdminAPIClient(config.admin_api_url, config.admin_api_secret)
+    if is_local_url(config.admin_api_url):
+        # sqlite:// runs the admin-api protocol in-process (local_backend.py)
+        from .local_backend import LocalTransport, get_local_api
+        transport = LocalTransport(get_local_api(config.admin_api_url))
+    else:
+        transport = PooledTransport(
+            pool_size=config.admin_api_pool_size,
+            connect_timeout=config.admin_api_connect_timeout,
+            read_timeout=config.admin_api_read_timeout,
+            keep_alive=config.admin_api_keep_alive,
+        )
+    retry = RetryPolicy(
+        max_retries=config.admin_api_max_retries,
+        base_delay=config.admin_api_retry_base_delay,
+        max_delay=config.admin_api_retry_max_delay,
+    )
+    compression = Compression(
+        enabled=config.admin_api_compression,
+        threshold=config.admin_api_compress_threshold,
+    )
+    cache = None
+    if config.admin_api_cache_enabled:
+        cache = ReadCache(
+            ttls=parse_ttls(config.admin_api_cache_ttls),
+            max_bytes=config.admin_api_cache_max_bytes,
+        )
+    return AdminAPIClient(
+        config.admin_api_url,
+        config.admin_api_secret,
+        transport=transport,
+        retry=retry,
+        cache=cache,
+        compression=compression,
+        chunking=ChunkPolicy(
+            max_rows=config.admin_api_bulk_max_rows,
+            max_bytes=config.admin_api_bulk_max_bytes,
+            parallelism=config.admin_api_bulk_parallelism,
+        ),
+        journal=get_write_journal(),
+    )
 
 
 # Initialize client - will be None if config not available
@@ -0,0 +1,110 @@
+"""
+JSON codec for Admin API payloads and memory tool results.
+
+Chapter rows carry full English and Spanish text, so encoding request
+bodies, decoding responses and serializing tool results shows up in
+profiles on the agent threads. This module picks the fastest available
+backend:
+
+- orjson when it is installed (pip install orjson),
+- the stdlib json module otherwise.
+
+Both produce the same compact output: no whitespace, non-ASCII text kept
+as UTF-8 rather than \\u escapes, and anything not natively serializable
+written with str(). JSON_CODEC=stdlib forces the fallback.
+
+    from backend.memory.codec import codec
+
+    body = codec.encode(payload)        # bytes
+    result = codec.decode(response.content)
+    text = codec.dumps(row, drop_nulls=True, drop_columns=BOOKKEEPING_COLUMNS)
+"""
+
+import json
+from typing import Any, Iterable, Optional, Union
+
+from ..config import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Columns every table carries that agents never need to see
+BOOKKEEPING_COLUMNS = frozenset({"created_at", "updated_at"})
+
+
+def prune(value: Any, drop_nulls: bool = False, drop_columns: Iterable[str] = ()) -> Any:
+    """Copy of value with null fields and/or the given columns removed from every object."""
+    drop_columns = frozenset(drop_columns)
+    if not drop_nulls and not drop_columns:
+        return value
+
+    def walk(item: Any) -> Any:
+        if isinstance(item, dict):
+            return {
+                k: walk(v) for k, v in item.items()
+                if k not in drop_columns and not (drop_nulls and v is None)
+            }
+        if isinstance(item, list):
+            return [walk(v) for v in item]
+        return item
+
+    return walk(value)
+
+
+class StdlibCodec:
+    """Compact JSON through the stdlib json module."""
+
+    name = "stdlib"
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def encode(self, value: Any) -> bytes:
+        return self._encoder.encode(value).encode("utf-8")
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        # json.loads detects the encoding of bytes itself
+        return json.loads(data)
+
+    def dumps(self, value: Any, drop_nulls: bool = False, drop_columns: Iterable[str] = ()) -> str:
+        return self._encoder.encode(prune(value, drop_nulls, drop_columns))
+
+
+class OrjsonCodec:
+    """Compact JSON through orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        # Datetimes and dataclasses go through str() like the stdlib codec
+        self._option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=self._option)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, value: Any, drop_nulls: bool = False, drop_columns: Iterable[str] = ()) -> str:
+        return self.encode(prune(value, drop_nulls, drop_columns)).decode("utf-8")
+
+
+def get_codec(name: Optional[str] = None) -> Union[StdlibCodec, OrjsonCodec]:
+    """Codec by name: "orjson", "stdlib" or "auto" (orjson if installed)."""
+    if name is None:
+        name = config.json_codec if config is not None else "auto"
+    if name == "stdlib":
+        return StdlibCodec()
+    if name not in ("auto", "orjson"):
+        raise ValueError(f"Unknown JSON codec: {name}")
+    if orjson is None:
+        if name == "orjson":
+            raise ImportError("JSON_CODEC=orjson but orjson is not installed")
+        return StdlibCodec()
+    return OrjsonCodec()
+
+
+# Shared codec used by the memory clients, cache and tools
+codec = get_codec()
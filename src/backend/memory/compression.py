@@ -0,0 +1,87 @@
+"""
+Request/response compression for the Admin API client.
+
+Chapter rows carry full English and Spanish text, so chapter reads and
+writes dominate traffic to the Edge Function and compress 4-6x. Request
+bodies at or above a size threshold are gzipped (Content-Encoding: gzip),
+and responses are requested with Accept-Encoding: gzip; admin-api
+compresses large responses and the HTTP library transparently decodes
+them. Small bodies are sent as-is since compressing them costs more than it
+saves.
+
+CompressionStats accounts for bytes before and after compression in both
+directions so the savings can be checked in production.
+"""
+
+import gzip
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Tuple
+
+from .codec import codec
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass
+class CompressionStats:
+    """Byte counts before (raw) and after (wire) compression."""
+    requests_compressed: int = 0
+    request_raw_bytes: int = 0
+    request_wire_bytes: int = 0
+    responses_compressed: int = 0
+    response_raw_bytes: int = 0
+    response_wire_bytes: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return (
+            self.request_raw_bytes - self.request_wire_bytes
+            + self.response_raw_bytes - self.response_wire_bytes
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        data = asdict(self)
+        data["bytes_saved"] = self.bytes_saved
+        return data
+
+
+class Compression:
+    """Encodes request bodies and tallies compression savings."""
+
+    def __init__(self, enabled: bool = True, threshold: int = 1024, level: int = 6):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.level = level
+        self._lock = threading.Lock()
+        self._stats = CompressionStats()
+
+    @property
+    def accept_encoding(self) -> str:
+        return "gzip" if self.enabled else "identity"
+
+    def encode(self, payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        """Serialize a request body, gzipping it if it's large enough."""
+        body = codec.encode(payload)
+        if not self.enabled or len(body) < self.threshold:
+            self.record_request(len(body), len(body), False)
+            return body, JSON_HEADERS
+        compressed = gzip.compress(body, compresslevel=self.level)
+        self.record_request(len(body), len(compressed), True)
+        return compressed, {**JSON_HEADERS, "Content-Encoding": "gzip"}
+
+    def record_request(self, raw: int, wire: int, compressed: bool) -> None:
+        with self._lock:
+            self._stats.requests_compressed += int(compressed)
+            self._stats.request_raw_bytes += raw
+            self._stats.request_wire_bytes += wire
+
+    def record_response(self, raw: int, wire: int, compressed: bool) -> None:
+        with self._lock:
+            self._stats.responses_compressed += int(compressed)
+            self._stats.response_raw_bytes += raw
+            self._stats.response_wire_bytes += wire
+
+    def stats(self) -> CompressionStats:
+        with self._lock:
+            return CompressionStats(**asdict(self._stats))
@@ -0,0 +1,140 @@
+"""
+Field-level delta writes.
+
+Phase 6 editors rewrite a few sentences of a chapter but hand back the whole
+text field, so a plain update re-uploads tens of kilobytes per edit. A
+patch sends only the changed spans of each large text field, as edits
+against the version of the row the agent read:
+
+    {"action": "patch", "table": "chapters",
+     "filters": {"id.eq": chapter_id},
+     "data": {"current_phase": 6},                       # plain column values
+     "options": {"ifUpdatedAt": "2024-05-02T11:30:00+00:00",
+                 "patches": {"edited_text": [[120, 134, "a new sentence"], ...]}}}
+
+Each edit is [start, end, text]: replace characters start..end of the base
+text with text. Offsets are in Unicode code points, edits are sorted and
+don't overlap. admin-api applies the edits to the stored row and writes it
+only if updated_at still equals ifUpdatedAt; otherwise the request fails
+with CONFLICT (HTTP 409) and nothing is written, so concurrent editors
+can't silently overwrite each other.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Tuple
+
+# Text fields shorter than this are sent whole
+PATCH_MIN_CHARS = 1024
+
+# Texts are diffed sentence by sentence, then word by word inside changed
+# sentences: character diffs of a chapter are too slow, and a single token
+# diff of a whole chapter finds no anchors (SequenceMatcher treats common
+# words as junk)
+SENTENCE = re.compile(r"[^.!?\n]+[.!?\n]*\s*|[.!?\n]+\s*")
+TOKEN = re.compile(r"\w+|\s+|[^\w\s]+")
+
+# Token diffs of longer runs fall back to SequenceMatcher's junk heuristic
+MAX_EXACT_TOKENS = 2000
+
+Edit = List[Any]  # [start, end, text]
+
+
+def text_edits(old: str, new: str) -> List[Edit]:
+    """Edits that turn old into new (see apply_edits)."""
+    if old == new:
+        return []
+    # Trim the common prefix and suffix before diffing what's left
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_mid = old[prefix:len(old) - suffix]
+    new_mid = new[prefix:len(new) - suffix]
+
+    edits: List[Edit] = []
+    for start, end, text in _diff(SENTENCE.findall(old_mid), SENTENCE.findall(new_mid)):
+        if start < end and text:
+            # A rewritten run of sentences: narrow it down to the changed words
+            edits.extend(_diff(TOKEN.findall(old_mid[start:end]), TOKEN.findall(text), start))
+        else:
+            edits.append([start, end, text])
+    for edit in edits:
+        edit[0] += prefix
+        edit[1] += prefix
+    return edits
+
+
+def _diff(a: List[str], b: List[str], base: int = 0) -> List[Edit]:
+    """Edits between two token lists, with offsets into "".join(a) plus base."""
+    a_offsets = _offsets(a, base)
+    b_offsets = _offsets(b, 0)
+    new = "".join(b)
+    matcher = SequenceMatcher(None, a, b, autojunk=max(len(a), len(b)) > MAX_EXACT_TOKENS)
+    return [
+        [a_offsets[i1], a_offsets[i2], new[b_offsets[j1]:b_offsets[j2]]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _offsets(tokens: List[str], start: int) -> List[int]:
+    """Start offset of every token, plus the end offset of the last."""
+    offsets = [start]
+    for token in tokens:
+        offsets.append(offsets[-1] + len(token))
+    return offsets
+
+
+def apply_edits(text: str, edits: List[Edit]) -> str:
+    """Apply [start, end, text] edits to text. Raises ValueError if they don't fit."""
+    parts: List[str] = []
+    pos = 0
+    for edit in edits:
+        if not isinstance(edit, (list, tuple)) or len(edit) != 3:
+            raise ValueError("Patch edits must be [start, end, text]")
+        start, end, replacement = edit
+        if (
+            not isinstance(start, int) or not isinstance(end, int) or not isinstance(replacement, str)
+            or start < pos or end < start or end > len(text)
+        ):
+            raise ValueError(f"Patch edit out of order or out of range: [{start}, {end}]")
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def edits_size(edits: List[Edit]) -> int:
+    """Rough serialized size of a list of edits, in characters."""
+    return sum(len(text) + 16 for _, _, text in edits)
+
+
+def build_patch(
+    base: Dict[str, Any],
+    changes: Dict[str, Any],
+    min_chars: int = PATCH_MIN_CHARS
+) -> Tuple[Dict[str, Any], Dict[str, List[Edit]]]:
+    """Split changes to a row read as base into (plain values, text patches).
+
+    Fields equal to their base value are dropped. Large text fields become
+    edits when the edits are smaller than the new text; everything else is
+    sent as a plain value.
+    """
+    data: Dict[str, Any] = {}
+    patches: Dict[str, List[Edit]] = {}
+    for field, value in changes.items():
+        old = base.get(field)
+        if field in base and old == value:
+            continue
+        if isinstance(old, str) and isinstance(value, str) and len(value) >= min_chars:
+            edits = text_edits(old, value)
+            if edits_size(edits) < len(value) // 2:
+                patches[field] = edits
+                continue
+        data[field] = value
+    return data, patches
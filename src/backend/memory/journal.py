@@ -0,0 +1,363 @@
+"""
+Write-ahead journal for memory writes.
+
+Without it, a write made while admin-api is briefly unreachable fails once
+the client's retries run out, the agent gets a tool error, and the LLM work
+behind the write is often lost. With MEMORY_JOURNAL_ENABLED=true every
+write is first appended (and fsynced) to a local journal file, then sent:
+
+- if it lands, it is marked done in the journal;
+- if it fails transiently, it stays in the journal, the caller gets a
+  success result marked "queued": true, and a background thread replays
+  it once the API answers again;
+- if it is rejected outright, it is marked done and the error is raised
+  as usual.
+
+While anything is waiting to be replayed, later writes are queued behind
+it rather than sent. A write also waits for earlier writes to the same
+table that are still in flight: if one of them fails and is deferred, the
+later write is queued behind it instead of overtaking it. Writes to a table
+therefore reach the database in the order they were made; writes to
+different tables made at the same time are not ordered. Reads are not held
+back: until the queue drains they don't see queued writes.
+
+Replays are idempotent: inserts carry client-generated ids and are resent
+as upserts on id (see retry.py), the same as client retries. A replayed
+write the API rejects is moved to a ".rejected.jsonl" file next to the
+journal. Patches keep their updated_at precondition, so one that landed
+before a crash, or that lost a race while queued, ends up there too.
+
+Entries still pending when the process exits are replayed by recover(),
+which the API server runs at startup:
+
+    python -m backend.memory.journal recover
+
+A journal file belongs to one process: the journal holds an exclusive lock
+on "<name>.lock" next to it for as long as it is open, and refuses to
+start (JournalLockedError) while another process holds it. Run each
+worker with its own MEMORY_JOURNAL_PATH, and stop the server before
+running recover by hand.
+"""
+
+import argparse
+import fcntl
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..config import config
+from .cache import write_operations
+from .codec import codec
+from .retry import is_transient
+
+logger = logging.getLogger("bookmaker.memory")
+
+DEFAULT_JOURNAL_PATH = Path(__file__).parent.parent.parent.parent / "logs" / "memory_journal.jsonl"
+
+
+class JournalLockedError(RuntimeError):
+    """Another process has the journal file open."""
+
+
+@dataclass
+class JournalEntry:
+    """A write recorded in the journal."""
+    seq: int
+    payload: Dict[str, Any]
+    # True if it was queued behind earlier writes instead of being sent
+    queued: bool = False
+
+
+def queued_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The response returned for a write that was queued for replay.
+
+    Inserts and upserts report the rows as sent (ids included); other
+    writes report no rows, since the stored values aren't known yet.
+    """
+    def rows(op: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if op.get("action") not in ("insert", "upsert"):
+            return []
+        data = op.get("data")
+        return data if isinstance(data, list) else [data]
+
+    if payload.get("action") == "batch":
+        data: Any = [{"data": rows(op)} for op in payload.get("operations") or []]
+    else:
+        data = rows(payload)
+    return {"success": True, "data": data, "queued": True}
+
+
+class WriteJournal:
+    """Append-only log of writes, replayed in order by a background thread."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        fsync: bool = True,
+        retry_interval: float = 5.0
+    ):
+        self.path = Path(path) if path else DEFAULT_JOURNAL_PATH
+        self.fsync = fsync
+        self.retry_interval = retry_interval
+        self._send: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self._lock = threading.Lock()
+        # Signalled when an in-flight write is done or deferred
+        self._resolved = threading.Condition(self._lock)
+        self._replay_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Entries not yet done (in flight or waiting), and those waiting for replay
+        self._open: Dict[int, Dict[str, Any]] = {}
+        self._waiting: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_seq = 1
+        self.writes_queued = 0
+        self.writes_replayed = 0
+        self.writes_rejected = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = self._acquire()
+        self._load()
+        self._file = open(self.path, "ab")
+
+    def attach(self, send: Callable[[Dict[str, Any]], Any]) -> None:
+        """Set the function used to replay a write (raises AdminAPIError on failure)."""
+        self._send = send
+
+    def append(self, payload: Dict[str, Any]) -> JournalEntry:
+        """Record a write before it is sent.
+
+        Blocks while earlier writes to the same tables are in flight. If
+        earlier writes are waiting for replay, the entry is queued behind
+        them and the caller must not send it (entry.queued is True).
+        """
+        tables = _tables(payload)
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._write({"seq": seq, "payload": payload})
+            self._open[seq] = payload
+            self._resolved.wait_for(lambda: not self._in_flight_before(seq, tables))
+            queued = bool(self._waiting)
+            if queued:
+                self._waiting[seq] = payload
+                self.writes_queued += 1
+        if queued:
+            self._ensure_thread()
+        return JournalEntry(seq, payload, queued)
+
+    def done(self, entry: JournalEntry) -> None:
+        """Mark a write as finished: it landed, or was rejected and reported to the caller."""
+        with self._lock:
+            self._finish(entry.seq)
+
+    def defer(self, entry: JournalEntry, error: Exception) -> None:
+        """Keep a write that failed transiently for replay."""
+        logger.warning(
+            "Admin API unreachable, queued %s %s for replay: %s",
+            entry.payload.get("action"), entry.payload.get("table", ""), error
+        )
+        with self._lock:
+            self._waiting[entry.seq] = entry.payload
+            # Keep replay order equal to the order writes were made
+            self._waiting = OrderedDict(sorted(self._waiting.items()))
+            self.writes_queued += 1
+            self._resolved.notify_all()
+        self._ensure_thread()
+        self._wake.set()
+
+    def pending(self) -> int:
+        """Writes waiting for replay."""
+        return len(self._waiting)
+
+    def replay(self) -> int:
+        """Send waiting writes in order until the queue is empty or the API is unreachable.
+
+        Returns the number of writes replayed.
+        """
+        if self._send is None:
+            raise RuntimeError("Write journal has no client attached")
+        replayed = 0
+        with self._replay_lock:
+            while True:
+                with self._lock:
+                    if not self._waiting:
+                        return replayed
+                    seq, payload = next(iter(self._waiting.items()))
+                try:
+                    self._send(payload)
+                except Exception as e:
+                    if is_transient(e):
+                        return replayed
+                    self._reject(payload, e)
+                else:
+                    replayed += 1
+                    self.writes_replayed += 1
+                with self._lock:
+                    self._waiting.pop(seq, None)
+                    self._finish(seq)
+
+    def recover(self) -> int:
+        """Replay writes left over from a previous process. Returns the number replayed."""
+        waiting = self.pending()
+        if not waiting:
+            return 0
+        logger.info("Replaying %d journaled writes from %s", waiting, self.path)
+        replayed = self.replay()
+        if self.pending():
+            logger.warning("%d journaled writes still waiting, retrying in the background", self.pending())
+            self._ensure_thread()
+        return replayed
+
+    def close(self) -> None:
+        """Stop the replay thread. Writes still waiting stay in the file for recover()."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        with self._lock:
+            self._file.close()
+            # Closing the file releases the lock
+            self._lock_file.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for writes waiting, queued, replayed and rejected."""
+        return {
+            "pending": self.pending(),
+            "queued": self.writes_queued,
+            "replayed": self.writes_replayed,
+            "rejected": self.writes_rejected,
+        }
+
+    def _acquire(self):
+        """Lock the journal for this process; _load and _finish rewrite the file."""
+        path = self.path.with_suffix(".lock")
+        lock_file = open(path, "ab")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise JournalLockedError(
+                f"Write journal {self.path} is in use by another process; "
+                "give each process its own MEMORY_JOURNAL_PATH"
+            ) from None
+        return lock_file
+
+    def _load(self) -> None:
+        """Rebuild the waiting queue from an existing journal file."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = codec.decode(line)
+                except ValueError:
+                    # A write torn by a crash was never acknowledged to anyone
+                    logger.warning("Skipping unreadable line in %s", self.path)
+                    continue
+                if "seq" in record:
+                    self._waiting[record["seq"]] = record["payload"]
+                    self._next_seq = max(self._next_seq, record["seq"] + 1)
+                else:
+                    self._waiting.pop(record["done"], None)
+        self._open = dict(self._waiting)
+        if not self._waiting:
+            self.path.unlink()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(codec.encode(record) + b"\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _in_flight_before(self, seq: int, tables: Set[str]) -> bool:
+        """Whether an earlier write to one of tables is sent but unresolved; called with the lock held."""
+        return any(
+            earlier < seq and earlier not in self._waiting and not tables.isdisjoint(_tables(payload))
+            for earlier, payload in self._open.items()
+        )
+
+    def _finish(self, seq: int) -> None:
+        """Record seq as done; called with the lock held."""
+        if self._open.pop(seq, None) is None:
+            return
+        self._resolved.notify_all()
+        if self._open:
+            self._write({"done": seq})
+        else:
+            # Nothing outstanding: start the file over instead of growing it
+            self._file.seek(0)
+            self._file.truncate()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _reject(self, payload: Dict[str, Any], error: Exception) -> None:
+        path = self.path.with_suffix(".rejected.jsonl")
+        self.writes_rejected += 1
+        logger.error(
+            "Admin API rejected journaled %s %s, moved to %s: %s",
+            payload.get("action"), payload.get("table", ""), path, error
+        )
+        with open(path, "ab") as f:
+            f.write(codec.encode({"payload": payload, "error": str(error)}) + b"\n")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or self._send is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-journal", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                self.replay()
+            except Exception as e:
+                logger.error("Write journal replay failed: %s", e)
+            self._wake.wait(self.retry_interval)
+            self._wake.clear()
+
+
+def _tables(payload: Dict[str, Any]) -> Set[str]:
+    """Tables written by a request or batch."""
+    return {op.get("table") for op, _ in write_operations(payload)}
+
+
+def get_write_journal() -> Optional[WriteJournal]:
+    """Get the write journal configured for the shared clients, or None when disabled."""
+    if config is None:
+        raise RuntimeError("Config not initialized - ensure environment variables are set")
+    if not config.memory_journal_enabled:
+        return None
+    return WriteJournal(
+        path=config.memory_journal_path or None,
+        fsync=config.memory_journal_fsync,
+        retry_interval=config.memory_journal_retry_interval,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or replay the memory write journal")
+    parser.add_argument("command", choices=["status", "recover"])
+    args = parser.parse_args()
+
+    from .client import db
+
+    if db is None or db.journal is None:
+        raise SystemExit("The write journal is disabled (set MEMORY_JOURNAL_ENABLED=true)")
+    if args.command == "recover":
+        replayed = db.journal.recover()
+        print(f"Replayed {replayed} writes")
+    for name, value in db.journal.stats().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
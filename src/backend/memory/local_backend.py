@@ -0,0 +1,1081 @@
+"""
+Local SQLite stand-in for the admin-api Edge Function.
+
+Implements the admin-api protocol (see supabase/functions/admin-api/index.ts)
+on SQLite so the backend can run, be benchmarked and be load-tested without
+Supabase. The schema is built from supabase/migrations: CREATE TABLE, ALTER
+TABLE ... ADD COLUMN / ADD CONSTRAINT ... UNIQUE, column defaults, NOT NULL,
+simple CHECK (col IN (...)) constraints and the update_updated_at_column
+triggers. Row level security, foreign keys and other Postgres-only features
+are not modelled; the Edge Function uses the service role, which bypasses
+RLS anyway.
+
+Point the memory clients at it through ADMIN_API_URL:
+
+    ADMIN_API_URL=sqlite://                 # in-process, in-memory database
+    ADMIN_API_URL=sqlite:///tmp/bookmaker.db  # in-process, file database
+
+or run it as an HTTP server and use its URL as usual:
+
+    python -m backend.memory.local_backend --db /tmp/bookmaker.db --port 54321
+
+Semantics are pinned to index.ts by tests/test_local_backend.py; keep both
+in step when the protocol changes.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .delta import apply_edits
+from .protocol import CONTEXT_CHAPTER_COLUMNS, CONTEXT_PARTS, LOCAL_URL_PREFIX, is_local_url
+from .transport import TransportStats
+
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+MIGRATIONS_DIR = REPO_ROOT / "supabase" / "migrations"
+
+# Mirrors TABLE_PERMISSIONS in admin-api/index.ts
+TABLE_PERMISSIONS: Dict[str, Dict[str, bool]] = {
+    "projects": {"select": True, "insert": False, "update": True, "delete": False},
+    "chapters": {"select": True, "insert": True, "update": True, "delete": False},
+    "tactics": {"select": True, "insert": True, "update": True, "delete": True},
+    "glossary": {"select": True, "insert": True, "update": True, "delete": True},
+    "diagrams": {"select": True, "insert": True, "update": True, "delete": True},
+    "quality_scores": {"select": True, "insert": True, "update": False, "delete": False},
+    "issues": {"select": True, "insert": True, "update": True, "delete": False},
+    "pipeline_logs": {"select": True, "insert": True, "update": False, "delete": False},
+    "output_files": {"select": True, "insert": True, "update": False, "delete": False},
+    "cross_refs": {"select": True, "insert": True, "update": True, "delete": True},
+    "book_context": {"select": True, "insert": True, "update": True, "delete": False},
+    "decisions": {"select": True, "insert": True, "update": False, "delete": False},
+    "validation_log": {"select": True, "insert": True, "update": False, "delete": False},
+}
+
+READ_ACTIONS = ("select", "count", "aggregate")
+FILTER_OPERATORS = (
+    "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is", "in", "contains", "containedBy",
+)
+MAX_BATCH_OPERATIONS = 500
+COMPRESSION_THRESHOLD = 1024
+
+COLUMN_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# =============================================================================
+# Schema from migrations
+# =============================================================================
+
+@dataclass
+class Column:
+    name: str
+    kind: str  # uuid, text, integer, numeric, boolean, jsonb, array, timestamptz
+    not_null: bool = False
+    default: Optional[str] = None
+    check: Optional[str] = None
+
+
+@dataclass
+class Table:
+    name: str
+    columns: Dict[str, Column] = field(default_factory=dict)
+    primary_key: Tuple[str, ...] = ()
+    uniques: List[Tuple[str, ...]] = field(default_factory=list)
+    touch_updated_at: bool = False
+    # set_recorded_at trigger: recorded_at is the insert time, whatever was sent
+    stamp_recorded_at: bool = False
+
+
+def _column_kind(sql_type: str) -> str:
+    t = sql_type.lower()
+    if t.endswith("[]"):
+        return "array"
+    if t.startswith("uuid"):
+        return "uuid"
+    if t.startswith(("int", "bigint", "smallint", "serial")):
+        return "integer"
+    if t.startswith(("numeric", "decimal", "real", "double", "float")):
+        return "numeric"
+    if t.startswith("bool"):
+        return "boolean"
+    if t.startswith("json"):
+        return "jsonb"
+    if t.startswith("timestamp"):
+        return "timestamptz"
+    return "text"
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Split a CREATE TABLE body on commas that aren't inside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _strip_comments(sql: str) -> str:
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def _parse_column(definition: str) -> Optional[Column]:
+    match = re.match(r"(\w+)\s+([\w]+(?:\s*\([\d,\s]*\))?(?:\[\])?)(.*)$", definition, re.S | re.I)
+    if not match:
+        return None
+    name, sql_type, rest = match.groups()
+    column = Column(name=name, kind=_column_kind(sql_type))
+    column.not_null = bool(re.search(r"\bNOT\s+NULL\b", rest, re.I)) or bool(
+        re.search(r"\bPRIMARY\s+KEY\b", rest, re.I)
+    )
+    default = re.search(
+        r"\bDEFAULT\s+(ARRAY\[[^\]]*\]|'[^']*'|[\w.]+\(\)|[\w.]+)", rest, re.I
+    )
+    if default:
+        column.default = default.group(1)
+    check = re.search(r"\bCHECK\s*\((\w+\s+IN\s*\([^)]*\))\)", rest, re.I)
+    if check:
+        column.check = check.group(1)
+    return column
+
+
+def load_schema(migrations_dir: Path = MIGRATIONS_DIR) -> Dict[str, Table]:
+    """Replay the public-schema table definitions from the migrations."""
+    tables: Dict[str, Table] = {}
+    for path in sorted(Path(migrations_dir).glob("*.sql")):
+        sql = _strip_comments(path.read_text(encoding="utf-8"))
+
+        for match in re.finditer(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?public\.(\w+)\s*\(", sql, re.I):
+            name = match.group(1)
+            start = match.end()
+            depth, end = 1, start
+            while depth:
+                depth += {"(": 1, ")": -1}.get(sql[end], 0)
+                end += 1
+            table = tables.setdefault(name, Table(name=name))
+            for definition in _split_top_level(sql[start:end - 1]):
+                _add_definition(table, definition)
+
+        for match in re.finditer(
+            r"ALTER\s+TABLE\s+(?:ONLY\s+)?public\.(\w+)\s+ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?([^;]+);",
+            sql, re.I
+        ):
+            table = tables.get(match.group(1))
+            column = _parse_column(match.group(2).strip())
+            if table is not None and column is not None and column.name not in table.columns:
+                table.columns[column.name] = column
+
+        for match in re.finditer(
+            r"ALTER\s+TABLE\s+(?:ONLY\s+)?public\.(\w+)\s+ADD\s+CONSTRAINT\s+\w+\s+UNIQUE\s*\(([^)]*)\)",
+            sql, re.I
+        ):
+            table = tables.get(match.group(1))
+            if table is not None:
+                _add_unique(table, match.group(2))
+
+        for match in re.finditer(
+            r"CREATE\s+TRIGGER\s+\w+\s+BEFORE\s+UPDATE\s+ON\s+public\.(\w+)[^;]*update_updated_at_column",
+            sql, re.I
+        ):
+            if match.group(1) in tables:
+                tables[match.group(1)].touch_updated_at = True
+
+        for match in re.finditer(
+            r"CREATE\s+TRIGGER\s+\w+\s+BEFORE\s+INSERT\s+ON\s+public\.(\w+)[^;]*set_recorded_at",
+            sql, re.I
+        ):
+            if match.group(1) in tables:
+                tables[match.group(1)].stamp_recorded_at = True
+    return tables
+
+
+def _add_definition(table: Table, definition: str) -> None:
+    upper = definition.upper()
+    if upper.startswith("UNIQUE"):
+        _add_unique(table, definition[definition.index("(") + 1:definition.rindex(")")])
+        return
+    if upper.startswith("PRIMARY KEY"):
+        cols = definition[definition.index("(") + 1:definition.rindex(")")]
+        table.primary_key = tuple(c.strip() for c in cols.split(","))
+        return
+    if upper.startswith(("CONSTRAINT", "CHECK", "FOREIGN KEY", "EXCLUDE")):
+        return
+    column = _parse_column(definition)
+    if column is None:
+        return
+    table.columns[column.name] = column
+    if re.search(r"\bPRIMARY\s+KEY\b", definition, re.I):
+        table.primary_key = (column.name,)
+    elif re.search(r"\bUNIQUE\b", definition, re.I):
+        table.uniques.append((column.name,))
+
+
+def _add_unique(table: Table, columns: str) -> None:
+    key = tuple(c.strip() for c in columns.split(","))
+    if key not in table.uniques:
+        table.uniques.append(key)
+
+
+def _default_value(column: Column) -> Any:
+    default = column.default
+    if default is None:
+        return None
+    lowered = default.lower()
+    if lowered == "gen_random_uuid()":
+        return str(uuid.uuid4())
+    if lowered == "now()":
+        return now_iso()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    if default.startswith("'"):
+        return default.strip("'")
+    if lowered.startswith("array["):
+        return re.findall(r"'([^']*)'", default)
+    try:
+        return int(default) if column.kind == "integer" else float(default)
+    except ValueError:
+        return None
+
+
+# =============================================================================
+# Value encoding
+# =============================================================================
+
+class DatabaseError(Exception):
+    """An error the real database would report (DATABASE_ERROR)."""
+
+
+class OperationFailure(Exception):
+    """An operation rejected by admin-api itself, with its own code and status."""
+
+    def __init__(self, code: str, message: str, status: int, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+        self.data = data
+
+
+def _encode(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    kind = column.kind
+    if kind in ("jsonb", "array"):
+        if kind == "array" and not isinstance(value, list):
+            raise DatabaseError(f'malformed array literal: "{value}"')
+        return json.dumps(value)
+    if kind == "boolean":
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return int(value.lower() == "true")
+        if not isinstance(value, (bool, int)):
+            raise DatabaseError(f'invalid input syntax for type boolean: "{value}"')
+        return int(bool(value))
+    if kind == "integer":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise DatabaseError(f'invalid input syntax for type integer: "{value}"')
+    if kind == "numeric":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise DatabaseError(f'invalid input syntax for type numeric: "{value}"')
+    if kind == "uuid":
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            raise DatabaseError(f'invalid input syntax for type uuid: "{value}"')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _decode(column: Optional[Column], value: Any) -> Any:
+    if value is None or column is None:
+        return value
+    if column.kind in ("jsonb", "array"):
+        return json.loads(value)
+    if column.kind == "boolean":
+        return bool(value)
+    if column.kind == "numeric":
+        return float(value)
+    return value
+
+
+def _json_contains(container: Any, contained: Any) -> bool:
+    """Postgres jsonb @> semantics."""
+    if isinstance(container, dict) and isinstance(contained, dict):
+        return all(k in container and _json_contains(container[k], v) for k, v in contained.items())
+    if isinstance(container, list):
+        if isinstance(contained, list):
+            return all(any(_json_contains(item, c) for item in container) for c in contained)
+        return any(_json_contains(item, contained) for item in container)
+    return container == contained
+
+
+def _sql_json_contains(container: Optional[str], contained: Optional[str]) -> Optional[int]:
+    if container is None or contained is None:
+        return None
+    return int(_json_contains(json.loads(container), json.loads(contained)))
+
+
+# =============================================================================
+# Protocol
+# =============================================================================
+
+class LocalAdminAPI:
+    """admin-api request handler backed by SQLite."""
+
+    def __init__(self, path: str = ":memory:", migrations_dir: Path = MIGRATIONS_DIR, secret: Optional[str] = None):
+        self.path = path
+        self.secret = secret
+        self.schema = load_schema(migrations_dir)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA case_sensitive_like = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL" if path != ":memory:" else "PRAGMA journal_mode = MEMORY")
+        self._conn.create_function("json_contains", 2, _sql_json_contains, deterministic=True)
+        self._conn.create_function("now_iso", 0, now_iso)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        for table in self.schema.values():
+            defs = []
+            for column in table.columns.values():
+                sql = f'"{column.name}"'
+                if column.not_null:
+                    sql += " NOT NULL"
+                if column.check:
+                    sql += f" CHECK ({column.check})"
+                defs.append(sql)
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table.name}" ({", ".join(defs)})')
+            for key in ([table.primary_key] if table.primary_key else []) + table.uniques:
+                index = f"{table.name}_{'_'.join(key)}_key"
+                cols = ", ".join(f'"{c}"' for c in key)
+                self._conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{index}" ON "{table.name}" ({cols})')
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -------------------------------------------------------------------------
+    # Request handling
+    # -------------------------------------------------------------------------
+
+    def handle(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Handle a parsed request body. Returns (HTTP status, response body)."""
+        if not isinstance(body, dict):
+            return error_response("INVALID_REQUEST", "Invalid JSON body", 400)
+        with self._lock:
+            if body.get("action") == "batch":
+                return self._handle_batch(body)
+            if body.get("action") == "context":
+                return self._handle_context(body)
+
+            if not body.get("action") or not body.get("table"):
+                return error_response("INVALID_REQUEST", "Missing required fields: action and table", 400)
+
+            invalid = validate_operation(body)
+            if invalid:
+                return error_response(*invalid)
+
+            try:
+                data, count = self.execute(body)
+            except OperationFailure as e:
+                return error_response(e.code, e.message, e.status, e.data)
+            except DatabaseError as e:
+                return error_response("DATABASE_ERROR", str(e), 400)
+            except sqlite3.Error as e:
+                return error_response("DATABASE_ERROR", str(e), 400)
+            return success_response(data, count)
+
+    def _handle_batch(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        operations = body.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return error_response("INVALID_REQUEST", "Batch requires a non-empty operations array", 400)
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return error_response("INVALID_REQUEST", f"Batch exceeds {MAX_BATCH_OPERATIONS} operations", 400)
+
+        transaction = bool(body.get("transaction"))
+        for i, op in enumerate(operations):
+            invalid = validate_operation(op)
+            if invalid:
+                code, message, status = invalid
+                return error_response(code, f"Operation {i}: {message}", status, None, i)
+            if transaction and (
+                op.get("action") in ("count", "aggregate", "patch") or (op.get("options") or {}).get("keyset")
+            ):
+                return error_response(
+                    "INVALID_REQUEST",
+                    f"Operation {i}: count, aggregate, patch and keyset are not supported in transactional batches",
+                    400, None, i
+                )
+
+        if transaction:
+            self._conn.execute("BEGIN")
+            try:
+                results = [{"data": self.execute(op)[0]} for op in operations]
+            except (DatabaseError, sqlite3.Error) as e:
+                self._conn.execute("ROLLBACK")
+                return error_response("DATABASE_ERROR", str(e), 400)
+            self._conn.execute("COMMIT")
+            return success_response(results)
+
+        results: List[Dict[str, Any]] = []
+        for i, op in enumerate(operations):
+            try:
+                data, count = self.execute(op)
+            except OperationFailure as e:
+                return error_response(e.code, f"Operation {i}: {e.message}", e.status, results, i)
+            except (DatabaseError, sqlite3.Error) as e:
+                return error_response("DATABASE_ERROR", f"Operation {i}: {e}", 400, results, i)
+            item: Dict[str, Any] = {"data": data}
+            if count is not None:
+                item["count"] = count
+            results.append(item)
+        return success_response(results)
+
+    def _handle_context(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        request = body.get("data") or {}
+        project_id = request.get("project_id")
+        chapter_id = request.get("chapter_id")
+        if not isinstance(project_id, str) or not project_id:
+            return error_response("INVALID_REQUEST", "Missing project_id for context", 400)
+        parts = request.get("parts")
+        if parts is None:
+            parts = [part for part in CONTEXT_PARTS if part != "chapter" or chapter_id]
+        if not isinstance(parts, list):
+            return error_response("INVALID_REQUEST", "Context parts must be an array", 400)
+        for part in parts:
+            if part not in CONTEXT_PARTS:
+                return error_response("INVALID_REQUEST", f"Unknown context part: {part}", 400)
+            if part == "chapter" and not chapter_id:
+                return error_response("INVALID_REQUEST", "Context part 'chapter' requires chapter_id", 400)
+
+        try:
+            return success_response({part: self._context_part(part, request) for part in parts})
+        except (DatabaseError, sqlite3.Error) as e:
+            return error_response("DATABASE_ERROR", str(e), 400)
+
+    def _context_part(self, part: str, request: Dict[str, Any]) -> Any:
+        project_id = request["project_id"]
+        chapter_id = request.get("chapter_id")
+
+        def select(table: str, filters: Dict[str, Any], **options: Any) -> Any:
+            return self._select(self.schema[table], {"filters": filters, "options": options})[0]
+
+        if part == "project":
+            rows = select("projects", {"id.eq": project_id})
+            return rows[0] if rows else None
+        if part == "chapter":
+            rows = select("chapters", {"id.eq": chapter_id})
+            return rows[0] if rows else None
+        if part == "chapters":
+            return select(
+                "chapters", {"project_id.eq": project_id},
+                columns=CONTEXT_CHAPTER_COLUMNS, order={"column": "chapter_number"}
+            )
+        if part == "book_context":
+            filters: Dict[str, Any] = {"project_id.eq": project_id}
+            if request.get("keys") is not None:
+                filters["key.in"] = request["keys"]
+            return {row["key"]: row["value"] for row in select("book_context", filters, columns="key,value")}
+        if part == "glossary":
+            return select("glossary", {"project_id.eq": project_id})
+        if part == "tactics":
+            filters = {"project_id.eq": project_id}
+            if chapter_id:
+                filters["chapter_id.eq"] = chapter_id
+            return select("tactics", filters)
+        # cross_refs
+        if chapter_id:
+            return select("cross_refs", {"from_chapter_id.eq": chapter_id})
+        return select("cross_refs", {"project_id.eq": project_id})
+
+    # -------------------------------------------------------------------------
+    # Operations
+    # -------------------------------------------------------------------------
+
+    def execute(self, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        """Run one validated operation. Returns (data, count)."""
+        table = self.schema.get(op["table"])
+        if table is None:
+            raise DatabaseError(f'relation "public.{op["table"]}" does not exist')
+        action = op["action"]
+        handler = getattr(self, f"_{action}")
+        return handler(table, op)
+
+    def _select(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        options = op.get("options") or {}
+        columns = parse_columns(options.get("columns"))
+        for column in columns or []:
+            self._column(table, column)
+        where, params = self._where(table, op.get("filters"))
+
+        keyset = options.get("keyset")
+        if keyset:
+            key_sql, key_params = self._keyset_condition(table, keyset)
+            where, params = f"({where}) AND ({key_sql})", params + key_params
+            ascending = keyset.get("ascending", True)
+            order = f"{self._order_term(table, keyset['column'], ascending)}, {self._order_term(table, 'id', ascending)}"
+        elif options.get("order"):
+            order = self._order_term(table, options["order"]["column"], options["order"].get("ascending", True))
+        else:
+            order = "rowid"
+
+        count = None
+        if options.get("count"):
+            count = self._conn.execute(f'SELECT COUNT(*) FROM "{table.name}" WHERE {where}', params).fetchone()[0]
+
+        select_list = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        sql = f'SELECT {select_list} FROM "{table.name}" WHERE {where} ORDER BY {order}'
+        if options.get("limit"):
+            sql += f" LIMIT {int(options['limit'])}"
+        rows = self._rows(table, self._conn.execute(sql, params))
+
+        if options.get("slice"):
+            rows = [slice_row(row, options["slice"]) for row in rows]
+
+        if options.get("single"):
+            if len(rows) != 1:
+                raise DatabaseError("JSON object requested, multiple (or no) rows returned")
+            return rows[0], count
+        return rows, count
+
+    def _count(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        where, params = self._where(table, op.get("filters"))
+        count = self._conn.execute(f'SELECT COUNT(*) FROM "{table.name}" WHERE {where}', params).fetchone()[0]
+        return None, count
+
+    def _aggregate(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        group_by = parse_columns((op.get("options") or {}).get("groupBy"))
+        for column in group_by:
+            self._column(table, column)
+        where, params = self._where(table, op.get("filters"))
+        cols = ", ".join(f'"{c}"' for c in group_by)
+        cursor = self._conn.execute(
+            f'SELECT {cols}, COUNT(*) FROM "{table.name}" WHERE {where} GROUP BY {cols} ORDER BY MIN(rowid)',
+            params
+        )
+        groups, total = [], 0
+        for row in cursor.fetchall():
+            group = {c: _decode(table.columns[c], v) for c, v in zip(group_by, row[:-1])}
+            group["count"] = row[-1]
+            total += row[-1]
+            groups.append(group)
+        return groups, total
+
+    def _insert(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        rows = self._prepare_rows(table, op["data"])
+        cols = list(rows[0].keys())
+        sql = self._insert_sql(table, cols, len(rows))
+        params = [value for row in rows for value in row.values()]
+        return self._rows(table, self._conn.execute(sql, params)), None
+
+    def _upsert(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        data = op["data"]
+        provided = _union_keys(data if isinstance(data, list) else [data])
+        rows = self._prepare_rows(table, data)
+        cols = list(rows[0].keys())
+        conflict = (op.get("options") or {}).get("onConflict") or ",".join(table.primary_key)
+        targets = [c.strip() for c in conflict.split(",")]
+        for column in targets:
+            self._column(table, column)
+        updates = [
+            f'"{c}" = excluded."{c}"' for c in provided
+            if c not in targets and not (table.touch_updated_at and c == "updated_at")
+        ]
+        if table.touch_updated_at:
+            # The update_updated_at_column trigger fires on the conflict path
+            updates.append('"updated_at" = now_iso()')
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        sql = self._insert_sql(table, cols, len(rows), returning=False)
+        sql += f" ON CONFLICT ({', '.join(chr(34) + c + chr(34) for c in targets)}) {action} RETURNING *"
+        params = [value for row in rows for value in row.values()]
+        return self._rows(table, self._conn.execute(sql, params)), None
+
+    def _update(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        data = dict(op["data"] if isinstance(op["data"], dict) else op["data"][0])
+        if table.touch_updated_at:
+            data["updated_at"] = now_iso()
+        assignments, params = [], []
+        for column, value in data.items():
+            col = self._writable_column(table, column)
+            assignments.append(f'"{column}" = ?')
+            params.append(_encode(col, value))
+        where, where_params = self._where(table, op.get("filters"))
+        sql = f'UPDATE "{table.name}" SET {", ".join(assignments)} WHERE {where} RETURNING *'
+        return self._rows(table, self._conn.execute(sql, params + where_params)), None
+
+    def _patch(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        options = op.get("options") or {}
+        where, params = self._where(table, op.get("filters"))
+        rows = self._rows(table, self._conn.execute(f'SELECT * FROM "{table.name}" WHERE {where}', params))
+        if len(rows) != 1:
+            raise OperationFailure(
+                "INVALID_REQUEST", f"Patch filters must match exactly one row ({len(rows)} matched)", 400
+            )
+        row = rows[0]
+        if "updated_at" not in row:
+            raise OperationFailure("INVALID_REQUEST", f"Table '{table.name}' has no updated_at column", 400)
+        expected = options.get("ifUpdatedAt")
+        if expected is not None and row.get("updated_at") != expected:
+            raise OperationFailure(
+                "CONFLICT", f"Row was updated at {row.get('updated_at')}, not {expected}", 409,
+                {"updated_at": row.get("updated_at")}
+            )
+
+        data = dict(op.get("data") or {})
+        for column, edits in (options.get("patches") or {}).items():
+            base = row.get(column)
+            if not isinstance(base, str):
+                raise OperationFailure("INVALID_REQUEST", f"Cannot patch non-text column '{column}'", 400)
+            try:
+                data[column] = apply_edits(base, edits)
+            except ValueError as e:
+                raise OperationFailure("INVALID_REQUEST", f"Patch for '{column}': {e}", 400)
+        # Always move updated_at, and only write the version that was read
+        data["updated_at"] = now_iso()
+        filters = {**op["filters"], "updated_at.eq": row.get("updated_at")}
+        return self._update(table, {"data": data, "filters": filters})
+
+    def _delete(self, table: Table, op: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+        where, params = self._where(table, op.get("filters"))
+        sql = f'DELETE FROM "{table.name}" WHERE {where} RETURNING *'
+        return self._rows(table, self._conn.execute(sql, params)), None
+
+    # -------------------------------------------------------------------------
+    # SQL helpers
+    # -------------------------------------------------------------------------
+
+    def _column(self, table: Table, name: str) -> Column:
+        column = table.columns.get(name)
+        if column is None:
+            raise DatabaseError(f"column {table.name}.{name} does not exist")
+        return column
+
+    def _writable_column(self, table: Table, name: str) -> Column:
+        column = table.columns.get(name)
+        if column is None:
+            raise DatabaseError(f"Could not find the '{name}' column of '{table.name}' in the schema cache")
+        return column
+
+    def _prepare_rows(self, table: Table, data: Any) -> List[Dict[str, Any]]:
+        """Encode insert rows, filling defaults for columns no row provides.
+
+        Like supabase-js, columns provided by some rows but missing from
+        others are inserted as NULL in those rows, not as their default.
+        """
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            raise DatabaseError("No rows to insert")
+        provided = _union_keys(rows)
+        for column in provided:
+            self._writable_column(table, column)
+        prepared = []
+        for row in rows:
+            out = {}
+            for name, column in table.columns.items():
+                if name in provided:
+                    out[name] = _encode(column, row.get(name))
+                else:
+                    out[name] = _encode(column, _default_value(column))
+            if table.stamp_recorded_at:
+                out["recorded_at"] = _encode(table.columns["recorded_at"], now_iso())
+            prepared.append(out)
+        return prepared
+
+    def _insert_sql(self, table: Table, cols: List[str], count: int, returning: bool = True) -> str:
+        placeholders = "(" + ", ".join("?" for _ in cols) + ")"
+        sql = (
+            f'INSERT INTO "{table.name}" ({", ".join(chr(34) + c + chr(34) for c in cols)}) '
+            f'VALUES {", ".join(placeholders for _ in range(count))}'
+        )
+        return sql + " RETURNING *" if returning else sql
+
+    def _rows(self, table: Table, cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        names = [d[0] for d in cursor.description]
+        return [
+            {name: _decode(table.columns.get(name), value) for name, value in zip(names, row)}
+            for row in cursor.fetchall()
+        ]
+
+    def _order_term(self, table: Table, column: str, ascending: bool) -> str:
+        self._column(table, column)
+        # Postgres sorts NULLs last ascending and first descending
+        return f'"{column}" ASC NULLS LAST' if ascending else f'"{column}" DESC NULLS FIRST'
+
+    def _keyset_condition(self, table: Table, keyset: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        column = self._column(table, keyset["column"])
+        after = keyset.get("after")
+        if not after:
+            return "1", []
+        cmp = ">" if keyset.get("ascending", True) else "<"
+        value = _encode(column, after.get("value"))
+        row_id = _encode(self._column(table, "id"), after.get("id"))
+        return (
+            f'"{column.name}" {cmp} ? OR ("{column.name}" = ? AND "id" {cmp} ?)',
+            [value, value, row_id],
+        )
+
+    def _where(self, table: Table, filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, value in (filters or {}).items():
+            name, _, op = key.partition(".")
+            if op and op not in FILTER_OPERATORS:
+                # index.ts falls back to eq on the whole key
+                name, op = key, "eq"
+            op = op or "eq"
+            column = self._column(table, name)
+            quoted = f'"{name}"'
+
+            if op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+                sql_op = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}[op]
+                clauses.append(f"{quoted} {sql_op} ?")
+                params.append(_encode(column, value))
+            elif op == "like":
+                clauses.append(f"{quoted} LIKE ?")
+                params.append(str(value).replace("*", "%"))
+            elif op == "ilike":
+                clauses.append(f"LOWER({quoted}) LIKE LOWER(?)")
+                params.append(str(value).replace("*", "%"))
+            elif op == "is":
+                text = "null" if value is None else str(value).lower()
+                if text == "null":
+                    clauses.append(f"{quoted} IS NULL")
+                elif text in ("true", "false"):
+                    clauses.append(f"{quoted} IS ?")
+                    params.append(int(text == "true"))
+                else:
+                    raise DatabaseError(f'failed to parse filter (is.{value})')
+            elif op == "in":
+                values = list(value or [])
+                clauses.append(f"{quoted} IN ({', '.join('?' for _ in values)})" if values else "0")
+                params.extend(_encode(column, v) for v in values)
+            elif op == "contains":
+                clauses.append(f"json_contains({quoted}, ?)")
+                params.append(json.dumps(value))
+            elif op == "containedBy":
+                clauses.append(f"json_contains(?, {quoted})")
+                params.append(json.dumps(value))
+        return (" AND ".join(clauses) or "1"), params
+
+
+def _dump_body(payload: Any) -> bytes:
+    return json.dumps(payload, default=str).encode("utf-8")
+
+
+def _union_keys(rows: List[Dict[str, Any]]) -> List[str]:
+    return list(dict.fromkeys(key for row in rows for key in row.keys()))
+
+
+def parse_columns(columns: Any) -> Optional[List[str]]:
+    """Normalize a columns/groupBy option to column names (None = all)."""
+    if columns is None:
+        return None
+    items = columns if isinstance(columns, list) else str(columns).split(",")
+    names = [str(c).strip() for c in items if str(c).strip()]
+    if not names or "*" in names:
+        return None
+    for name in names:
+        if not COLUMN_NAME.match(name):
+            raise ValueError(f"Invalid column name: '{name}'")
+    return names
+
+
+def _is_count(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def slice_row(row: Dict[str, Any], text_slice: Dict[str, Any]) -> Dict[str, Any]:
+    """Mirror of sliceRows() in index.ts for one row."""
+    columns = parse_columns(text_slice.get("columns"))
+    offset = text_slice.get("offset") or 0
+    length = text_slice.get("length")
+    row = dict(row)
+    lengths: Dict[str, int] = {}
+    for column in columns or list(row):
+        value = row.get(column)
+        if not isinstance(value, str):
+            continue
+        start = min(offset, len(value))
+        end = len(value) if length is None else min(start + length, len(value))
+        if start == 0 and end == len(value):
+            continue
+        row[column] = value[start:end]
+        lengths[column] = len(value)
+    if lengths:
+        row["_lengths"] = lengths
+    return row
+
+
+def validate_operation(op: Dict[str, Any]) -> Optional[Tuple[str, str, int]]:
+    """Mirror of validateOperation() in index.ts. Returns (code, message, status)."""
+    action, table = op.get("action"), op.get("table")
+    if not action or not table:
+        return ("INVALID_REQUEST", "Missing required fields: action and table", 400)
+    permissions = TABLE_PERMISSIONS.get(table)
+    if permissions is None:
+        return ("INVALID_TABLE", f"Table '{table}' is not allowed", 400)
+
+    key = {"upsert": "insert", "patch": "update"}.get(action, "select" if action in READ_ACTIONS else action)
+    if key not in permissions:
+        return ("INVALID_ACTION", f"Unknown action: {action}", 400)
+    if not permissions[key]:
+        return ("INVALID_ACTION", f"Action '{action}' is not allowed on table '{table}'", 400)
+
+    if action in ("insert", "update", "upsert") and not op.get("data"):
+        return ("INVALID_REQUEST", f"Missing data for {action}", 400)
+
+    options = op.get("options") or {}
+    if action == "patch":
+        patches = options.get("patches") or {}
+        if not isinstance(patches, dict) or not isinstance(op.get("data") or {}, dict):
+            return ("INVALID_REQUEST", "Patch data and patches must be objects", 400)
+        if not op.get("data") and not patches:
+            return ("INVALID_REQUEST", "Missing data or patches for patch", 400)
+    if "columns" in options:
+        try:
+            parse_columns(options["columns"])
+        except ValueError as e:
+            return ("INVALID_REQUEST", str(e), 400)
+
+    if options.get("keyset") and not COLUMN_NAME.match(str(options["keyset"].get("column"))):
+        return ("INVALID_REQUEST", "Invalid keyset column", 400)
+
+    if "slice" in options:
+        text_slice = options["slice"]
+        if action != "select" or not isinstance(text_slice, dict):
+            return ("INVALID_REQUEST", "slice is only supported on select", 400)
+        if (("offset" in text_slice and not _is_count(text_slice["offset"])) or
+                (text_slice.get("length") is not None and not _is_count(text_slice["length"]))):
+            return ("INVALID_REQUEST", "slice offset and length must be non-negative integers", 400)
+        try:
+            parse_columns(text_slice.get("columns"))
+        except ValueError as e:
+            return ("INVALID_REQUEST", str(e), 400)
+
+    if action == "aggregate":
+        try:
+            if not parse_columns(options.get("groupBy")):
+                return ("INVALID_REQUEST", "groupBy required for aggregate", 400)
+        except ValueError as e:
+            return ("INVALID_REQUEST", str(e), 400)
+
+    if action in ("update", "patch", "delete") and not op.get("filters"):
+        return ("INVALID_REQUEST", f"Filters required for {action}", 400)
+    return None
+
+
+def error_response(
+    code: str,
+    message: str,
+    status: int,
+    data: Any = None,
+    index: Optional[int] = None
+) -> Tuple[int, Dict[str, Any]]:
+    error: Dict[str, Any] = {"code": code, "message": message}
+    if index is not None:
+        error["index"] = index
+    return status, {"success": False, "data": data, "error": error}
+
+
+def success_response(data: Any, count: Optional[int] = None) -> Tuple[int, Dict[str, Any]]:
+    body: Dict[str, Any] = {"success": True, "data": data}
+    if count is not None:
+        body["count"] = count
+    body["error"] = None
+    return 200, body
+
+
+# =============================================================================
+# HTTP framing (shared by the server and the in-process transports)
+# =============================================================================
+
+def handle_http(
+    api: LocalAdminAPI,
+    method: str,
+    headers: Dict[str, str],
+    body: bytes,
+    compress: bool = True
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Handle a raw HTTP request the way the Edge Function's Deno.serve does."""
+    headers = {k.lower(): v for k, v in headers.items()}
+    response_headers = {"Content-Type": "application/json"}
+    if method == "OPTIONS":
+        return 200, {}, b""
+
+    status, payload = _handle_raw(api, method, headers, body)
+    content = json.dumps(payload, default=str).encode("utf-8")
+    accepts = "gzip" in headers.get("accept-encoding", "")
+    if compress and accepts:
+        response_headers["Vary"] = "Accept-Encoding"
+        if len(content) >= COMPRESSION_THRESHOLD:
+            content = gzip.compress(content)
+            response_headers["Content-Encoding"] = "gzip"
+    return status, response_headers, content
+
+
+def _handle_raw(api: LocalAdminAPI, method: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, Any]]:
+    if method != "POST":
+        return error_response("INVALID_REQUEST", "Only POST method is allowed", 405)
+
+    if api.secret is not None:
+        auth = headers.get("authorization", "")
+        if not auth.startswith("Bearer "):
+            return error_response("UNAUTHORIZED", "Missing or invalid Authorization header", 401)
+        if auth[len("Bearer "):] != api.secret:
+            return error_response("UNAUTHORIZED", "Invalid API secret", 401)
+
+    try:
+        encoding = headers.get("content-encoding", "identity").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding != "identity":
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+        parsed = json.loads(body)
+    except (ValueError, OSError):
+        return error_response("INVALID_REQUEST", "Invalid JSON body", 400)
+    return api.handle(parsed)
+
+
+_instances: Dict[str, LocalAdminAPI] = {}
+_instances_lock = threading.Lock()
+
+
+def get_local_api(url: str) -> LocalAdminAPI:
+    """Shared LocalAdminAPI for a sqlite:// URL (one database per URL)."""
+    path = url[len(LOCAL_URL_PREFIX):] or ":memory:"
+    with _instances_lock:
+        if url not in _instances:
+            _instances[url] = LocalAdminAPI(path)
+        return _instances[url]
+
+
+class LocalTransport:
+    """In-process stand-in for PooledTransport that calls LocalAdminAPI directly."""
+
+    def __init__(self, api: LocalAdminAPI):
+        self.api = api
+        self._requests = 0
+
+    def post(
+        self,
+        url: str,
+        data: Any = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        body = data if data is not None else _dump_body(json)
+        self._requests += 1
+        status, response_headers, content = handle_http(
+            self.api, "POST", headers or {}, body, compress=False
+        )
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(response_headers)
+        response._content = content
+        response.url = url
+        return response
+
+    def stats(self) -> TransportStats:
+        return TransportStats(sessions=1, requests=self._requests)
+
+    def close(self) -> None:
+        pass
+
+
+class LocalAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that hands requests to LocalAdminAPI on a worker thread."""
+
+    def __init__(self, api: LocalAdminAPI):
+        self.api = api
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        status, headers, content = await asyncio.to_thread(
+            handle_http, self.api, request.method, dict(request.headers), body, False
+        )
+        # A stream (not content=) so the body is read, and counted, like a network response
+        return httpx.Response(status, headers=headers, stream=httpx.ByteStream(content))
+
+
+# =============================================================================
+# HTTP server
+# =============================================================================
+
+def make_server(api: LocalAdminAPI, host: str = "127.0.0.1", port: int = 54321) -> ThreadingHTTPServer:
+    """HTTP server speaking the admin-api protocol on top of api."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            status, headers, content = handle_http(api, self.command, dict(self.headers), body)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_POST = _respond
+        do_GET = _respond
+        do_OPTIONS = _respond
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local SQLite admin-api")
+    parser.add_argument("--db", default=":memory:", help="SQLite database path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--secret", default=os.environ.get("ADMIN_API_SECRET"),
+                        help="Bearer secret to require (default: $ADMIN_API_SECRET)")
+    args = parser.parse_args()
+
+    server = make_server(LocalAdminAPI(args.db, secret=args.secret), args.host, args.port)
+    print(f"Local admin-api on http://{args.host}:{args.port}/ (db: {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
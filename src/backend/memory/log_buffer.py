@@ -0,0 +1,260 @@
+"""
+Write-behind buffer for append-only audit tables.
+
+pipeline_logs, decisions and validation_log rows are never read back on the
+critical path, so instead of a blocking insert per row they are queued in
+memory and written by a background thread in bulk inserts, either once
+max_rows are pending or every flush_interval seconds:
+
+    row = get_log_sink().append("decisions", {...})  # returns immediately
+    row["id"]                                    # client-generated id
+
+Each row gets its id and created_at when it is queued, so callers can refer
+to it straight away and its timestamp reflects when the event happened, not
+when it was flushed.
+
+Rows that can't be written because the Admin API is unreachable (after the
+client's own retries) are spilled to a local JSONL file and replayed, as
+upserts on id, on a later flush. When the API rejects a bulk write outright,
+the rows are resent in halves down to single rows, so only the rows it
+rejects are moved to a ".rejected" file next to it instead of being retried
+forever. Pending rows are flushed when the process exits.
+"""
+
+import atexit
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+from .client import db, AdminAPIClient
+from .retry import is_transient, with_row_ids
+
+logger = logging.getLogger("bookmaker.memory")
+
+# Tables whose rows are only ever appended, so writing them late is safe
+BUFFERED_TABLES = ("pipeline_logs", "decisions", "validation_log")
+
+DEFAULT_SPILL_PATH = Path(__file__).parent.parent.parent.parent / "logs" / "log_buffer_spill.jsonl"
+
+
+class LogBuffer:
+    """Per-table queues of audit rows, flushed in bulk by a background thread."""
+
+    def __init__(
+        self,
+        client: Optional[AdminAPIClient],
+        max_rows: int = 100,
+        flush_interval: float = 2.0,
+        spill_path: Optional[Path] = None,
+        enabled: bool = True
+    ):
+        self.client = client
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path) if spill_path else DEFAULT_SPILL_PATH
+        self.enabled = enabled
+        self._queues: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.rows_written = 0
+        self.rows_spilled = 0
+        self.rows_rejected = 0
+
+    def append(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a row for insertion. Returns the row with its id and created_at."""
+        if table not in BUFFERED_TABLES:
+            raise ValueError(f"Table '{table}' is not an append-only log table")
+        row = dict(with_row_ids(row))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+
+        if not self.enabled or self._closed:
+            result = self.client.insert(table, data=row)
+            return result[0] if isinstance(result, list) else result
+
+        with self._lock:
+            self._queues[table].append(row)
+            self._pending += 1
+            full = self._pending >= self.max_rows
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+        return row
+
+    def flush(self) -> int:
+        """Write every queued row now. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                queues = self._queues
+                self._queues = defaultdict(list)
+                self._pending = 0
+
+            written = 0
+            reachable = True
+            for table, rows in queues.items():
+                landed, error = self._write(table, rows, lambda part: self.client.insert(table, data=part))
+                written += landed
+                reachable = reachable and error is None
+
+            # Only replay spilled rows once the API is answering again
+            if reachable and self._has_spill():
+                written += self._drain_spill()
+
+            self.rows_written += written
+            return written
+
+    def close(self) -> None:
+        """Stop the background thread and flush whatever is still queued."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        if self._pending:
+            self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for rows pending, written, spilled and rejected."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "written": self.rows_written,
+                "spilled": self.rows_spilled,
+                "rejected": self.rows_rejected,
+            }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-buffer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                if self._pending or self._has_spill():
+                    self.flush()
+            except Exception as e:
+                logger.error("Log buffer flush failed: %s", e)
+
+    def _draining_path(self) -> Path:
+        return self.spill_path.with_suffix(".draining.jsonl")
+
+    def _has_spill(self) -> bool:
+        return self.spill_path.exists() or self._draining_path().exists()
+
+    def _write(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        send: Callable[[List[Dict[str, Any]]], Any]
+    ) -> Tuple[int, Optional[Exception]]:
+        """Send rows, splitting a rejected batch to find the rows at fault.
+
+        Returns the number of rows written and the transient error that
+        stopped the rest, if any.
+        """
+        try:
+            send(rows)
+            return len(rows), None
+        except Exception as e:
+            if is_transient(e):
+                self._set_aside(table, rows, e)
+                return 0, e
+            if len(rows) == 1:
+                self._set_aside(table, rows, e)
+                return 0, None
+        middle = len(rows) // 2
+        written, error = self._write(table, rows[:middle], send)
+        if error is not None:
+            # Unreachable now: spill the rest instead of sending it
+            self._set_aside(table, rows[middle:], error)
+            return written, error
+        more, error = self._write(table, rows[middle:], send)
+        return written + more, error
+
+    def _set_aside(self, table: str, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Spill rows that failed transiently; quarantine ones that were rejected."""
+        if is_transient(error):
+            path = self.spill_path
+            self.rows_spilled += len(rows)
+            logger.warning("Admin API unreachable, spilled %d %s rows to %s: %s", len(rows), table, path, error)
+        else:
+            path = self.spill_path.with_suffix(".rejected.jsonl")
+            self.rows_rejected += len(rows)
+            logger.error("Admin API rejected %d %s rows, moved to %s: %s", len(rows), table, path, error)
+        _append_lines(path, table, rows)
+
+    def _drain_spill(self) -> int:
+        # Move the file aside first so rows spilled while draining aren't lost
+        draining = self._draining_path()
+        if not draining.exists():
+            self.spill_path.replace(draining)
+
+        spilled: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        with open(draining, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    spilled[entry["table"]].append(entry["row"])
+
+        written = 0
+        for table, rows in spilled.items():
+            for start in range(0, len(rows), self.max_rows):
+                chunk = rows[start:start + self.max_rows]
+                # Upsert on id: a spilled insert may have landed after all
+                landed, _ = self._write(table, chunk, lambda part: self.client.upsert(table, part, on_conflict="id"))
+                written += landed
+        draining.unlink()
+        if written:
+            logger.info("Replayed %d spilled log rows", written)
+        return written
+
+
+def _append_lines(path: Path, table: str, rows: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps({"table": table, "row": row}, default=str) + "\n")
+
+
+def get_log_buffer() -> LogBuffer:
+    """Get a log buffer writing through the shared Admin API client."""
+    if config is None:
+        raise RuntimeError("Config not initialized - ensure environment variables are set")
+    return LogBuffer(
+        db,
+        max_rows=config.log_buffer_max_rows,
+        flush_interval=config.log_buffer_flush_interval,
+        spill_path=config.log_buffer_spill_path or None,
+        enabled=config.log_buffer_enabled,
+    )
+
+
+_log_sink: Optional[LogBuffer] = None
+_log_sink_lock = threading.Lock()
+
+
+def get_log_sink() -> LogBuffer:
+    """The shared log buffer, created on first use and flushed when the process exits."""
+    global _log_sink
+    if _log_sink is None:
+        with _log_sink_lock:
+            if _log_sink is None:
+                sink = get_log_buffer()
+                atexit.register(sink.close)
+                _log_sink = sink
+    return _log_sink
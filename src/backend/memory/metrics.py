@@ -0,0 +1,306 @@
+"""
+Latency and payload instrumentation for memory operations.
+
+Every request the memory clients send is recorded per (action, table):
+
+- a latency histogram (as seen by the caller, so including retries, cache
+  hits and waits on coalesced reads),
+- request and response bytes on the wire (after compression; the
+  uncompressed totals are in the client's compression_stats()),
+- error counts by error code,
+- an in-flight gauge,
+- how many calls were answered from the cache or shared with an identical
+  in-flight read.
+
+Calls are also attributed to the agent and chapter running them through
+context variables. The agent runner wraps each run in attribute_to(), so
+the memory I/O time of a single run can be read off its MemoryIO:
+
+    with attribute_to(agent="chapter_writer", chapter_id=chapter_id) as io:
+        ...
+    io.seconds, io.requests
+
+Process-wide totals are kept per agent; per-(agent, chapter) totals are
+kept only for the most recently active chapters (MAX_CHAPTER_TOTALS), so a
+long-running server doesn't grow an entry, or a Prometheus series, per
+chapter it ever touched.
+
+Read everything with metrics.snapshot(), or metrics.to_prometheus() for
+scraping; the API server exposes both at /api/metrics/memory.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (agent, chapter) totals kept, least recently active dropped first
+MAX_CHAPTER_TOTALS = 256
+
+
+@dataclass
+class MemoryIO:
+    """Memory I/O attributed to one agent run (or any attribute_to block)."""
+    agent: Optional[str] = None
+    chapter_id: Optional[str] = None
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def add(self, call: "Call") -> None:
+        self.requests += 1
+        self.errors += int(call.error is not None)
+        self.seconds += call.seconds
+        self.request_bytes += call.request_bytes
+        self.response_bytes += call.response_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "chapter_id": self.chapter_id,
+            "requests": self.requests,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 6),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+        }
+
+
+_attribution: ContextVar[Optional[MemoryIO]] = ContextVar("memory_attribution", default=None)
+_current_call: ContextVar[Optional["Call"]] = ContextVar("memory_current_call", default=None)
+
+
+@contextmanager
+def attribute_to(agent: Optional[str] = None, chapter_id: Optional[str] = None) -> Iterator[MemoryIO]:
+    """Attribute memory calls made inside the block to an agent and chapter."""
+    io = MemoryIO(agent=agent, chapter_id=chapter_id)
+    token = _attribution.set(io)
+    try:
+        yield io
+    finally:
+        _attribution.reset(token)
+
+
+@dataclass
+class Call:
+    """One memory call being timed."""
+    action: str
+    table: str
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    attempts: int = 0
+    source: str = "api"  # api, cache, shared or journal
+    error: Optional[str] = None
+
+
+def current_call() -> Optional[Call]:
+    """The call being timed in this context, for lower layers to annotate."""
+    return _current_call.get()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: the upper bound of the bucket containing it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+            "buckets": {str(b): c for b, c in zip(self.buckets + (float("inf"),), self.counts)},
+        }
+
+
+class OperationStats:
+    """Counters for one (action, table)."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.attempts = 0
+        self.in_flight = 0
+        self.errors: Dict[str, int] = {}
+        self.sources: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.to_dict(),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "attempts": self.attempts,
+            "in_flight": self.in_flight,
+            "errors": dict(self.errors),
+            "sources": dict(self.sources),
+        }
+
+
+class MemoryMetrics:
+    """Process-wide registry of memory call metrics."""
+
+    def __init__(self, max_chapters: int = MAX_CHAPTER_TOTALS):
+        self._lock = threading.Lock()
+        self._operations: Dict[Tuple[str, str], OperationStats] = {}
+        self._by_agent: Dict[Optional[str], MemoryIO] = {}
+        self.max_chapters = max_chapters
+        self._by_chapter: "OrderedDict[Tuple[Optional[str], str], MemoryIO]" = OrderedDict()
+
+    @contextmanager
+    def track(self, action: str, table: str) -> Iterator[Call]:
+        """Time a memory call and record it when the block exits."""
+        call = Call(action=action, table=table)
+        key = (action, table)
+        with self._lock:
+            stats = self._operations.get(key)
+            if stats is None:
+                stats = self._operations[key] = OperationStats()
+            stats.in_flight += 1
+        token = _current_call.set(call)
+        try:
+            yield call
+        except Exception as e:
+            call.error = getattr(e, "code", None) or type(e).__name__
+            raise
+        finally:
+            _current_call.reset(token)
+            call.seconds = time.perf_counter() - call.started
+            self._record(stats, call)
+
+    def _record(self, stats: OperationStats, call: Call) -> None:
+        io = _attribution.get()
+        with self._lock:
+            stats.in_flight -= 1
+            stats.latency.observe(call.seconds)
+            stats.request_bytes += call.request_bytes
+            stats.response_bytes += call.response_bytes
+            stats.attempts += call.attempts
+            stats.sources[call.source] = stats.sources.get(call.source, 0) + 1
+            if call.error is not None:
+                stats.errors[call.error] = stats.errors.get(call.error, 0) + 1
+
+            agent = io.agent if io is not None else None
+            totals = self._by_agent.get(agent)
+            if totals is None:
+                totals = self._by_agent[agent] = MemoryIO(agent=agent)
+            totals.add(call)
+            if io is not None and io.chapter_id is not None:
+                self._add_chapter(io, call)
+            # Under the lock too: an agent run's tool calls can run in parallel
+            if io is not None:
+                io.add(call)
+
+    def _add_chapter(self, io: MemoryIO, call: Call) -> None:
+        """Add call to its (agent, chapter) totals; called with the lock held."""
+        key = (io.agent, io.chapter_id)
+        totals = self._by_chapter.get(key)
+        if totals is None:
+            totals = self._by_chapter[key] = MemoryIO(agent=io.agent, chapter_id=io.chapter_id)
+            while len(self._by_chapter) > self.max_chapters:
+                self._by_chapter.popitem(last=False)
+        else:
+            self._by_chapter.move_to_end(key)
+        totals.add(call)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All counters as plain JSON-able data."""
+        with self._lock:
+            return {
+                "operations": [
+                    {"action": action, "table": table, **stats.to_dict()}
+                    for (action, table), stats in sorted(self._operations.items())
+                ],
+                "by_agent": [io.to_dict() for io in self._by_agent.values()],
+                "by_chapter": [io.to_dict() for io in self._by_chapter.values()],
+            }
+
+    def to_prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# TYPE bookmaker_memory_request_seconds histogram",
+        ]
+        with self._lock:
+            operations = sorted(self._operations.items())
+            for (action, table), stats in operations:
+                labels = f'action="{action}",table="{table}"'
+                cumulative = 0
+                for bound, count in zip(stats.latency.buckets + (float("inf"),), stats.latency.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'bookmaker_memory_request_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"bookmaker_memory_request_seconds_sum{{{labels}}} {stats.latency.sum}")
+                lines.append(f"bookmaker_memory_request_seconds_count{{{labels}}} {stats.latency.count}")
+
+            for name, attr in (("request_bytes", "request_bytes"), ("response_bytes", "response_bytes")):
+                lines.append(f"# TYPE bookmaker_memory_{name}_total counter")
+                for (action, table), stats in operations:
+                    lines.append(
+                        f'bookmaker_memory_{name}_total{{action="{action}",table="{table}"}} {getattr(stats, attr)}'
+                    )
+
+            lines.append("# TYPE bookmaker_memory_in_flight gauge")
+            for (action, table), stats in operations:
+                lines.append(f'bookmaker_memory_in_flight{{action="{action}",table="{table}"}} {stats.in_flight}')
+
+            lines.append("# TYPE bookmaker_memory_errors_total counter")
+            for (action, table), stats in operations:
+                for code, count in sorted(stats.errors.items()):
+                    lines.append(
+                        f'bookmaker_memory_errors_total{{action="{action}",table="{table}",code="{code}"}} {count}'
+                    )
+
+            lines.append("# TYPE bookmaker_memory_agent_seconds_total counter")
+            for io in self._by_agent.values():
+                lines.append(f'bookmaker_memory_agent_seconds_total{{agent="{io.agent or ""}"}} {io.seconds}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all counters (in-flight calls still record when they finish)."""
+        with self._lock:
+            self._operations = {
+                key: OperationStats() for key, stats in self._operations.items() if stats.in_flight
+            }
+            self._by_agent = {}
+            self._by_chapter = OrderedDict()
+
+
+# Shared registry used by both memory clients
+metrics = MemoryMetrics()
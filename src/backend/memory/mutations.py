@@ -1,6 +1,8 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from .client import db
+from .delta import build_patch
+from .log_buffer import get_log_sink
 
 
 # Project mutations
@@ -33,8 +35,7 @@ def create_chapters(project_id: str, chapters: List[Dict[str, Any]]) -> List[Dic
     """Create multiple chapters for a project."""
     for ch in chapters:
         ch["project_id"] = project_id
-    result = db.insert("chapters", data=chapters)
-    return result if isinstance(result, list) else [result]
+    return db.insert_many("chapters", chapters)
 
 
 def update_chapter(chapter_id: str, data: Dict[str, Any]) -> None:
@@ -43,6 +44,26 @@ def update_chapter(chapter_id: str, data: Dict[str, Any]) -> None:
     db.update("chapters", data=data, filters={"id.eq": chapter_id})
 
 
+def patch_chapter(chapter: Dict[str, Any], changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply changes to a chapter row as read, uploading only the edited text.
+
+    Raises AdminAPIError with code CONFLICT if the chapter was updated since
+    it was read. Returns the updated row, or None if the write was queued in
+    the write journal (see journal.py).
+    """
+    data, patches = build_patch(chapter, changes)
+    if not data and not patches:
+        return chapter
+    rows = db.patch(
+        "chapters",
+        filters={"id.eq": chapter["id"]},
+        data=data,
+        patches=patches,
+        if_updated_at=chapter["updated_at"]
+    )
+    return rows[0] if rows else None
+
+
 def update_chapter_status(chapter_id: str, status: str, current_phase: Optional[int] = None) -> None:
     """Update chapter status and optionally current phase."""
     data = {"status": status, "updated_at": datetime.utcnow().isoformat()}
@@ -107,8 +128,7 @@ def create_tactic(project_id: str, chapter_id: str, tactic: Dict[str, Any]) -> D
 
 def create_tactics_batch(tactics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Create multiple tactics at once."""
-    result = db.insert("tactics", data=tactics)
-    return result if isinstance(result, list) else [result]
+    return db.insert_many("tactics", tactics)
 
 
 def update_tactic(tactic_id: str, data: Dict[str, Any]) -> None:
@@ -138,8 +158,7 @@ def create_glossary_batch(project_id: str, terms: List[Dict[str, Any]]) -> List[
     """Create multiple glossary terms."""
     for term in terms:
         term["project_id"] = project_id
-    result = db.insert("glossary", data=terms)
-    return result if isinstance(result, list) else [result]
+    return db.insert_many("glossary", terms)
 
 
 def update_glossary_spanish(term_id: str, spanish_term: str, spanish_definition: Optional[str] = None) -> None:
@@ -281,25 +300,18 @@ def delete_cross_ref(cross_ref_id: str) -> None:
 
 # Book context mutations
 def set_book_context(project_id: str, key: str, value: str) -> Dict[str, Any]:
-    """Set a book context value (upsert)."""
-    existing = db.select(
+    """Set a book context value (upsert on project_id + key)."""
+    result = db.upsert(
         "book_context",
-        filters={"project_id.eq": project_id, "key.eq": key}
-    )
-    if existing:
-        db.update(
-            "book_context",
-            data={"value": value, "updated_at": datetime.utcnow().isoformat()},
-            filters={"project_id.eq": project_id, "key.eq": key}
-        )
-        return existing[0]
-    else:
-        result = db.insert("book_context", data={
+        data={
             "project_id": project_id,
             "key": key,
-            "value": value
-        })
-        return result[0] if isinstance(result, list) else result
+            "value": value,
+            "updated_at": datetime.utcnow().isoformat()
+        },
+        on_conflict="project_id,key"
+    )
+    return result[0] if isinstance(result, list) else result
 
 
 def save_style_guide(project_id: str, style_guide: str) -> None:
@@ -348,8 +360,7 @@ def log_decision(
         data["chapter_id"] = chapter_id
     if alternatives:
         data["alternatives"] = alternatives
-    result = db.insert("decisions", data=data)
-    return result[0] if isinstance(result, list) else result
+    return get_log_sink().append("decisions", data)
 
 
 # Validation log mutations
@@ -372,8 +383,7 @@ def log_validation(
         data["chapter_id"] = chapter_id
     if failures:
         data["failures"] = failures
-    result = db.insert("validation_log", data=data)
-    return result[0] if isinstance(result, list) else result
+    return get_log_sink().append("validation_log", data)
 
 
 # Pipeline logging
@@ -385,7 +395,7 @@ def log_pipeline_event(
     message: str,
     chapter_id: Optional[str] = None,
     details: Optional[Dict[str, Any]] = None
-) -> None:
+) -> Dict[str, Any]:
     """Log a pipeline event."""
     data = {
         "project_id": project_id,
@@ -398,7 +408,7 @@ def log_pipeline_event(
         data["chapter_id"] = chapter_id
     if details:
         data["details"] = details
-    db.insert("pipeline_logs", data=data)
+    return get_log_sink().append("pipeline_logs", data)
 
 
 # Output files
@@ -0,0 +1,22 @@
+"""
+Constants of the admin-api protocol shared by its clients and the tools.
+
+Kept apart from local_backend.py so importing the clients or the agent
+tools doesn't load the SQLite stand-in. Mirrors admin-api/index.ts.
+"""
+
+from typing import Optional
+
+# ADMIN_API_URL prefix that selects the in-process SQLite backend
+LOCAL_URL_PREFIX = "sqlite://"
+
+# Parts of a "context" request, in response order (CONTEXT_PARTS in index.ts)
+CONTEXT_PARTS = ("project", "chapter", "chapters", "book_context", "glossary", "tactics", "cross_refs")
+
+# Columns of the "chapters" context part
+CONTEXT_CHAPTER_COLUMNS = "id,chapter_number,title,status,current_phase"
+
+
+def is_local_url(url: Optional[str]) -> bool:
+    """Whether an ADMIN_API_URL points at the in-process SQLite backend."""
+    return bool(url) and url.startswith(LOCAL_URL_PREFIX)
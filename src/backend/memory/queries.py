@@ -1,19 +1,35 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from .client import db
 
 
+# Column sets for callers that don't need full chapter rows (which carry
+# every draft, edit and translation of the chapter text)
+CHAPTER_STATUS_COLUMNS = ["id", "chapter_number", "status", "current_phase"]
+CHAPTER_LIST_COLUMNS = [
+    "id", "project_id", "chapter_number", "title", "status", "current_phase",
+    "word_count", "quality_score", "created_at", "updated_at",
+] + [f"phase_{n}_complete" for n in range(1, 10)]
+# Long text columns of a chapter, the ones read in ranges
+CHAPTER_TEXT_COLUMNS = [
+    "original_text", "transformed_text", "draft_text", "edited_text", "spanish_text", "final_text", "summary",
+]
+CHAPTER_SUMMARY_COLUMNS = ["id", "chapter_number", "title", "summary", "takeaways"]
+PROJECT_STATUS_COLUMNS = ["id", "status", "current_phase"]
+
+
 # Project queries
-def get_project(project_id: str) -> Dict[str, Any]:
+def get_project(project_id: str, columns: Optional[List[str]] = None) -> Dict[str, Any]:
     """Get a project by ID."""
-    return db.select_single("projects", filters={"id.eq": project_id})
+    return db.select_single("projects", filters={"id.eq": project_id}, columns=columns)
 
 
-def get_project_chapters(project_id: str) -> List[Dict[str, Any]]:
+def get_project_chapters(project_id: str, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """Get all chapters for a project, ordered by chapter_number."""
     return db.select(
         "chapters",
         filters={"project_id.eq": project_id},
-        options={"order": {"column": "chapter_number", "ascending": True}}
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=columns
     )
 
 
@@ -41,6 +57,34 @@ def get_chapters_by_phase(project_id: str, phase: int, complete: bool = True) ->
     )
 
 
+# Progress counts (computed server-side, no rows transferred)
+def count_chapters(project_id: str) -> int:
+    """Count chapters in a project."""
+    return db.count("chapters", filters={"project_id.eq": project_id})
+
+
+def count_chapters_by_status(project_id: str) -> Dict[str, int]:
+    """Count a project's chapters per status, e.g. {"completed": 12, "pending": 3}."""
+    groups = db.aggregate("chapters", ["status"], filters={"project_id.eq": project_id})
+    return {g["status"]: g["count"] for g in groups}
+
+
+def count_chapters_by_current_phase(project_id: str) -> Dict[int, int]:
+    """Count a project's chapters per current_phase."""
+    groups = db.aggregate("chapters", ["current_phase"], filters={"project_id.eq": project_id})
+    return {g["current_phase"]: g["count"] for g in groups}
+
+
+def count_chapters_phase_complete(project_id: str) -> Dict[int, int]:
+    """Count how many of a project's chapters have completed each phase (1-9)."""
+    phase_fields = [f"phase_{n}_complete" for n in range(1, 10)]
+    groups = db.aggregate("chapters", phase_fields, filters={"project_id.eq": project_id})
+    return {
+        n: sum(g["count"] for g in groups if g.get(f"phase_{n}_complete"))
+        for n in range(1, 10)
+    }
+
+
 # Tactics queries
 def get_project_tactics(project_id: str) -> List[Dict[str, Any]]:
     """Get all tactics for a project."""
@@ -181,6 +225,20 @@ def get_all_book_context(project_id: str) -> List[Dict[str, Any]]:
     return db.select("book_context", filters={"project_id.eq": project_id})
 
 
+def get_agent_context(
+    project_id: str,
+    chapter_id: Optional[str] = None,
+    parts: Optional[List[str]] = None,
+    keys: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Get everything an agent reads before it starts, in one request.
+
+    parts picks from project, chapter, chapters, book_context, glossary,
+    tactics and cross_refs; keys limits the book_context entries.
+    """
+    return db.context(project_id, chapter_id=chapter_id, parts=parts, keys=keys)
+
+
 def get_style_guide(project_id: str) -> Optional[str]:
     """Get the style guide for a project."""
     result = get_book_context(project_id, "style_guide")
@@ -202,11 +260,7 @@ def get_spanish_style_guide(project_id: str) -> Optional[str]:
 # Decision queries
 def get_chapter_decisions(chapter_id: str) -> List[Dict[str, Any]]:
     """Get all decisions made for a chapter."""
-    return db.select(
-        "decisions",
-        filters={"chapter_id.eq": chapter_id},
-        options={"order": {"column": "created_at", "ascending": True}}
-    )
+    return list(iter_chapter_decisions(chapter_id))
 
 
 def get_agent_decisions(project_id: str, agent_name: str) -> List[Dict[str, Any]]:
@@ -220,11 +274,7 @@ def get_agent_decisions(project_id: str, agent_name: str) -> List[Dict[str, Any]
 # Validation log queries
 def get_chapter_validations(chapter_id: str) -> List[Dict[str, Any]]:
     """Get all validation results for a chapter."""
-    return db.select(
-        "validation_log",
-        filters={"chapter_id.eq": chapter_id},
-        options={"order": {"column": "created_at", "ascending": False}}
-    )
+    return list(iter_chapter_validations(chapter_id))
 
 
 def get_phase_validations(project_id: str, phase: int) -> List[Dict[str, Any]]:
@@ -249,7 +299,8 @@ def get_previous_chapter_summaries(project_id: str, before_chapter: int) -> List
     return db.select(
         "chapters",
         filters={"project_id.eq": project_id, "chapter_number.lt": before_chapter},
-        options={"order": {"column": "chapter_number", "ascending": True}}
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=CHAPTER_SUMMARY_COLUMNS
     )
 
 
@@ -258,7 +309,8 @@ def get_all_chapter_summaries(project_id: str) -> List[Dict[str, Any]]:
     return db.select(
         "chapters",
         filters={"project_id.eq": project_id},
-        options={"order": {"column": "chapter_number", "ascending": True}}
+        options={"order": {"column": "chapter_number", "ascending": True}},
+        columns=CHAPTER_SUMMARY_COLUMNS
     )
 
 
@@ -286,10 +338,60 @@ def get_chapter_logs(chapter_id: str) -> List[Dict[str, Any]]:
 
 def get_agent_logs(project_id: str, agent_name: str) -> List[Dict[str, Any]]:
     """Get logs for a specific agent."""
-    return db.select(
+    return list(iter_agent_logs(project_id, agent_name))
+
+
+# Streaming reads for large append-only tables (keyset-paginated)
+def iter_project_logs(project_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream a project's pipeline logs, newest first."""
+    return db.iter_select(
+        "pipeline_logs",
+        filters={"project_id.eq": project_id},
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
+    )
+
+
+def iter_agent_logs(project_id: str, agent_name: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream logs for a specific agent, newest first."""
+    return db.iter_select(
         "pipeline_logs",
         filters={"project_id.eq": project_id, "agent_name.eq": agent_name},
-        options={"order": {"column": "created_at", "ascending": False}}
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
+    )
+
+
+def iter_chapter_decisions(chapter_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream all decisions made for a chapter, oldest first."""
+    return db.iter_select(
+        "decisions",
+        filters={"chapter_id.eq": chapter_id},
+        order_by="created_at",
+        page_size=page_size
+    )
+
+
+def iter_project_decisions(project_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream all decisions made for a project, oldest first."""
+    return db.iter_select(
+        "decisions",
+        filters={"project_id.eq": project_id},
+        order_by="created_at",
+        page_size=page_size
+    )
+
+
+def iter_chapter_validations(chapter_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream all validation results for a chapter, newest first."""
+    return db.iter_select(
+        "validation_log",
+        filters={"chapter_id.eq": chapter_id},
+        order_by="created_at",
+        ascending=False,
+        page_size=page_size
     )
 
 
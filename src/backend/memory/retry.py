@@ -0,0 +1,104 @@
+"""
+Retry policy for Admin API requests.
+
+Follows the "Transient Failures" category in docs/07-ERROR-HANDLING.md:
+network errors, timeouts, rate limits and 5xx responses are retried with
+exponential backoff (1s -> 5s -> 25s, capped at 30s) plus jitter. Anything
+else (validation, permissions, constraint violations) fails immediately.
+
+Only requests that are safe to repeat are retried. Reads, updates, upserts
+and deletes are idempotent as-is. Inserts are made idempotent by giving
+every new row a client-generated id before the first attempt and sending
+retries as an upsert on that id, so a request that actually landed before
+its response was lost doesn't create duplicate rows.
+
+Patches are never retried: their updated_at precondition means a repeat of
+one that landed fails with CONFLICT, which would be reported as a lost race.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict
+
+# Actions that can be repeated without changing the outcome
+IDEMPOTENT_ACTIONS = {"select", "count", "aggregate", "context", "update", "upsert", "delete"}
+
+# HTTP statuses and admin-api error codes that indicate a transient failure
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+TRANSIENT_CODES = {"NETWORK_ERROR", "TIMEOUT", "SERVER_ERROR", "RATE_LIMITED"}
+
+
+@dataclass
+class RetryPolicy:
+    """How many times, and how far apart, to retry transient failures."""
+    max_retries: int = 3
+    base_delay: float = 1.0
+    multiplier: float = 5.0
+    max_delay: float = 30.0
+    jitter: float = 0.25
+    retry_inserts: bool = True
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number attempt + 1."""
+        delay = min(self.base_delay * (self.multiplier ** attempt), self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def should_retry(self, payload: Dict[str, Any], error: Exception, attempt: int) -> bool:
+        """Whether a failed request should be sent again."""
+        if attempt >= self.max_retries or not is_transient(error):
+            return False
+        return self.is_retry_safe(payload)
+
+    def is_retry_safe(self, payload: Dict[str, Any]) -> bool:
+        operations = payload.get("operations") if payload.get("action") == "batch" else [payload]
+        for op in operations or []:
+            action = op.get("action")
+            if action == "insert":
+                if not self.retry_inserts:
+                    return False
+            elif action not in IDEMPOTENT_ACTIONS:
+                return False
+        return True
+
+    def prepare(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Give every row being inserted a client-generated id (its idempotency key)."""
+        if not self.retry_inserts:
+            return payload
+        if payload.get("action") == "batch":
+            return {**payload, "operations": [_with_row_ids(op) for op in payload.get("operations", [])]}
+        return _with_row_ids(payload)
+
+    def for_retry(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Rewrite inserts as upserts on id so a repeated insert is a no-op."""
+        if payload.get("action") == "batch":
+            return {**payload, "operations": [_insert_as_upsert(op) for op in payload.get("operations", [])]}
+        return _insert_as_upsert(payload)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an error falls in the transient (retryable) category."""
+    code = getattr(error, "code", None)
+    status = getattr(error, "status", None)
+    return code in TRANSIENT_CODES or status in TRANSIENT_STATUSES
+
+
+def with_row_ids(data: Any) -> Any:
+    """Copy of insert data with an id on every row that lacks one."""
+    if isinstance(data, list):
+        return [row if row.get("id") else {**row, "id": str(uuid.uuid4())} for row in data]
+    if isinstance(data, dict) and not data.get("id"):
+        return {**data, "id": str(uuid.uuid4())}
+    return data
+
+
+def _with_row_ids(op: Dict[str, Any]) -> Dict[str, Any]:
+    if op.get("action") != "insert" or op.get("data") is None:
+        return op
+    return {**op, "data": with_row_ids(op["data"])}
+
+
+def _insert_as_upsert(op: Dict[str, Any]) -> Dict[str, Any]:
+    if op.get("action") != "insert":
+        return op
+    return {**op, "action": "upsert", "options": {**(op.get("options") or {}), "onConflict": "id"}}
@@ -0,0 +1,170 @@
+"""
+Single-flight coalescing for identical concurrent reads.
+
+When several agents start together they all ask for the same style guide
+and glossary within milliseconds. SingleFlight lets the first caller for a
+request key make the HTTP call while identical callers that arrive before
+it finishes wait for, and share, its result (or its error):
+
+    result = flights.do(flights.key(payload), lambda: client._deliver(payload))
+
+Coalescing only covers requests that are in flight at the same time; it
+works with or without the read cache, which covers repeats over time.
+
+The key includes the write generation of the table read, which the client
+bumps after every write (after_write). A read issued after a caller's own
+write therefore never joins a flight that started before the write and
+may return the old rows. Callers that shared a flight each get their own
+deep copy of the result, so no two callers share mutable rows.
+"""
+
+import asyncio
+import copy
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .cache import cache_key, write_operations
+
+
+@dataclass
+class FlightStats:
+    """How many reads were sent versus shared with an in-flight request."""
+    sent: int = 0
+    shared: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class _WriteGenerations:
+    """Per-table write counters that keep flights from spanning a write."""
+
+    # Generation of reads that span tables (batches, context)
+    ANY_TABLE = "*"
+
+    def __init__(self):
+        self._generations_lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+
+    def key(self, payload: Dict[str, Any]) -> str:
+        """Flight key for a read: its cache key plus the table's write generation."""
+        table = payload.get("table") or self.ANY_TABLE
+        with self._generations_lock:
+            generation = self._generations.get(table, 0)
+        return f"{generation}:{cache_key(payload)}"
+
+    def after_write(self, payload: Dict[str, Any]) -> None:
+        """Start new flights for every table a write (or write batch) touched."""
+        with self._generations_lock:
+            for op, _ in write_operations(payload):
+                table = op.get("table", self.ANY_TABLE)
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._generations[self.ANY_TABLE] = self._generations.get(self.ANY_TABLE, 0) + 1
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight(_WriteGenerations):
+    """Coalesces identical calls made concurrently from different threads."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = FlightStats()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats.sent += 1
+            else:
+                call.followers += 1
+                self._stats.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.followers > 0
+            call.done.set()
+        # Followers copy call.result after this returns, so the leader can't
+        # hand the same object to its caller
+        return copy.deepcopy(call.result) if shared else call.result
+
+    def stats(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(**asdict(self._stats))
+
+
+class AsyncSingleFlight(_WriteGenerations):
+    """Coalesces identical calls made concurrently on an event loop."""
+
+    def __init__(self):
+        super().__init__()
+        # Futures belong to one loop, so flights are keyed per loop
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._followers: Dict[Tuple[int, str], int] = {}
+        self._stats = FlightStats()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn(), or the identical call already running on this loop."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        while True:
+            future = self._calls.get(flight_key)
+            if future is None:
+                break
+            self._stats.shared += 1
+            self._followers[flight_key] = self._followers.get(flight_key, 0) + 1
+            try:
+                return copy.deepcopy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: make the call ourselves
+                if not future.cancelled():
+                    raise
+                self._stats.shared -= 1
+
+        future = loop.create_future()
+        self._calls[flight_key] = future
+        self._stats.sent += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a flight without followers doesn't warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Followers copy the result when they resume, after the leader
+            return copy.deepcopy(result) if self._followers.get(flight_key) else result
+        finally:
+            self._calls.pop(flight_key, None)
+            self._followers.pop(flight_key, None)
+
+    def stats(self) -> FlightStats:
+        return FlightStats(**asdict(self._stats))
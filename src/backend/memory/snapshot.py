@@ -0,0 +1,235 @@
+"""
+Project snapshots: export every project-scoped row to a file and load it back.
+
+docs/03-MEMORY-SYSTEM.md calls for snapshots at phase boundaries so a run
+can resume, or a project can be forked at phase 3 and later phases re-run
+without repeating the LLM work before it:
+
+    snapshot_project(project_id, "snapshots/book-phase3.ndjson.gz")
+    restore_project("snapshots/book-phase3.ndjson.gz", project_id=fork_id)
+
+The file is line-delimited JSON (gzipped when the path ends in .gz). The
+first line is a header with the project row; each table then gets a line
+naming its columns, followed by one line per row holding just the values
+in that order:
+
+    {"format": "bookmaker-snapshot", "version": 1, "project_id": ..., "project": {...}}
+    {"table": "chapters", "columns": ["id", "project_id", ...]}
+    ["0b6f...", "5e1c...", ...]
+
+Rows are read with keyset pagination and written with insert_many, so
+neither side holds a whole table in memory.
+
+Projects can't be created through admin-api, so restore_project() writes
+into an existing project: by default the one the snapshot was taken from
+(e.g. a fresh database), or any other project to fork into. A fork gets
+new ids for every row, with references between rows rewritten to match.
+"""
+
+import argparse
+import gzip
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+from .client import AdminAPIClient, db
+from .codec import codec
+
+SNAPSHOT_FORMAT = "bookmaker-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Tables in restore order: chapters before the rows that reference them
+PROJECT_TABLES = ["chapters", "tactics", "glossary", "cross_refs", "book_context", "decisions", "validation_log"]
+CHAPTER_TABLES = ["diagrams", "issues", "quality_scores"]
+SNAPSHOT_TABLES = PROJECT_TABLES + CHAPTER_TABLES
+
+# Columns holding ids of other snapshot rows, rewritten when forking
+REFERENCE_COLUMNS = (
+    "project_id", "chapter_id", "from_chapter_id", "to_chapter_id", "duplicate_of", "introduced_in_chapter"
+)
+
+# JSON arrays of chapter ids (restored after chapters, so every id is known)
+REFERENCE_LIST_COLUMNS = ("used_in_chapters",)
+
+# Project columns restored onto the target project
+PROJECT_STATE_COLUMNS = ["status", "current_phase", "overall_quality_score"]
+
+# Chapter ids per "chapter_id.in" filter when exporting chapter-scoped tables
+CHAPTER_ID_BATCH = 100
+
+# Rows buffered per insert_many call when restoring
+RESTORE_BATCH_ROWS = 2000
+
+PathLike = Union[str, Path]
+
+
+@contextmanager
+def _open(path: PathLike, mode: str) -> Iterator[IO[bytes]]:
+    path = Path(path)
+    if "w" in mode:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    handle = gzip.open(path, mode) if path.suffix == ".gz" else open(path, mode)
+    try:
+        yield handle
+    finally:
+        handle.close()
+
+
+def _order_column(table: str) -> str:
+    # book_context rows carry updated_at only
+    return "updated_at" if table == "book_context" else "created_at"
+
+
+def _table_rows(client: AdminAPIClient, table: str, project_id: str, chapter_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    if table in PROJECT_TABLES:
+        yield from client.iter_select(table, filters={"project_id.eq": project_id}, order_by=_order_column(table))
+        return
+    for i in range(0, len(chapter_ids), CHAPTER_ID_BATCH):
+        yield from client.iter_select(
+            table,
+            filters={"chapter_id.in": chapter_ids[i:i + CHAPTER_ID_BATCH]},
+            order_by=_order_column(table)
+        )
+
+
+def snapshot_project(project_id: str, path: PathLike, client: Optional[AdminAPIClient] = None) -> Dict[str, int]:
+    """Write every project-scoped row of a project to path. Returns row counts by table."""
+    client = client or db
+    projects = client.select("projects", filters={"id.eq": project_id})
+    if not projects:
+        raise ValueError(f"Project not found: {project_id}")
+
+    counts: Dict[str, int] = {}
+    chapter_ids: List[str] = []
+    with _open(path, "wb") as out:
+        out.write(codec.encode({
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "project_id": project_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "project": projects[0],
+        }) + b"\n")
+        for table in SNAPSHOT_TABLES:
+            columns: Optional[List[str]] = None
+            counts[table] = 0
+            for row in _table_rows(client, table, project_id, chapter_ids):
+                if columns is None:
+                    columns = list(row)
+                    out.write(codec.encode({"table": table, "columns": columns}) + b"\n")
+                out.write(codec.encode([row.get(c) for c in columns]) + b"\n")
+                counts[table] += 1
+                if table == "chapters":
+                    chapter_ids.append(row["id"])
+    return counts
+
+
+def read_snapshot_header(path: PathLike) -> Dict[str, Any]:
+    """The header line of a snapshot file (format, version, project row...)."""
+    with _open(path, "rb") as f:
+        header = codec.decode(f.readline())
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Not a project snapshot: {path}")
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+    return header
+
+
+def restore_project(
+    path: PathLike,
+    project_id: Optional[str] = None,
+    client: Optional[AdminAPIClient] = None
+) -> Dict[str, int]:
+    """Load a snapshot into an existing project. Returns row counts by table.
+
+    project_id defaults to the project the snapshot was taken from. Any
+    other project is treated as a fork: every row gets a new id. The target
+    should hold none of the snapshot's tables yet.
+    """
+    client = client or db
+    header = read_snapshot_header(path)
+    source_id = header["project_id"]
+    target_id = project_id or source_id
+    if not client.select("projects", filters={"id.eq": target_id}, columns=["id"]):
+        raise ValueError(f"Project not found: {target_id} (create it before restoring)")
+
+    ids: Optional[Dict[str, str]] = None if target_id == source_id else {source_id: target_id}
+    counts: Dict[str, int] = {table: 0 for table in SNAPSHOT_TABLES}
+    table: Optional[str] = None
+    columns: List[str] = []
+    pending: List[Dict[str, Any]] = []
+    # Tactics marked as duplicates are inserted after the tactics they point to
+    deferred: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        if pending:
+            client.insert_many(table, pending)
+            counts[table] += len(pending)
+            pending.clear()
+
+    def finish_table() -> None:
+        flush()
+        pending.extend(deferred)
+        deferred.clear()
+        flush()
+
+    with _open(path, "rb") as f:
+        f.readline()
+        for line in f:
+            item = codec.decode(line)
+            if isinstance(item, dict):
+                finish_table()
+                table, columns = item["table"], item["columns"]
+                if table not in SNAPSHOT_TABLES:
+                    raise ValueError(f"Unexpected table in snapshot: {table}")
+                continue
+            row = dict(zip(columns, item))
+            if ids is not None:
+                row = _remap(row, ids)
+            (deferred if row.get("duplicate_of") else pending).append(row)
+            if len(pending) >= RESTORE_BATCH_ROWS:
+                flush()
+        finish_table()
+
+    state = {c: header["project"].get(c) for c in PROJECT_STATE_COLUMNS if c in header["project"]}
+    if state:
+        client.update("projects", state, {"id.eq": target_id})
+    return counts
+
+
+def _remap(row: Dict[str, Any], ids: Dict[str, str]) -> Dict[str, Any]:
+    """Give a row a new id and point its references at the new ids."""
+    row["id"] = ids.setdefault(row["id"], str(uuid.uuid4()))
+    for column in REFERENCE_COLUMNS:
+        value = row.get(column)
+        if value is not None:
+            row[column] = ids.setdefault(value, str(uuid.uuid4()))
+    for column in REFERENCE_LIST_COLUMNS:
+        values = row.get(column)
+        if isinstance(values, list):
+            row[column] = [ids.get(v, v) if isinstance(v, str) else v for v in values]
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or restore a project snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write a project to a snapshot file")
+    export.add_argument("project_id")
+    export.add_argument("path")
+    restore = commands.add_parser("restore", help="Load a snapshot file into a project")
+    restore.add_argument("path")
+    restore.add_argument("--project-id", help="Existing project to restore (fork) into")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        counts = snapshot_project(args.project_id, args.path)
+    else:
+        counts = restore_project(args.path, args.project_id)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Pooled HTTP transport for the Admin API client.
+
+All threads share one requests.Session and its HTTPAdapter: urllib3's
+connection pool is thread-safe, and a bounded pool of keep-alive
+connections to the Edge Function lets repeated memory operations reuse the
+same TCP+TLS connection instead of opening a new one per call - also when
+the calls come from short-lived worker threads.
+"""
+
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class TransportStats:
+    """Connection reuse counters for a transport."""
+    sessions: int = 0
+    requests: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+    def to_dict(self) -> Dict[str, int]:
+        data = asdict(self)
+        data["connections_reused"] = self.connections_reused
+        return data
+
+
+class PooledTransport:
+    """Thread-safe pool of keep-alive connections for POSTing to one endpoint."""
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        keep_alive: bool = True,
+    ):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._session_obj: Optional[requests.Session] = None
+        self._adapter: Optional[HTTPAdapter] = None
+        self._requests = 0
+
+    def _session(self) -> requests.Session:
+        session = self._session_obj
+        if session is not None:
+            return session
+        with self._lock:
+            if self._session_obj is None:
+                session = requests.Session()
+                session.headers["Connection"] = "keep-alive" if self.keep_alive else "close"
+                # One host, so one pool; pool_maxsize bounds the connections
+                # kept open for concurrent callers
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                    pool_block=False,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._adapter = adapter
+                self._session_obj = session
+            return self._session_obj
+
+    def post(
+        self,
+        url: str,
+        data: Any = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """POST over the shared pooled session."""
+        with self._lock:
+            self._requests += 1
+        return self._session().post(
+            url, data=data, json=json, headers=headers, timeout=self.timeout
+        )
+
+    def stats(self) -> TransportStats:
+        """Connection reuse counters."""
+        with self._lock:
+            adapter = self._adapter
+            requests_made = self._requests
+
+        opened = 0
+        if adapter is not None:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+
+        return TransportStats(
+            sessions=int(adapter is not None),
+            requests=requests_made,
+            connections_opened=opened,
+        )
+
+    def close(self) -> None:
+        """Close the session and drop its pooled connections."""
+        with self._lock:
+            session = self._session_obj
+            self._session_obj = None
+            self._adapter = None
+        if session is not None:
+            session.close()
@@ -18,6 +18,7 @@ import time
 
 from ..agents.runner import run_agent_sync, AgentResult
 from ..memory.client import db
+from ..memory.queries import CHAPTER_STATUS_COLUMNS
 
 
 # =============================================================================
@@ -143,7 +144,8 @@ class Pipeline:
         return db.select(
             "chapters",
             filters={"project_id.eq": self.project_id},
-            options={"order": {"column": "chapter_number", "ascending": True}}
+            options={"order": {"column": "chapter_number", "ascending": True}},
+            columns=CHAPTER_STATUS_COLUMNS
         )
 
     def run_agent(
@@ -2,9 +2,13 @@ import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
 
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
+// Responses at least this large are gzipped when the client accepts it.
+// (CompressionStream has no brotli, so gzip is the only encoding offered.)
+const COMPRESSION_THRESHOLD = 1024;
+
 // Table permissions matrix
 const TABLE_PERMISSIONS: Record<string, { select: boolean; insert: boolean; update: boolean; delete: boolean }> = {
   projects: { select: true, insert: false, update: true, delete: false },
@@ -23,9 +27,23 @@ const TABLE_PERMISSIONS: Record<string, { select: boolean; insert: boolean; upda
   validation_log: { select: true, insert: true, update: false, delete: false },
 };
 
-type Action = "select" | "insert" | "update" | "upsert" | "delete";
+type Action = "select" | "insert" | "update" | "patch" | "upsert" | "delete" | "count" | "aggregate";
+
+// Read-only actions that are checked against the table's select permission
+const READ_ACTIONS = ["select", "count", "aggregate"];
+
+// Rows fetched per page when aggregating (PostgREST caps responses at 1000)
+const AGGREGATE_PAGE_SIZE = 1000;
+
+// Upper bound on operations in a single batch request
+const MAX_BATCH_OPERATIONS = 500;
 
-interface RequestBody {
+// Parts an agent can fetch in one "context" request, and the columns
+// returned per chapter by the chapters part
+const CONTEXT_PARTS = ["project", "chapter", "chapters", "book_context", "glossary", "tactics", "cross_refs"];
+const CONTEXT_CHAPTER_COLUMNS = "id,chapter_number,title,status,current_phase";
+
+interface Operation {
   action: Action;
   table: string;
   data?: Record<string, unknown> | Record<string, unknown>[];
@@ -35,21 +53,83 @@ interface RequestBody {
     limit?: number;
     single?: boolean;
     count?: "exact" | "planned" | "estimated";
+    onConflict?: string;
+    columns?: string[] | string;
+    groupBy?: string[] | string;
+    keyset?: Keyset;
+    // Select only: return a character range of long text columns
+    slice?: TextSlice;
+    // Patch only: text edits per column, and the updated_at the edits were made against
+    patches?: Record<string, PatchEdit[]>;
+    ifUpdatedAt?: string;
   };
 }
 
+// Replace characters [start, end) of the stored text (in code points) with text
+type PatchEdit = [number, number, string];
+
+// Characters [offset, offset + length) (in code points) of the string values
+// of columns (default: every column). Rows report the full length of each
+// value that was cut in _lengths, so the caller can read on from there.
+interface TextSlice {
+  columns?: string[] | string;
+  offset?: number;
+  length?: number | null;
+}
+
+// Keyset pagination: order by (column, id) and resume after a cursor row
+interface Keyset {
+  column: string;
+  ascending?: boolean;
+  after?: { value: unknown; id: string } | null;
+}
+
+interface RequestBody extends Omit<Operation, "action" | "table"> {
+  action: Action | "batch" | "context";
+  table?: string;
+  // Batch only
+  operations?: Operation[];
+  transaction?: boolean;
+}
+
+// Body data of a "context" request
+interface ContextRequest {
+  project_id: string;
+  chapter_id?: string;
+  parts?: string[];
+  // book_context keys to include (default: all)
+  keys?: string[];
+}
+
 interface ApiResponse {
   success: boolean;
   data: unknown;
   count?: number | null;
-  error: { code: string; message: string } | null;
+  error: { code: string; message: string; index?: number } | null;
+}
+
+interface OperationError {
+  code: string;
+  message: string;
+  status: number;
 }
 
-function createErrorResponse(code: string, message: string, status: number): Response {
+// An operation rejected by admin-api itself rather than by the database
+interface OperationFailure extends OperationError {
+  data?: unknown;
+}
+
+function createErrorResponse(
+  code: string,
+  message: string,
+  status: number,
+  data: unknown = null,
+  index?: number,
+): Response {
   const body: ApiResponse = {
     success: false,
-    data: null,
-    error: { code, message },
+    data,
+    error: index === undefined ? { code, message } : { code, message, index },
   };
   return new Response(JSON.stringify(body), {
     status,
@@ -126,13 +206,94 @@ function applyFilters(query: any, filters: Record<string, unknown>): any {
   return result;
 }
 
+const COLUMN_NAME = /^[A-Za-z_][A-Za-z0-9_]*$/;
+
+// Normalize the columns option to a list of plain column names (null = all)
+function parseColumns(columns: string[] | string | undefined): string[] | null {
+  if (columns === undefined || columns === null) return null;
+  const list = Array.isArray(columns) ? columns : columns.split(",");
+  const names = list.map((c) => String(c).trim()).filter((c) => c.length > 0);
+  if (names.length === 0 || names.includes("*")) return null;
+  for (const name of names) {
+    if (!COLUMN_NAME.test(name)) {
+      throw new Error(`Invalid column name: '${name}'`);
+    }
+  }
+  return names;
+}
+
+// Keep only the requested columns of each row
+function projectRows(data: unknown, columns: string[] | null): unknown {
+  if (!columns || !Array.isArray(data)) return data;
+  return data.map((row) =>
+    Object.fromEntries(columns.map((c) => [c, (row as Record<string, unknown>)[c] ?? null]))
+  );
+}
+
+function isCount(value: unknown): boolean {
+  return Number.isInteger(value) && (value as number) >= 0;
+}
+
+// Cut string values down to the requested range. PostgREST can't select a
+// substring, so the database still reads the whole value, but only the
+// range is sent back over the wire.
+function sliceRows(data: unknown, slice: TextSlice | undefined): unknown {
+  if (!slice || data === null || data === undefined) return data;
+  if (Array.isArray(data)) return data.map((row) => sliceRows(row, slice));
+  const columns = parseColumns(slice.columns);
+  const offset = slice.offset ?? 0;
+  const length = slice.length ?? null;
+  const row = { ...(data as Record<string, unknown>) };
+  const lengths: Record<string, number> = {};
+  for (const column of columns ?? Object.keys(row)) {
+    const value = row[column];
+    if (typeof value !== "string") continue;
+    // A string never has more code points than UTF-16 units
+    if (offset === 0 && (length === null || value.length <= length)) continue;
+    const chars = Array.from(value);
+    const start = Math.min(offset, chars.length);
+    const end = length === null ? chars.length : Math.min(start + length, chars.length);
+    if (start === 0 && end === chars.length) continue;
+    row[column] = chars.slice(start, end).join("");
+    lengths[column] = chars.length;
+  }
+  if (Object.keys(lengths).length > 0) row._lengths = lengths;
+  return row;
+}
+
+// Quote a value for use inside a PostgREST or() filter
+function quoteFilterValue(value: unknown): string {
+  return `"${String(value).replace(/\\/g, "\\\\").replace(/"/g, '\\"')}"`;
+}
+
+// Order by (column, id) and, given a cursor, return only rows after it
+function applyKeyset(query: any, keyset: Keyset): any {
+  const ascending = keyset.ascending ?? true;
+  const cmp = ascending ? "gt" : "lt";
+  let result = query;
+
+  if (keyset.after) {
+    const value = quoteFilterValue(keyset.after.value);
+    const id = quoteFilterValue(keyset.after.id);
+    result = result.or(
+      `${keyset.column}.${cmp}.${value},and(${keyset.column}.eq.${value},id.${cmp}.${id})`
+    );
+  }
+
+  return result
+    .order(keyset.column, { ascending })
+    .order("id", { ascending });
+}
+
 // Apply options to a query
-function applyOptions(query: any, options: RequestBody["options"]): any {
+function applyOptions(query: any, options: Operation["options"]): any {
   let result = query;
   
   if (!options) return result;
   
-  if (options.order) {
+  if (options.keyset) {
+    result = applyKeyset(result, options.keyset);
+  } else if (options.order) {
     result = result.order(options.order.column, { 
       ascending: options.order.ascending ?? true 
     });
@@ -149,7 +310,504 @@ function applyOptions(query: any, options: RequestBody["options"]): any {
   return result;
 }
 
-Deno.serve(async (req) => {
+// Check table, action permissions and required fields for one operation
+function validateOperation(op: Operation): OperationError | null {
+  if (!op.action || !op.table) {
+    return { code: "INVALID_REQUEST", message: "Missing required fields: action and table", status: 400 };
+  }
+
+  // Validate table
+  if (!TABLE_PERMISSIONS[op.table]) {
+    return { code: "INVALID_TABLE", message: `Table '${op.table}' is not allowed`, status: 400 };
+  }
+
+  // Validate action for this table
+  const permissions = TABLE_PERMISSIONS[op.table];
+  const actionKey = op.action === "upsert"
+    ? "insert"
+    : op.action === "patch"
+    ? "update"
+    : READ_ACTIONS.includes(op.action) ? "select" : op.action;
+
+  if (!(actionKey in permissions)) {
+    return { code: "INVALID_ACTION", message: `Unknown action: ${op.action}`, status: 400 };
+  }
+
+  if (!permissions[actionKey as keyof typeof permissions]) {
+    return {
+      code: "INVALID_ACTION",
+      message: `Action '${op.action}' is not allowed on table '${op.table}'`,
+      status: 400,
+    };
+  }
+
+  if ((op.action === "insert" || op.action === "update" || op.action === "upsert") && !op.data) {
+    return { code: "INVALID_REQUEST", message: `Missing data for ${op.action}`, status: 400 };
+  }
+
+  if (op.action === "patch") {
+    const patches = op.options?.patches ?? {};
+    if (!isPlainObject(patches) || !isPlainObject(op.data ?? {})) {
+      return { code: "INVALID_REQUEST", message: "Patch data and patches must be objects", status: 400 };
+    }
+    if (Object.keys(op.data ?? {}).length === 0 && Object.keys(patches).length === 0) {
+      return { code: "INVALID_REQUEST", message: "Missing data or patches for patch", status: 400 };
+    }
+  }
+
+  if (op.options?.columns !== undefined) {
+    try {
+      parseColumns(op.options.columns);
+    } catch (error) {
+      return { code: "INVALID_REQUEST", message: (error as Error).message, status: 400 };
+    }
+  }
+
+  if (op.options?.keyset && !COLUMN_NAME.test(String(op.options.keyset.column))) {
+    return { code: "INVALID_REQUEST", message: "Invalid keyset column", status: 400 };
+  }
+
+  const slice = op.options?.slice;
+  if (slice !== undefined) {
+    if (op.action !== "select" || !isPlainObject(slice)) {
+      return { code: "INVALID_REQUEST", message: "slice is only supported on select", status: 400 };
+    }
+    if ((slice.offset !== undefined && !isCount(slice.offset)) ||
+        (slice.length !== undefined && slice.length !== null && !isCount(slice.length))) {
+      return { code: "INVALID_REQUEST", message: "slice offset and length must be non-negative integers", status: 400 };
+    }
+    try {
+      parseColumns(slice.columns);
+    } catch (error) {
+      return { code: "INVALID_REQUEST", message: (error as Error).message, status: 400 };
+    }
+  }
+
+  if (op.action === "aggregate") {
+    try {
+      if (!parseColumns(op.options?.groupBy)) {
+        return { code: "INVALID_REQUEST", message: "groupBy required for aggregate", status: 400 };
+      }
+    } catch (error) {
+      return { code: "INVALID_REQUEST", message: (error as Error).message, status: 400 };
+    }
+  }
+
+  if ((op.action === "update" || op.action === "patch" || op.action === "delete") &&
+      (!op.filters || Object.keys(op.filters).length === 0)) {
+    return { code: "INVALID_REQUEST", message: `Filters required for ${op.action}`, status: 400 };
+  }
+
+  return null;
+}
+
+// Run one validated operation against the database
+async function executeOperation(supabase: any, op: Operation): Promise<any> {
+  let query;
+
+  switch (op.action) {
+    case "select": {
+      const columns = parseColumns(op.options?.columns);
+      query = supabase.from(op.table).select(columns ? columns.join(",") : "*", { 
+        count: op.options?.count 
+      });
+      
+      if (op.filters) {
+        query = applyFilters(query, op.filters);
+      }
+      
+      query = applyOptions(query, op.options);
+      const result = await query;
+      if (op.options?.slice && !result.error) {
+        return { ...result, data: sliceRows(result.data, op.options.slice) };
+      }
+      return result;
+    }
+
+    case "count": {
+      query = supabase.from(op.table).select("*", {
+        count: op.options?.count ?? "exact",
+        head: true,
+      });
+      if (op.filters) {
+        query = applyFilters(query, op.filters);
+      }
+      const result = await query;
+      return { data: null, count: result.count ?? 0, error: result.error };
+    }
+
+    case "aggregate": {
+      return await aggregateRows(supabase, op);
+    }
+
+    case "insert": {
+      query = supabase.from(op.table).insert(op.data).select();
+      return await query;
+    }
+
+    case "update": {
+      query = supabase.from(op.table).update(op.data);
+      query = applyFilters(query, op.filters!);
+      query = query.select();
+      return await query;
+    }
+
+    case "patch": {
+      return await patchRow(supabase, op);
+    }
+
+    case "upsert": {
+      query = supabase.from(op.table).upsert(op.data, {
+        onConflict: op.options?.onConflict,
+      }).select();
+      return await query;
+    }
+
+    case "delete": {
+      query = supabase.from(op.table).delete();
+      query = applyFilters(query, op.filters!);
+      query = query.select();
+      return await query;
+    }
+  }
+}
+
+function isPlainObject(value: unknown): value is Record<string, unknown> {
+  return typeof value === "object" && value !== null && !Array.isArray(value);
+}
+
+// Apply [start, end, text] edits (sorted, non-overlapping, code point offsets)
+function applyEdits(text: string, edits: unknown): string {
+  if (!Array.isArray(edits)) {
+    throw new Error("Patch edits must be an array");
+  }
+  const chars = Array.from(text);
+  const parts: string[] = [];
+  let pos = 0;
+  for (const edit of edits) {
+    if (!Array.isArray(edit) || edit.length !== 3) {
+      throw new Error("Patch edits must be [start, end, text]");
+    }
+    const [start, end, replacement] = edit;
+    if (
+      !Number.isInteger(start) || !Number.isInteger(end) || typeof replacement !== "string" ||
+      start < pos || end < start || end > chars.length
+    ) {
+      throw new Error(`Patch edit out of order or out of range: [${start}, ${end}]`);
+    }
+    parts.push(chars.slice(pos, start).join(""), replacement);
+    pos = end;
+  }
+  parts.push(chars.slice(pos).join(""));
+  return parts.join("");
+}
+
+// Update one row from text edits against the version the client read.
+// The write is conditional on updated_at being unchanged since the row was
+// read here, and on it matching options.ifUpdatedAt, so a concurrent writer
+// makes the patch fail with CONFLICT instead of being overwritten.
+async function patchRow(supabase: any, op: Operation): Promise<any> {
+  const current = await applyFilters(supabase.from(op.table).select("*"), op.filters!);
+  if (current.error) {
+    return current;
+  }
+  if (current.data.length !== 1) {
+    return patchFailure("INVALID_REQUEST", `Patch filters must match exactly one row (${current.data.length} matched)`, 400);
+  }
+
+  const row = current.data[0] as Record<string, unknown>;
+  if (!("updated_at" in row)) {
+    return patchFailure("INVALID_REQUEST", `Table '${op.table}' has no updated_at column`, 400);
+  }
+  const expected = op.options?.ifUpdatedAt;
+  if (expected !== undefined && row.updated_at !== expected) {
+    return patchFailure("CONFLICT", `Row was updated at ${row.updated_at}, not ${expected}`, 409, {
+      updated_at: row.updated_at,
+    });
+  }
+
+  const data: Record<string, unknown> = { ...((op.data ?? {}) as Record<string, unknown>) };
+  for (const [column, edits] of Object.entries(op.options?.patches ?? {})) {
+    const base = row[column];
+    if (typeof base !== "string") {
+      return patchFailure("INVALID_REQUEST", `Cannot patch non-text column '${column}'`, 400);
+    }
+    try {
+      data[column] = applyEdits(base, edits);
+    } catch (error) {
+      return patchFailure("INVALID_REQUEST", `Patch for '${column}': ${(error as Error).message}`, 400);
+    }
+  }
+  // Always move updated_at, and only write the version that was read
+  data.updated_at = new Date().toISOString();
+
+  let query = supabase.from(op.table).update(data);
+  query = applyFilters(query, { ...op.filters, "updated_at.eq": row.updated_at });
+  const result = await query.select();
+  if (!result.error && result.data.length === 0) {
+    return patchFailure("CONFLICT", "Row was updated while the patch was applied", 409);
+  }
+  return result;
+}
+
+function patchFailure(code: string, message: string, status: number, data: unknown = null) {
+  const failure: OperationFailure = { code, message, status, data };
+  return { data: null, error: null, failure };
+}
+
+// Count rows per distinct combination of the groupBy columns.
+// Only the grouped columns are read from the database and only the
+// per-group counts are returned to the caller.
+async function aggregateRows(supabase: any, op: Operation): Promise<any> {
+  const groupBy = parseColumns(op.options?.groupBy)!;
+  const groups = new Map<string, Record<string, unknown>>();
+  let total = 0;
+
+  for (let from = 0; ; from += AGGREGATE_PAGE_SIZE) {
+    let query = supabase.from(op.table).select(groupBy.join(","));
+    if (op.filters) {
+      query = applyFilters(query, op.filters);
+    }
+    const result = await query.range(from, from + AGGREGATE_PAGE_SIZE - 1);
+    if (result.error) {
+      return { data: null, count: null, error: result.error };
+    }
+
+    for (const row of result.data as Record<string, unknown>[]) {
+      const values = groupBy.map((c) => row[c] ?? null);
+      const key = JSON.stringify(values);
+      const group = groups.get(key) ?? { ...Object.fromEntries(groupBy.map((c, i) => [c, values[i]])), count: 0 };
+      group.count = (group.count as number) + 1;
+      groups.set(key, group);
+      total += 1;
+    }
+
+    if (result.data.length < AGGREGATE_PAGE_SIZE) break;
+  }
+
+  return { data: Array.from(groups.values()), count: total, error: null };
+}
+
+// Run an ordered list of operations in one request.
+// With transaction: true the whole list runs inside the admin_api_batch()
+// Postgres function, so either every operation commits or none do.
+// Otherwise operations run in order and stop at the first failure.
+async function handleBatch(supabase: any, body: RequestBody): Promise<Response> {
+  const operations = body.operations;
+
+  if (!Array.isArray(operations) || operations.length === 0) {
+    return createErrorResponse("INVALID_REQUEST", "Batch requires a non-empty operations array", 400);
+  }
+
+  if (operations.length > MAX_BATCH_OPERATIONS) {
+    return createErrorResponse(
+      "INVALID_REQUEST",
+      `Batch exceeds ${MAX_BATCH_OPERATIONS} operations`,
+      400
+    );
+  }
+
+  // Validate every operation up front so nothing runs if any is invalid
+  for (let i = 0; i < operations.length; i++) {
+    const invalid = validateOperation(operations[i]);
+    if (invalid) {
+      return createErrorResponse(invalid.code, `Operation ${i}: ${invalid.message}`, invalid.status, null, i);
+    }
+    if (body.transaction && (
+      operations[i].action === "count" ||
+      operations[i].action === "aggregate" ||
+      operations[i].action === "patch" ||
+      operations[i].options?.keyset
+    )) {
+      return createErrorResponse(
+        "INVALID_REQUEST",
+        `Operation ${i}: count, aggregate, patch and keyset are not supported in transactional batches`,
+        400,
+        null,
+        i
+      );
+    }
+  }
+
+  try {
+    if (body.transaction) {
+      const result = await supabase.rpc("admin_api_batch", { operations });
+      if (result.error) {
+        console.error("Batch transaction error:", result.error);
+        return createErrorResponse("DATABASE_ERROR", result.error.message, 400);
+      }
+      // admin_api_batch() returns whole rows; apply any select projections and slices here
+      const data = (result.data as { data: unknown }[]).map((item, i) =>
+        operations[i].action === "select"
+          ? {
+            data: sliceRows(
+              projectRows(item.data, parseColumns(operations[i].options?.columns)),
+              operations[i].options?.slice,
+            ),
+          }
+          : item
+      );
+      return createSuccessResponse(data);
+    }
+
+    const results: { data: unknown; count?: number | null }[] = [];
+    for (let i = 0; i < operations.length; i++) {
+      const result = await executeOperation(supabase, operations[i]);
+      if (result.failure) {
+        const failure = result.failure as OperationFailure;
+        return createErrorResponse(failure.code, `Operation ${i}: ${failure.message}`, failure.status, results, i);
+      }
+      if (result.error) {
+        console.error(`Batch operation ${i} failed:`, result.error);
+        // Return what already ran so the caller knows which operations landed
+        return createErrorResponse(
+          "DATABASE_ERROR",
+          `Operation ${i}: ${result.error.message}`,
+          400,
+          results,
+          i
+        );
+      }
+      results.push({ data: result.data, count: result.count ?? undefined });
+    }
+
+    return createSuccessResponse(results);
+
+  } catch (error) {
+    console.error("Unexpected batch error:", error);
+    return createErrorResponse(
+      "SERVER_ERROR",
+      error instanceof Error ? error.message : "An unexpected error occurred",
+      500
+    );
+  }
+}
+
+// Everything an agent reads before it starts (project, chapter, style
+// guide, glossary, tactics...) in one request. The requested parts are
+// queried concurrently and returned as { part: data }.
+async function handleContext(supabase: any, body: RequestBody): Promise<Response> {
+  const request = (body.data ?? {}) as ContextRequest;
+  if (typeof request.project_id !== "string" || !request.project_id) {
+    return createErrorResponse("INVALID_REQUEST", "Missing project_id for context", 400);
+  }
+  const parts = request.parts ?? CONTEXT_PARTS.filter((part) => part !== "chapter" || request.chapter_id);
+  if (!Array.isArray(parts)) {
+    return createErrorResponse("INVALID_REQUEST", "Context parts must be an array", 400);
+  }
+  for (const part of parts) {
+    if (!CONTEXT_PARTS.includes(part)) {
+      return createErrorResponse("INVALID_REQUEST", `Unknown context part: ${part}`, 400);
+    }
+    if (part === "chapter" && !request.chapter_id) {
+      return createErrorResponse("INVALID_REQUEST", "Context part 'chapter' requires chapter_id", 400);
+    }
+  }
+
+  try {
+    const results = await Promise.all(parts.map((part) => contextPart(supabase, part, request)));
+    const failed = results.find((result) => result.error);
+    if (failed) {
+      console.error("Context error:", failed.error);
+      return createErrorResponse("DATABASE_ERROR", failed.error.message, 400);
+    }
+    return createSuccessResponse(Object.fromEntries(parts.map((part, i) => [part, results[i].data])));
+  } catch (error) {
+    console.error("Unexpected context error:", error);
+    return createErrorResponse(
+      "SERVER_ERROR",
+      error instanceof Error ? error.message : "An unexpected error occurred",
+      500
+    );
+  }
+}
+
+async function contextPart(supabase: any, part: string, request: ContextRequest): Promise<any> {
+  const projectId = request.project_id;
+  const chapterId = request.chapter_id;
+
+  switch (part) {
+    case "project":
+      return await supabase.from("projects").select("*").eq("id", projectId).maybeSingle();
+
+    case "chapter":
+      return await supabase.from("chapters").select("*").eq("id", chapterId).maybeSingle();
+
+    case "chapters":
+      return await supabase.from("chapters").select(CONTEXT_CHAPTER_COLUMNS)
+        .eq("project_id", projectId).order("chapter_number");
+
+    case "book_context": {
+      let query = supabase.from("book_context").select("key,value").eq("project_id", projectId);
+      if (request.keys) {
+        query = query.in("key", request.keys);
+      }
+      const result = await query;
+      if (result.error) {
+        return result;
+      }
+      const entries = (result.data as { key: string; value: unknown }[]).map((row) => [row.key, row.value]);
+      return { data: Object.fromEntries(entries), error: null };
+    }
+
+    case "glossary":
+      return await supabase.from("glossary").select("*").eq("project_id", projectId);
+
+    case "tactics": {
+      let query = supabase.from("tactics").select("*").eq("project_id", projectId);
+      if (chapterId) {
+        query = query.eq("chapter_id", chapterId);
+      }
+      return await query;
+    }
+
+    case "cross_refs":
+      return chapterId
+        ? await supabase.from("cross_refs").select("*").eq("from_chapter_id", chapterId)
+        : await supabase.from("cross_refs").select("*").eq("project_id", projectId);
+  }
+}
+
+async function readJsonBody(req: Request): Promise<RequestBody> {
+  const encoding = (req.headers.get("Content-Encoding") ?? "identity").toLowerCase();
+  if (encoding === "identity" || !req.body) {
+    return await req.json();
+  }
+  if (encoding !== "gzip" && encoding !== "deflate") {
+    throw new Error(`Unsupported Content-Encoding: ${encoding}`);
+  }
+  const stream = req.body.pipeThrough(new DecompressionStream(encoding === "gzip" ? "gzip" : "deflate"));
+  return await new Response(stream).json();
+}
+
+function acceptsGzip(req: Request): boolean {
+  const accept = req.headers.get("Accept-Encoding") ?? "";
+  return accept.split(",").some((part) => {
+    const [name, ...params] = part.trim().toLowerCase().split(";");
+    return name === "gzip" && !params.some((p) => p.trim() === "q=0");
+  });
+}
+
+// Gzip a JSON response when the client accepts it and it's worth it
+async function compressResponse(req: Request, response: Response): Promise<Response> {
+  if (!response.body || !acceptsGzip(req) || response.headers.has("Content-Encoding")) {
+    return response;
+  }
+  const bytes = new Uint8Array(await response.arrayBuffer());
+  const headers = new Headers(response.headers);
+  headers.set("Vary", "Accept-Encoding");
+  if (bytes.length < COMPRESSION_THRESHOLD) {
+    return new Response(bytes, { status: response.status, headers });
+  }
+  const compressed = new Blob([bytes]).stream().pipeThrough(new CompressionStream("gzip"));
+  headers.set("Content-Encoding", "gzip");
+  headers.delete("Content-Length");
+  return new Response(compressed, { status: response.status, headers });
+}
+
+Deno.serve(async (req) => compressResponse(req, await handleRequest(req)));
+
+async function handleRequest(req: Request): Promise<Response> {
   // Handle CORS preflight
   if (req.method === "OPTIONS") {
     return new Response(null, { headers: corsHeaders });
@@ -180,36 +838,14 @@ Deno.serve(async (req) => {
     return createErrorResponse("UNAUTHORIZED", "Invalid API secret", 401);
   }
 
-  // Parse request body
+  // Parse request body (gzip-compressed bodies are accepted for large writes)
   let body: RequestBody;
   try {
-    body = await req.json();
+    body = await readJsonBody(req);
   } catch {
     return createErrorResponse("INVALID_REQUEST", "Invalid JSON body", 400);
   }
 
-  // Validate required fields
-  if (!body.action || !body.table) {
-    return createErrorResponse("INVALID_REQUEST", "Missing required fields: action and table", 400);
-  }
-
-  // Validate table
-  if (!TABLE_PERMISSIONS[body.table]) {
-    return createErrorResponse("INVALID_TABLE", `Table '${body.table}' is not allowed`, 400);
-  }
-
-  // Validate action for this table
-  const permissions = TABLE_PERMISSIONS[body.table];
-  const actionKey = body.action === "upsert" ? "insert" : body.action;
-  
-  if (!permissions[actionKey as keyof typeof permissions]) {
-    return createErrorResponse(
-      "INVALID_ACTION",
-      `Action '${body.action}' is not allowed on table '${body.table}'`,
-      400
-    );
-  }
-
   // Create Supabase client with service role key
   const supabaseUrl = Deno.env.get("SUPABASE_URL")!;
   const serviceRoleKey = Deno.env.get("SUPABASE_SERVICE_ROLE_KEY")!;
@@ -221,75 +857,30 @@ Deno.serve(async (req) => {
     },
   });
 
-  try {
-    let query;
-    let result;
-
-    switch (body.action) {
-      case "select": {
-        query = supabase.from(body.table).select("*", { 
-          count: body.options?.count 
-        });
-        
-        if (body.filters) {
-          query = applyFilters(query, body.filters);
-        }
-        
-        query = applyOptions(query, body.options);
-        result = await query;
-        break;
-      }
+  if (body.action === "batch") {
+    return await handleBatch(supabase, body);
+  }
 
-      case "insert": {
-        if (!body.data) {
-          return createErrorResponse("INVALID_REQUEST", "Missing data for insert", 400);
-        }
-        
-        query = supabase.from(body.table).insert(body.data).select();
-        result = await query;
-        break;
-      }
+  if (body.action === "context") {
+    return await handleContext(supabase, body);
+  }
 
-      case "update": {
-        if (!body.data) {
-          return createErrorResponse("INVALID_REQUEST", "Missing data for update", 400);
-        }
-        
-        if (!body.filters || Object.keys(body.filters).length === 0) {
-          return createErrorResponse("INVALID_REQUEST", "Filters required for update", 400);
-        }
-        
-        query = supabase.from(body.table).update(body.data);
-        query = applyFilters(query, body.filters);
-        query = query.select();
-        result = await query;
-        break;
-      }
+  // Validate required fields
+  if (!body.action || !body.table) {
+    return createErrorResponse("INVALID_REQUEST", "Missing required fields: action and table", 400);
+  }
 
-      case "upsert": {
-        if (!body.data) {
-          return createErrorResponse("INVALID_REQUEST", "Missing data for upsert", 400);
-        }
-        
-        query = supabase.from(body.table).upsert(body.data).select();
-        result = await query;
-        break;
-      }
+  const invalid = validateOperation(body as Operation);
+  if (invalid) {
+    return createErrorResponse(invalid.code, invalid.message, invalid.status);
+  }
 
-      case "delete": {
-        if (!body.filters || Object.keys(body.filters).length === 0) {
-          return createErrorResponse("INVALID_REQUEST", "Filters required for delete", 400);
-        }
-        
-        query = supabase.from(body.table).delete();
-        query = applyFilters(query, body.filters);
-        query = query.select();
-        result = await query;
-        break;
-      }
+  try {
+    const result = await executeOperation(supabase, body as Operation);
 
-      default:
-        return createErrorResponse("INVALID_ACTION", `Unknown action: ${body.action}`, 400);
+    if (result.failure) {
+      const failure = result.failure as OperationFailure;
+      return createErrorResponse(failure.code, failure.message, failure.status, failure.data ?? null);
     }
 
     if (result.error) {
@@ -307,4 +898,4 @@ Deno.serve(async (req) => {
       500
     );
   }
-});
+}
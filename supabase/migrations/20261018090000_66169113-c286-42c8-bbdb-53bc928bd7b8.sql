@@ -0,0 +1,145 @@
+-- admin-api batch support: run a list of operations inside one transaction.
+-- Called by the admin-api Edge Function for { action: "batch", transaction: true }.
+-- Table and action permissions are enforced by the Edge Function before this runs.
+
+-- Build a WHERE clause (against alias "t") from admin-api style filters
+CREATE OR REPLACE FUNCTION public.admin_api_where(filters JSONB)
+RETURNS TEXT
+LANGUAGE plpgsql
+IMMUTABLE
+SET search_path = public
+AS $$
+DECLARE
+  f RECORD;
+  col TEXT;
+  op TEXT;
+  val TEXT;
+  clauses TEXT[] := ARRAY[]::TEXT[];
+BEGIN
+  FOR f IN SELECT key, value FROM jsonb_each(COALESCE(filters, '{}'::jsonb)) LOOP
+    col := split_part(f.key, '.', 1);
+    op := COALESCE(NULLIF(split_part(f.key, '.', 2), ''), 'eq');
+    val := f.value #>> '{}';
+
+    clauses := clauses || CASE op
+      WHEN 'eq' THEN CASE WHEN val IS NULL THEN format('t.%I IS NULL', col) ELSE format('t.%I = %L', col, val) END
+      WHEN 'neq' THEN CASE WHEN val IS NULL THEN format('t.%I IS NOT NULL', col) ELSE format('t.%I <> %L', col, val) END
+      WHEN 'gt' THEN format('t.%I > %L', col, val)
+      WHEN 'gte' THEN format('t.%I >= %L', col, val)
+      WHEN 'lt' THEN format('t.%I < %L', col, val)
+      WHEN 'lte' THEN format('t.%I <= %L', col, val)
+      WHEN 'like' THEN format('t.%I LIKE %L', col, val)
+      WHEN 'ilike' THEN format('t.%I ILIKE %L', col, val)
+      WHEN 'is' THEN format('t.%I IS %s', col, CASE WHEN val IS NULL THEN 'NULL' WHEN val::boolean THEN 'TRUE' ELSE 'FALSE' END)
+      WHEN 'in' THEN format('t.%I::text = ANY (%L::text[])', col, ARRAY(SELECT jsonb_array_elements_text(f.value)))
+      WHEN 'contains' THEN format('t.%I @> %L::jsonb', col, f.value)
+      WHEN 'containedBy' THEN format('t.%I <@ %L::jsonb', col, f.value)
+      ELSE format('t.%I = %L', f.key, val)
+    END;
+  END LOOP;
+
+  IF array_length(clauses, 1) IS NULL THEN
+    RETURN 'TRUE';
+  END IF;
+  RETURN array_to_string(clauses, ' AND ');
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.admin_api_batch(operations JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  op JSONB;
+  tbl TEXT;
+  act TEXT;
+  payload JSONB;
+  cols TEXT;
+  assignments TEXT;
+  conflict TEXT;
+  tail TEXT;
+  op_rows JSONB;
+  results JSONB := '[]'::jsonb;
+BEGIN
+  FOR op IN SELECT value FROM jsonb_array_elements(operations) LOOP
+    tbl := op->>'table';
+    act := op->>'action';
+    payload := op->'data';
+    IF jsonb_typeof(payload) = 'object' THEN
+      payload := jsonb_build_array(payload);
+    END IF;
+
+    IF act IN ('insert', 'upsert', 'update') THEN
+      SELECT string_agg(DISTINCT quote_ident(k), ', '),
+             string_agg(DISTINCT format('%1$I = r.%1$I', k), ', ')
+        INTO cols, assignments
+        FROM jsonb_array_elements(payload) AS r(value), jsonb_object_keys(r.value) AS k;
+    END IF;
+
+    IF act = 'select' THEN
+      tail := '';
+      IF op->'options'->'order' IS NOT NULL THEN
+        tail := format(' ORDER BY t.%I %s', op->'options'->'order'->>'column',
+          CASE WHEN COALESCE((op->'options'->'order'->>'ascending')::boolean, TRUE) THEN 'ASC' ELSE 'DESC' END);
+      END IF;
+      IF op->'options'->>'limit' IS NOT NULL THEN
+        tail := tail || format(' LIMIT %s', (op->'options'->>'limit')::int);
+      END IF;
+      EXECUTE format(
+        'SELECT COALESCE(jsonb_agg(to_jsonb(s)), ''[]''::jsonb) FROM (SELECT t.* FROM public.%I t WHERE %s%s) s',
+        tbl, public.admin_api_where(op->'filters'), tail
+      ) INTO op_rows;
+
+    ELSIF act = 'insert' THEN
+      EXECUTE format(
+        'WITH w AS (INSERT INTO public.%1$I (%2$s) SELECT %2$s FROM jsonb_populate_recordset(NULL::public.%1$I, $1) RETURNING *)
+         SELECT COALESCE(jsonb_agg(to_jsonb(w)), ''[]''::jsonb) FROM w',
+        tbl, cols
+      ) USING payload INTO op_rows;
+
+    ELSIF act = 'upsert' THEN
+      conflict := COALESCE(op->'options'->>'onConflict', 'id');
+      SELECT string_agg(DISTINCT format('%1$I = EXCLUDED.%1$I', k), ', ')
+        INTO assignments
+        FROM jsonb_array_elements(payload) AS r(value), jsonb_object_keys(r.value) AS k;
+      EXECUTE format(
+        'WITH w AS (INSERT INTO public.%1$I (%2$s) SELECT %2$s FROM jsonb_populate_recordset(NULL::public.%1$I, $1)
+           ON CONFLICT (%3$s) DO UPDATE SET %4$s RETURNING *)
+         SELECT COALESCE(jsonb_agg(to_jsonb(w)), ''[]''::jsonb) FROM w',
+        tbl, cols,
+        (SELECT string_agg(quote_ident(trim(c)), ', ') FROM unnest(string_to_array(conflict, ',')) AS c),
+        assignments
+      ) USING payload INTO op_rows;
+
+    ELSIF act = 'update' THEN
+      EXECUTE format(
+        'WITH w AS (UPDATE public.%1$I t SET %2$s FROM jsonb_populate_record(NULL::public.%1$I, $1) r WHERE %3$s RETURNING t.*)
+         SELECT COALESCE(jsonb_agg(to_jsonb(w)), ''[]''::jsonb) FROM w',
+        tbl, assignments, public.admin_api_where(op->'filters')
+      ) USING payload->0 INTO op_rows;
+
+    ELSIF act = 'delete' THEN
+      EXECUTE format(
+        'WITH w AS (DELETE FROM public.%1$I t WHERE %2$s RETURNING t.*)
+         SELECT COALESCE(jsonb_agg(to_jsonb(w)), ''[]''::jsonb) FROM w',
+        tbl, public.admin_api_where(op->'filters')
+      ) INTO op_rows;
+
+    ELSE
+      RAISE EXCEPTION 'Unknown batch action: %', act;
+    END IF;
+
+    results := results || jsonb_build_array(jsonb_build_object('data', op_rows));
+  END LOOP;
+
+  RETURN results;
+END;
+$$;
+
+-- Only the service role (used by admin-api) may run batches
+REVOKE ALL ON FUNCTION public.admin_api_where(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.admin_api_batch(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.admin_api_where(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION public.admin_api_batch(JSONB) TO service_role;
@@ -0,0 +1,14 @@
+-- Indexes for keyset pagination on (created_at, id) over the large
+-- append-only tables, matching the filters used by iter_select callers.
+CREATE INDEX IF NOT EXISTS idx_pipeline_logs_project_created
+  ON public.pipeline_logs(project_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_pipeline_logs_agent_created
+  ON public.pipeline_logs(project_id, agent_name, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_decisions_project_created
+  ON public.decisions(project_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_chapter_created
+  ON public.decisions(chapter_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_validation_log_chapter_created
+  ON public.validation_log(chapter_id, created_at, id);
@@ -0,0 +1,20 @@
+-- book_context writers upsert with onConflict "project_id,key", which needs a
+-- unique constraint on exactly those columns. The table was created with one,
+-- but make sure it exists on every environment.
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1
+    FROM pg_constraint c
+    WHERE c.conrelid = 'public.book_context'::regclass
+      AND c.contype IN ('u', 'p')
+      AND (
+        SELECT array_agg(a.attname::text ORDER BY a.attname)
+        FROM pg_attribute a
+        WHERE a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+      ) = ARRAY['key', 'project_id']
+  ) THEN
+    ALTER TABLE public.book_context
+      ADD CONSTRAINT book_context_project_id_key_key UNIQUE (project_id, key);
+  END IF;
+END $$;
@@ -0,0 +1,54 @@
+-- Change feed support: every project-scoped table that can be updated gets an
+-- updated_at column maintained by update_updated_at_column(), and every table
+-- in the feed gets a (project_id, <change column>, id) index so "rows changed
+-- after a watermark" is an index range scan (see backend/memory/changes.py).
+
+ALTER TABLE public.tactics ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.glossary ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.cross_refs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+
+-- Existing rows were last changed no later than they were created, as far as
+-- anyone can tell; backfill before the triggers exist so they don't fire
+UPDATE public.tactics SET updated_at = created_at WHERE created_at IS NOT NULL;
+UPDATE public.glossary SET updated_at = created_at WHERE created_at IS NOT NULL;
+UPDATE public.cross_refs SET updated_at = created_at WHERE created_at IS NOT NULL;
+
+DROP TRIGGER IF EXISTS update_tactics_updated_at ON public.tactics;
+CREATE TRIGGER update_tactics_updated_at
+  BEFORE UPDATE ON public.tactics
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_glossary_updated_at ON public.glossary;
+CREATE TRIGGER update_glossary_updated_at
+  BEFORE UPDATE ON public.glossary
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_cross_refs_updated_at ON public.cross_refs;
+CREATE TRIGGER update_cross_refs_updated_at
+  BEFORE UPDATE ON public.cross_refs
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- book_context had the column but nothing kept it current on update
+DROP TRIGGER IF EXISTS update_book_context_updated_at ON public.book_context;
+CREATE TRIGGER update_book_context_updated_at
+  BEFORE UPDATE ON public.book_context
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_chapters_project_updated
+  ON public.chapters(project_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_tactics_project_updated
+  ON public.tactics(project_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_glossary_project_updated
+  ON public.glossary(project_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_cross_refs_project_updated
+  ON public.cross_refs(project_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_book_context_project_updated
+  ON public.book_context(project_id, updated_at, id);
+-- pipeline_logs and decisions are append-only and already indexed on
+-- (project_id, created_at, id)
+CREATE INDEX IF NOT EXISTS idx_validation_log_project_created
+  ON public.validation_log(project_id, created_at, id);
@@ -0,0 +1,48 @@
+-- The change feed tracked the append-only log tables on created_at, but the
+-- memory log buffer stamps created_at on the client when a row is queued,
+-- and rows are written seconds (or, replayed after an outage, minutes) later.
+-- Such a row commits behind the feed's watermark and is never delivered.
+-- recorded_at is set by the database when the row is inserted, so it is the
+-- column the feed follows for these tables (see backend/memory/changes.py).
+
+ALTER TABLE public.pipeline_logs ADD COLUMN IF NOT EXISTS recorded_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.decisions ADD COLUMN IF NOT EXISTS recorded_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.validation_log ADD COLUMN IF NOT EXISTS recorded_at TIMESTAMPTZ DEFAULT now();
+
+UPDATE public.pipeline_logs SET recorded_at = created_at WHERE created_at IS NOT NULL;
+UPDATE public.decisions SET recorded_at = created_at WHERE created_at IS NOT NULL;
+UPDATE public.validation_log SET recorded_at = created_at WHERE created_at IS NOT NULL;
+
+-- Ignore any value sent by a client: the column is the insert time
+CREATE OR REPLACE FUNCTION public.set_recorded_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.recorded_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SET search_path = public;
+
+DROP TRIGGER IF EXISTS set_pipeline_logs_recorded_at ON public.pipeline_logs;
+CREATE TRIGGER set_pipeline_logs_recorded_at
+  BEFORE INSERT ON public.pipeline_logs
+  FOR EACH ROW
+  EXECUTE FUNCTION public.set_recorded_at();
+
+DROP TRIGGER IF EXISTS set_decisions_recorded_at ON public.decisions;
+CREATE TRIGGER set_decisions_recorded_at
+  BEFORE INSERT ON public.decisions
+  FOR EACH ROW
+  EXECUTE FUNCTION public.set_recorded_at();
+
+DROP TRIGGER IF EXISTS set_validation_log_recorded_at ON public.validation_log;
+CREATE TRIGGER set_validation_log_recorded_at
+  BEFORE INSERT ON public.validation_log
+  FOR EACH ROW
+  EXECUTE FUNCTION public.set_recorded_at();
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_logs_project_recorded
+  ON public.pipeline_logs(project_id, recorded_at, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_project_recorded
+  ON public.decisions(project_id, recorded_at, id);
+CREATE INDEX IF NOT EXISTS idx_validation_log_project_recorded
+  ON public.validation_log(project_id, recorded_at, id);
@@ -0,0 +1,1113 @@
+"""
+Local admin-api conformance tests.
+
+Pins the SQLite stand-in (backend/memory/local_backend.py) to the
+admin-api Edge Function: its permission matrix, filter operators and limits
+are checked against index.ts, and its behaviour is exercised through the
+real AdminAPIClient. Runs without any environment configured.
+
+Run with: pytest tests/test_local_backend.py -v
+"""
+
+import asyncio
+import gzip
+import json
+import re
+import subprocess
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from backend.memory.async_client import AsyncAdminAPIClient
+from backend.memory.bulk import ChunkPolicy
+from backend.memory.client import AdminAPIClient, AdminAPIError, BulkInsertError
+from backend.memory.local_backend import (
+    FILTER_OPERATORS,
+    MAX_BATCH_OPERATIONS,
+    READ_ACTIONS,
+    TABLE_PERMISSIONS,
+    LocalAdminAPI,
+    LocalAsyncTransport,
+    LocalTransport,
+    make_server,
+)
+from backend.memory.cache import ReadCache
+from backend.memory.changes import ChangeSubscriber, ProjectMirror, changes_since
+from backend.memory import codec as codec_module
+from backend.memory.codec import BOOKKEEPING_COLUMNS, StdlibCodec, codec, get_codec
+from backend.memory.compression import Compression
+from backend.memory.delta import apply_edits, build_patch, text_edits
+from backend.memory.journal import JournalLockedError, WriteJournal
+from backend.memory.log_buffer import LogBuffer
+from backend.memory.metrics import MemoryMetrics, attribute_to, metrics
+from backend.memory.protocol import CONTEXT_PARTS
+from backend.memory.retry import RetryPolicy, is_transient
+from backend.memory.snapshot import SNAPSHOT_TABLES, read_snapshot_header, restore_project, snapshot_project
+
+INDEX_TS = Path(__file__).parent.parent / "supabase" / "functions" / "admin-api" / "index.ts"
+
+
+def index_ts() -> str:
+    return INDEX_TS.read_text(encoding="utf-8")
+
+
+def ts_function(name: str) -> str:
+    """Source of a top-level function in index.ts."""
+    source = index_ts()
+    start = source.index(f"function {name}(")
+    end = source.index("\n}\n", start)
+    return source[start:end]
+
+
+@pytest.fixture
+def api():
+    api = LocalAdminAPI()
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def client(api):
+    return AdminAPIClient(
+        "sqlite://", "secret",
+        transport=LocalTransport(api),
+        retry=RetryPolicy(max_retries=0),
+    )
+
+
+@pytest.fixture
+def project_id(api):
+    """Projects can't be inserted through admin-api, so seed one directly."""
+    data, _ = api.execute({
+        "action": "insert",
+        "table": "projects",
+        "data": {"user_id": str(uuid.uuid4()), "title": "Book", "source_title": "Source"},
+    })
+    return data[0]["id"]
+
+
+class TestMatchesIndexTs:
+    """The stand-in's protocol constants agree with the Edge Function."""
+
+    def test_table_permissions(self):
+        block = re.search(r"const TABLE_PERMISSIONS[^=]*= \{(.*?)\n\};", index_ts(), re.S).group(1)
+        parsed = {}
+        for table, perms in re.findall(r"(\w+): \{([^}]*)\}", block):
+            parsed[table] = {k: v == "true" for k, v in re.findall(r"(\w+): (true|false)", perms)}
+        assert parsed == TABLE_PERMISSIONS
+
+    def test_filter_operators(self):
+        cases = re.findall(r'case "(\w+)":', ts_function("applyFilters"))
+        assert tuple(cases) == FILTER_OPERATORS
+
+    def test_read_actions_and_batch_limit(self):
+        source = index_ts()
+        read_actions = re.search(r"const READ_ACTIONS = \[([^\]]*)\]", source).group(1)
+        assert tuple(re.findall(r'"(\w+)"', read_actions)) == READ_ACTIONS
+        assert f"const MAX_BATCH_OPERATIONS = {MAX_BATCH_OPERATIONS};" in source
+
+    def test_context_parts(self):
+        parts = re.search(r"const CONTEXT_PARTS = \[([^\]]*)\]", index_ts()).group(1)
+        assert tuple(re.findall(r'"(\w+)"', parts)) == CONTEXT_PARTS
+        assert tuple(re.findall(r'case "(\w+)":', ts_function("contextPart"))) == CONTEXT_PARTS
+
+    def test_schema_covers_permitted_tables(self, api):
+        assert set(TABLE_PERMISSIONS) <= set(api.schema)
+
+
+class TestValidation:
+    """Requests rejected before touching the database."""
+
+    def test_unknown_table(self, client):
+        with pytest.raises(AdminAPIError) as e:
+            client.select("users")
+        assert e.value.code == "INVALID_TABLE"
+        assert e.value.status == 400
+
+    def test_action_not_permitted(self, client):
+        with pytest.raises(AdminAPIError) as e:
+            client.delete("chapters", {"id.eq": str(uuid.uuid4())})
+        assert e.value.code == "INVALID_ACTION"
+        assert e.value.message == "Action 'delete' is not allowed on table 'chapters'"
+
+    def test_update_requires_filters(self, client):
+        with pytest.raises(AdminAPIError) as e:
+            client.update("chapters", {"title": "x"}, {})
+        assert e.value.code == "INVALID_REQUEST"
+
+    def test_unknown_column_is_database_error(self, client):
+        with pytest.raises(AdminAPIError) as e:
+            client.select("chapters", {"no_such_column.eq": 1})
+        assert e.value.code == "DATABASE_ERROR"
+
+
+class TestOperations:
+    """Protocol behaviour through AdminAPIClient."""
+
+    def _chapters(self, client, project_id, count=3):
+        return client.insert("chapters", [
+            {"project_id": project_id, "chapter_number": n, "title": f"Chapter {n}"}
+            for n in range(1, count + 1)
+        ])
+
+    def test_insert_applies_defaults(self, client, project_id):
+        chapter = self._chapters(client, project_id, 1)[0]
+        assert uuid.UUID(chapter["id"])
+        assert chapter["status"] == "pending"
+        assert chapter["phase_1_complete"] is False
+        assert chapter["created_at"]
+
+    def test_filters(self, client, project_id):
+        self._chapters(client, project_id, 4)
+        client.update("chapters", {"status": "completed", "sections": ["a", "b"]},
+                      {"project_id.eq": project_id, "chapter_number.lte": 2})
+
+        def numbers(filters):
+            rows = client.select("chapters", filters, {"order": {"column": "chapter_number"}})
+            return [row["chapter_number"] for row in rows]
+
+        assert numbers({"status.eq": "completed"}) == [1, 2]
+        assert numbers({"status.neq": "completed"}) == [3, 4]
+        assert numbers({"chapter_number.in": [1, 3]}) == [1, 3]
+        assert numbers({"chapter_number.gt": 3}) == [4]
+        assert numbers({"title.like": "Chapter 1%"}) == [1]
+        assert numbers({"title.ilike": "chapter 2"}) == [2]
+        assert numbers({"summary.is": None}) == [1, 2, 3, 4]
+        assert numbers({"phase_1_complete.is": False}) == [1, 2, 3, 4]
+        assert numbers({"sections.contains": ["b"]}) == [1, 2]
+
+    def test_check_constraint(self, client, project_id):
+        with pytest.raises(AdminAPIError) as e:
+            client.insert("chapters", {"project_id": project_id, "chapter_number": 1, "status": "bogus"})
+        assert e.value.code == "DATABASE_ERROR"
+
+    def test_order_limit_and_single(self, client, project_id):
+        self._chapters(client, project_id, 3)
+        rows = client.select("chapters", options={"order": {"column": "chapter_number", "ascending": False}, "limit": 2})
+        assert [row["chapter_number"] for row in rows] == [3, 2]
+
+        row = client.select_single("chapters", {"chapter_number.eq": 2}, columns=["id", "title"])
+        assert set(row) == {"id", "title"}
+
+        # PostgREST's .single() fails unless exactly one row matches
+        with pytest.raises(AdminAPIError) as e:
+            client.select_single("chapters", {"chapter_number.gt": 10})
+        assert e.value.code == "DATABASE_ERROR"
+
+    def test_count_and_aggregate(self, client, project_id):
+        self._chapters(client, project_id, 3)
+        client.update("chapters", {"status": "completed"}, {"chapter_number.eq": 1})
+        assert client.count("chapters", {"project_id.eq": project_id}) == 3
+        groups = client.aggregate("chapters", ["status"], {"project_id.eq": project_id})
+        assert {g["status"]: g["count"] for g in groups} == {"pending": 2, "completed": 1}
+
+    def test_keyset_pagination(self, client, project_id):
+        self._chapters(client, project_id, 7)
+        rows = list(client.iter_select(
+            "chapters", {"project_id.eq": project_id}, order_by="chapter_number", page_size=3
+        ))
+        assert [row["chapter_number"] for row in rows] == list(range(1, 8))
+
+    def test_update_touches_updated_at(self, client, project_id):
+        chapter = self._chapters(client, project_id, 1)[0]
+        updated = client.update("chapters", {"title": "Renamed"}, {"id.eq": chapter["id"]})[0]
+        assert updated["title"] == "Renamed"
+        assert updated["updated_at"] > chapter["updated_at"]
+
+    def test_upsert_on_conflict(self, client, project_id):
+        first = client.upsert("book_context", {"project_id": project_id, "key": "style_guide", "value": "v1"},
+                              on_conflict="project_id,key")[0]
+        second = client.upsert("book_context", {"project_id": project_id, "key": "style_guide", "value": "v2"},
+                               on_conflict="project_id,key")[0]
+        assert second["id"] == first["id"]
+        assert client.select("book_context", {"project_id.eq": project_id})[0]["value"] == "v2"
+
+    def test_transactional_batch_rolls_back(self, client, project_id):
+        with pytest.raises(AdminAPIError):
+            client.execute_batch([
+                {"action": "insert", "table": "decisions",
+                 "data": {"project_id": project_id, "agent_name": "a"}},
+                {"action": "insert", "table": "decisions", "data": {"project_id": project_id}},
+            ], transaction=True)
+        assert client.count("decisions") == 0
+
+    def test_batch_reports_failing_index(self, client, project_id):
+        with pytest.raises(AdminAPIError) as e:
+            client.execute_batch([
+                {"action": "insert", "table": "decisions",
+                 "data": {"project_id": project_id, "agent_name": "a"}},
+                {"action": "insert", "table": "decisions", "data": {"project_id": project_id}},
+            ])
+        assert e.value.index == 1
+        assert len(e.value.data) == 1
+        assert client.count("decisions") == 1
+
+    def test_batch_context(self, client, project_id):
+        requests_before = client.transport_stats().requests
+        with client.batch() as b:
+            first = b.insert("glossary", {"project_id": project_id, "english_term": "one"})
+            # Flushing mid-block lets later operations use earlier results
+            row_id = b.flush()[0][0]["id"]
+            second = b.update("glossary", {"english_term": "two"}, {"id.eq": row_id})
+            third = b.select("glossary", columns=["english_term"])
+        assert (first, second, third) == (0, 1, 2)
+        assert b.results[second][0]["id"] == row_id
+        assert b.results[third] == [{"english_term": "two"}]
+        assert client.transport_stats().requests == requests_before + 2
+
+    def test_batch_context_sends_nothing_when_block_raises(self, client, project_id):
+        with pytest.raises(RuntimeError):
+            with client.batch() as b:
+                b.insert("decisions", {"project_id": project_id, "agent_name": "a"})
+                raise RuntimeError("abandoned")
+        assert b.operations == [] and client.count("decisions") == 0
+
+    def test_transactional_batch_context(self, client, project_id):
+        with pytest.raises(AdminAPIError):
+            with client.batch(transaction=True) as b:
+                b.insert("decisions", {"project_id": project_id, "agent_name": "a"})
+                b.insert("decisions", {"project_id": project_id})
+        assert client.count("decisions") == 0
+
+    def test_async_batch_context(self, api, project_id):
+        client = AsyncAdminAPIClient("http://local-admin-api/", "secret", transport=LocalAsyncTransport(api),
+                                     retry=RetryPolicy(max_retries=0))
+
+        async def run():
+            async with client.batch() as b:
+                b.insert("glossary", [{"project_id": project_id, "english_term": t} for t in ("a", "b")])
+                b.select("glossary")
+            return b.results
+
+        inserted, selected = asyncio.run(run())
+        assert [row["english_term"] for row in inserted] == ["a", "b"]
+        assert len(selected) == 2
+
+
+class TestPatch:
+    """Field-level delta writes with optimistic concurrency."""
+
+    TEXT = " ".join(f"Sentence number {n} of the chapter." for n in range(200))
+
+    @pytest.fixture
+    def chapter(self, client, project_id):
+        return client.insert("chapters", {
+            "project_id": project_id, "chapter_number": 1, "edited_text": self.TEXT
+        })[0]
+
+    def test_text_edits_round_trip(self):
+        new = self.TEXT.replace("number 7 of", "seven of").replace("number 150", "número 150 😀")
+        edits = text_edits(self.TEXT, new)
+        assert apply_edits(self.TEXT, edits) == new
+        assert sum(len(text) for _, _, text in edits) < 20
+        with pytest.raises(ValueError):
+            apply_edits("short", [[2, 1, "x"]])
+
+    def test_patch_applies_edits(self, client, chapter):
+        new = self.TEXT.replace("number 42 of", "forty-two of")
+        data, patches = build_patch(chapter, {"edited_text": new, "title": "Edited", "chapter_number": 1})
+        assert data == {"title": "Edited"} and set(patches) == {"edited_text"}
+
+        row = client.patch("chapters", {"id.eq": chapter["id"]}, data, patches,
+                           if_updated_at=chapter["updated_at"])[0]
+        assert row["edited_text"] == new and row["title"] == "Edited"
+        assert row["updated_at"] > chapter["updated_at"]
+
+    def test_stale_version_conflicts(self, client, chapter):
+        client.update("chapters", {"title": "Changed elsewhere"}, {"id.eq": chapter["id"]})
+        _, patches = build_patch(chapter, {"edited_text": self.TEXT.replace("number 1 ", "uno ")})
+        with pytest.raises(AdminAPIError) as e:
+            client.patch("chapters", {"id.eq": chapter["id"]}, patches=patches,
+                         if_updated_at=chapter["updated_at"])
+        assert e.value.code == "CONFLICT"
+        assert e.value.status == 409
+        assert client.select_single("chapters", {"id.eq": chapter["id"]})["edited_text"] == self.TEXT
+
+    def test_patch_not_allowed_in_transaction(self, client, chapter):
+        with pytest.raises(AdminAPIError) as e:
+            client.execute_batch([{
+                "action": "patch", "table": "chapters", "filters": {"id.eq": chapter["id"]},
+                "data": {"title": "x"},
+            }], transaction=True)
+        assert e.value.code == "INVALID_REQUEST"
+
+
+class TestContext:
+    """An agent's starting reads in one request."""
+
+    def test_returns_requested_parts(self, client, project_id):
+        chapters = client.insert("chapters", [
+            {"project_id": project_id, "chapter_number": n, "original_text": "text"} for n in (2, 1)
+        ])
+        client.insert("book_context", [
+            {"project_id": project_id, "key": "style_guide", "value": "Be brief."},
+            {"project_id": project_id, "key": "structure", "value": "Ten chapters."},
+        ])
+        client.insert("tactics", [
+            {"project_id": project_id, "chapter_id": chapter["id"], "name": f"t{i}", "type": "tip", "category": "sales"}
+            for i, chapter in enumerate(chapters)
+        ])
+
+        context = client.context(project_id, chapters[0]["id"])
+        assert list(context) == list(CONTEXT_PARTS)
+        assert context["project"]["id"] == project_id
+        assert context["chapter"]["original_text"] == "text"
+        assert [c["chapter_number"] for c in context["chapters"]] == [1, 2]
+        assert "original_text" not in context["chapters"][0]
+        assert context["book_context"] == {"style_guide": "Be brief.", "structure": "Ten chapters."}
+        assert [t["name"] for t in context["tactics"]] == ["t0"]
+
+        context = client.context(project_id, parts=["book_context", "tactics"], keys=["style_guide"])
+        assert context == {"book_context": {"style_guide": "Be brief."}, "tactics": context["tactics"]}
+        assert len(context["tactics"]) == 2
+
+    def test_invalid_parts(self, client, project_id):
+        for parts in (["chapter"], ["summaries"]):
+            with pytest.raises(AdminAPIError) as e:
+                client.context(project_id, parts=parts)
+            assert e.value.code == "INVALID_REQUEST"
+
+
+class TestSlice:
+    """Character ranges of long text values."""
+
+    TEXT = "Había una vez 🐉 un dragón."
+
+    def test_slices_string_values(self, client, project_id):
+        chapter, = client.insert("chapters", {"project_id": project_id, "chapter_number": 1, "original_text": self.TEXT})
+        rows = client.select(
+            "chapters", filters={"id.eq": chapter["id"]}, columns=["id", "title", "original_text"],
+            options={"slice": {"columns": ["original_text", "title"], "offset": 14, "length": 4}}
+        )
+        # Offsets count code points; values that fit (or aren't strings) are left alone
+        assert rows == [{"id": chapter["id"], "title": None, "original_text": "🐉 un", "_lengths": {"original_text": 26}}]
+
+        rows = client.select("chapters", filters={"id.eq": chapter["id"]}, options={"slice": {"length": 200}})
+        assert rows[0]["original_text"] == self.TEXT and "_lengths" not in rows[0]
+
+    def test_invalid_slices(self, client, project_id):
+        for text_slice in ({"offset": -1}, {"length": "10"}, {"columns": ["bad name"]}):
+            with pytest.raises(AdminAPIError) as e:
+                client.select("chapters", options={"slice": text_slice})
+            assert e.value.code == "INVALID_REQUEST"
+
+    def test_read_tools(self, client, project_id, monkeypatch):
+        from backend.agents import memory_tools
+
+        monkeypatch.setattr(memory_tools, "db", client)
+        text = "x" * 500
+        chapter, = client.insert("chapters", {"project_id": project_id, "chapter_number": 1, "original_text": text, "title": "One"})
+        client.insert("book_context", {"project_id": project_id, "key": "raw_markdown", "value": text})
+
+        with memory_tools.tool_session():
+            result = json.loads(memory_tools.execute_tool("memory_read_chapter", {
+                "chapter_id": chapter["id"], "fields": ["original_text"], "offset": 100, "length": 50
+            }))
+            assert set(result) == {"id", "updated_at", "original_text", "truncated"}
+            assert result["original_text"] == "x" * 50 and result["truncated"] == {"original_text": 500}
+            memory_tools.execute_tool("memory_read_chapter", {"chapter_id": chapter["id"], "fields": ["title"]})
+            # Only whole values are kept as the version later writes are patched against
+            assert memory_tools._chapter_versions.get()[chapter["id"]].keys() == {"id", "updated_at", "title"}
+
+            # Without fields only the long text is cut; ids, title and timestamps stay whole
+            result = json.loads(memory_tools.execute_tool("memory_read_chapter", {
+                "chapter_id": chapter["id"], "offset": 100, "length": 50
+            }))
+            assert result["original_text"] == "x" * 50 and result["truncated"] == {"original_text": 500}
+            assert result["id"] == chapter["id"] and result["title"] == "One"
+            assert result["project_id"] == project_id and result["updated_at"] == chapter["updated_at"]
+            assert memory_tools._chapter_versions.get()[chapter["id"]]["title"] == "One"
+
+        result = json.loads(memory_tools.execute_tool("memory_read_book_context", {
+            "project_id": project_id, "key": "raw_markdown", "max_chars": 10
+        }))
+        assert result == {"key": "raw_markdown", "value": "x" * 200, "truncated": {"value": 500}}
+
+
+class TestSnapshot:
+    """Project export and restore."""
+
+    def _seed(self, client, project_id):
+        chapters = client.insert("chapters", [
+            {"project_id": project_id, "chapter_number": n, "original_text": f"Chapter {n} ñ", "sections": ["a", "b"]}
+            for n in range(1, 4)
+        ])
+        tactics = client.insert("tactics", {
+            "project_id": project_id, "chapter_id": chapters[0]["id"], "name": "t", "type": "tip", "category": "sales"
+        })
+        client.insert("tactics", {
+            "project_id": project_id, "chapter_id": chapters[1]["id"], "name": "t2", "type": "tip",
+            "category": "sales", "duplicate_of": tactics[0]["id"],
+            "used_in_chapters": [chapters[1]["id"], chapters[2]["id"]],
+        })
+        client.insert("glossary", {
+            "project_id": project_id, "english_term": "roof", "introduced_in_chapter": chapters[2]["id"]
+        })
+        client.insert("cross_refs", {
+            "project_id": project_id, "from_chapter_id": chapters[2]["id"], "to_chapter_id": chapters[0]["id"]
+        })
+        client.insert("book_context", {"project_id": project_id, "key": "style_guide", "value": "Brief."})
+        client.insert("issues", {"chapter_id": chapters[1]["id"], "issue_type": "style", "description": "x"})
+        client.update("projects", {"current_phase": 3}, {"id.eq": project_id})
+        return chapters
+
+    def test_fork_round_trip(self, api, client, project_id, tmp_path):
+        self._seed(client, project_id)
+        path = tmp_path / "book.ndjson.gz"
+        counts = snapshot_project(project_id, path, client=client)
+        assert list(counts) == SNAPSHOT_TABLES
+        assert counts["chapters"] == 3 and counts["tactics"] == 2 and counts["issues"] == 1
+        assert read_snapshot_header(path)["project"]["current_phase"] == 3
+
+        fork_id = api.execute({"action": "insert", "table": "projects", "data": {
+            "user_id": str(uuid.uuid4()), "title": "Fork", "source_title": "Source"
+        }})[0][0]["id"]
+        assert restore_project(path, fork_id, client=client) == counts
+
+        chapters = client.select("chapters", {"project_id.eq": fork_id},
+                                 options={"order": {"column": "chapter_number"}})
+        assert [c["original_text"] for c in chapters] == [f"Chapter {n} ñ" for n in range(1, 4)]
+        assert chapters[0]["sections"] == ["a", "b"]
+        ids = {c["id"] for c in chapters}
+        assert not ids & {c["id"] for c in client.select("chapters", {"project_id.eq": project_id})}
+
+        tactics = client.select("tactics", {"project_id.eq": fork_id})
+        original = next(t for t in tactics if t["duplicate_of"] is None)
+        duplicate = next(t for t in tactics if t["duplicate_of"])
+        assert duplicate["duplicate_of"] == original["id"]
+        assert duplicate["used_in_chapters"] == [chapters[1]["id"], chapters[2]["id"]]
+        assert client.select_single("glossary", {"project_id.eq": fork_id})["introduced_in_chapter"] == chapters[2]["id"]
+        ref = client.select_single("cross_refs", {"project_id.eq": fork_id})
+        assert {ref["from_chapter_id"], ref["to_chapter_id"]} <= ids
+        assert client.select_single("issues", {"chapter_id.in": list(ids)})["chapter_id"] == chapters[1]["id"]
+        assert client.select_single("projects", {"id.eq": fork_id})["current_phase"] == 3
+
+    def test_restore_requires_project(self, client, project_id, tmp_path):
+        path = tmp_path / "book.ndjson"
+        snapshot_project(project_id, path, client=client)
+        with pytest.raises(ValueError):
+            restore_project(path, str(uuid.uuid4()), client=client)
+
+
+class TestChanges:
+    """Incremental change feed."""
+
+    def test_changes_since_watermark(self, client, project_id):
+        chapters = client.insert("chapters", [{"project_id": project_id, "chapter_number": n} for n in range(3)])
+        client.insert("glossary", {"project_id": project_id, "english_term": "roof"})
+
+        changes = changes_since(project_id, ["chapters", "glossary"], page_size=2, client=client)
+        assert [c["id"] for c in changes.rows["chapters"]] == [c["id"] for c in chapters]
+        assert changes.count() == 4
+        assert changes_since(project_id, ["chapters", "glossary"], changes.watermark, client=client).count() == 0
+
+        client.update("chapters", {"title": "Edited"}, {"id.eq": chapters[1]["id"]})
+        later = changes_since(project_id, ["chapters", "glossary"], changes.watermark, client=client)
+        assert later.rows == {"chapters": [later.rows["chapters"][0]], "glossary": []}
+        assert later.rows["chapters"][0]["title"] == "Edited"
+
+        with pytest.raises(ValueError):
+            changes_since(project_id, ["issues"], client=client)
+
+    def test_subscriber_mirror(self, client, project_id):
+        term = client.insert("glossary", {"project_id": project_id, "english_term": "roof"})[0]
+        subscriber = ChangeSubscriber(project_id, ["glossary"], lookback=60, client=client)
+        mirror = ProjectMirror(subscriber)
+        assert [row["id"] for row in subscriber.poll()["glossary"]] == [term["id"]]
+        # The lookback window is re-read but already delivered rows are skipped
+        assert subscriber.poll() == {}
+
+        client.update("glossary", {"spanish_term": "techo"}, {"id.eq": term["id"]})
+        client.insert("glossary", {"project_id": project_id, "english_term": "gutter"})
+        assert len(subscriber.poll()["glossary"]) == 2
+        assert mirror.get("glossary", term["id"])["spanish_term"] == "techo"
+        assert len(mirror.rows("glossary")) == 2
+
+    def test_late_log_rows_are_delivered(self, client, project_id):
+        subscriber = ChangeSubscriber(project_id, ["decisions"], lookback=0, client=client)
+        client.insert("decisions", {"project_id": project_id, "agent_name": "a", "decision": "first"})
+        assert len(subscriber.poll()["decisions"]) == 1
+        # Queued (and stamped) long ago by the log buffer, written only now
+        late = client.insert("decisions", {
+            "project_id": project_id, "agent_name": "a", "decision": "late",
+            "created_at": "2020-01-01T00:00:00+00:00", "recorded_at": "2020-01-01T00:00:00+00:00",
+        })[0]
+        assert late["recorded_at"] > "2026"
+        assert [row["decision"] for row in subscriber.poll()["decisions"]] == ["late"]
+
+
+class FlakyTransport(LocalTransport):
+    """LocalTransport that can be taken offline."""
+
+    down = False
+
+    def post(self, url, data=None, json=None, headers=None):
+        if self.down:
+            raise requests.ConnectionError("admin-api unreachable")
+        return super().post(url, data=data, json=json, headers=headers)
+
+
+class LossyTransport(LocalTransport):
+    """LocalTransport that applies requests but loses the next `lose` responses."""
+
+    def __init__(self, api):
+        super().__init__(api)
+        self.lose = 0
+        self.sent = []
+
+    def post(self, url, data=None, json=None, headers=None):
+        response = super().post(url, data=data, json=json, headers=headers)
+        self.sent.append(codec.decode(data)["action"])
+        if self.lose:
+            self.lose -= 1
+            raise requests.ConnectionError("connection reset")
+        return response
+
+
+class TestRetry:
+    """Transient failures retried with backoff, only when safe to repeat."""
+
+    @pytest.fixture
+    def transport(self, api):
+        return LossyTransport(api)
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("backend.memory.client.time.sleep", sleeps.append)
+        return sleeps
+
+    def _client(self, transport):
+        return AdminAPIClient("sqlite://", "secret", transport=transport,
+                              retry=RetryPolicy(max_retries=3, base_delay=1.0, jitter=0))
+
+    def test_retried_insert_lands_once(self, transport, sleeps, project_id):
+        client = self._client(transport)
+        transport.lose = 2
+        row = client.insert("glossary", {"project_id": project_id, "english_term": "term"})[0]
+        # Both lost responses were for requests that landed; retries upsert on the same id
+        assert transport.sent == ["insert", "upsert", "upsert"]
+        assert sleeps == [1.0, 5.0]
+        assert [r["id"] for r in client.select("glossary")] == [row["id"]]
+
+    def test_patch_is_not_retried(self, transport, sleeps, project_id):
+        client = self._client(transport)
+        chapter = client.insert("chapters", {"project_id": project_id, "chapter_number": 1})[0]
+        transport.lose = 1
+        with pytest.raises(AdminAPIError) as e:
+            client.patch("chapters", {"id.eq": chapter["id"]}, {"title": "Edited"},
+                         if_updated_at=chapter["updated_at"])
+        assert e.value.code == "NETWORK_ERROR"
+        assert transport.sent == ["insert", "patch"] and sleeps == []
+
+    def test_non_retryable_error_surfaces_immediately(self, transport, sleeps, project_id):
+        client = self._client(transport)
+        with pytest.raises(AdminAPIError) as e:
+            client.insert("chapters", {"project_id": project_id, "no_such_column": 1})
+        assert not is_transient(e.value)
+        assert transport.sent == ["insert"] and sleeps == []
+
+
+class TestJournal:
+    """Writes queued on disk while admin-api is unreachable."""
+
+    @pytest.fixture
+    def transport(self, api):
+        return FlakyTransport(api)
+
+    def _client(self, transport, path):
+        journal = WriteJournal(path, fsync=False, retry_interval=60)
+        return AdminAPIClient("sqlite://", "secret", transport=transport,
+                              retry=RetryPolicy(max_retries=0), journal=journal)
+
+    def test_queued_writes_replay_in_order(self, transport, project_id, tmp_path):
+        client = self._client(transport, tmp_path / "journal.jsonl")
+        transport.down = True
+        row = client.insert("chapters", {"project_id": project_id, "chapter_number": 1})[0]
+        assert row["id"] and client.journal.pending() == 1
+        # Queued behind the insert, not sent
+        client.update("chapters", {"title": "Edited"}, {"id.eq": row["id"]})
+        assert client.journal.pending() == 2
+
+        transport.down = False
+        client.journal.replay()
+        assert client.journal.pending() == 0
+        assert client.select_single("chapters", {"id.eq": row["id"]})["title"] == "Edited"
+        assert (tmp_path / "journal.jsonl").stat().st_size == 0
+        client.journal.close()
+
+    def test_rejected_writes_are_reported_not_queued(self, transport, project_id, tmp_path):
+        client = self._client(transport, tmp_path / "journal.jsonl")
+        with pytest.raises(AdminAPIError):
+            client.insert("chapters", {"project_id": project_id, "no_such_column": 1})
+        assert client.journal.pending() == 0
+
+        transport.down = True
+        client.insert("chapters", {"project_id": project_id, "no_such_column": 1})
+        client.insert("chapters", {"project_id": project_id, "chapter_number": 2})
+        transport.down = False
+        client.journal.replay()
+        assert client.journal.stats()["rejected"] == 1
+        assert (tmp_path / "journal.rejected.jsonl").exists()
+        assert client.count("chapters") == 1
+        client.journal.close()
+
+    def test_recover_after_restart(self, transport, project_id, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        client = self._client(transport, path)
+        transport.down = True
+        client.insert("glossary", [{"project_id": project_id, "english_term": f"t{n}"} for n in range(3)])
+        client.journal.close()
+
+        transport.down = False
+        client = self._client(transport, path)
+        assert client.journal.pending() == 1
+        client.journal.recover()
+        assert client.count("glossary") == 3
+        assert not path.exists() or path.stat().st_size == 0
+        client.journal.close()
+
+    def test_later_write_waits_for_earlier_write_in_flight(self, tmp_path):
+        journal = WriteJournal(tmp_path / "journal.jsonl", fsync=False)
+        first = journal.append({"action": "insert", "table": "glossary", "data": {"id": "a"}})
+        # Another table doesn't wait
+        assert not journal.append({"action": "insert", "table": "tactics", "data": {"id": "t"}}).queued
+
+        entries = []
+        later = threading.Thread(target=lambda: entries.append(
+            journal.append({"action": "update", "table": "glossary", "data": {"x": 1}, "filters": {"id.eq": "a"}})
+        ))
+        later.start()
+        later.join(0.2)
+        assert later.is_alive()
+        # The first write failed transiently: the later one must not overtake it
+        journal.defer(first, RuntimeError("unreachable"))
+        later.join(5)
+        assert entries[0].queued and list(journal._waiting) == [first.seq, entries[0].seq]
+        journal.close()
+
+    def test_one_process_per_journal(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        journal = WriteJournal(path, fsync=False)
+        with pytest.raises(JournalLockedError):
+            WriteJournal(path, fsync=False)
+        journal.close()
+        WriteJournal(path, fsync=False).close()
+
+
+class TestLogBuffer:
+    """Write-behind buffer for the append-only log tables."""
+
+    @pytest.fixture
+    def transport(self, api):
+        return FlakyTransport(api)
+
+    @pytest.fixture
+    def buffer(self, transport, tmp_path):
+        client = AdminAPIClient("sqlite://", "secret", transport=transport, retry=RetryPolicy(max_retries=0))
+        buffer = LogBuffer(client, flush_interval=60, spill_path=tmp_path / "spill.jsonl")
+        yield buffer
+        buffer.close()
+
+    def _decision(self, project_id, text):
+        return {"project_id": project_id, "agent_name": "a", "decision": text}
+
+    def test_rows_are_written_on_flush(self, buffer, project_id):
+        rows = [buffer.append("decisions", self._decision(project_id, f"d{n}")) for n in range(3)]
+        assert rows[0]["id"] and rows[0]["created_at"].endswith("+00:00")
+        assert buffer.client.count("decisions") == 0
+        assert buffer.flush() == 3
+        assert sorted(r["id"] for r in buffer.client.select("decisions")) == sorted(r["id"] for r in rows)
+
+    def test_unreachable_rows_spill_and_replay_as_upserts(self, buffer, transport, project_id, tmp_path):
+        transport.down = True
+        rows = [buffer.append("decisions", self._decision(project_id, f"d{n}")) for n in range(2)]
+        assert buffer.flush() == 0
+        assert len((tmp_path / "spill.jsonl").read_text().splitlines()) == 2
+
+        transport.down = False
+        # One spilled insert landed after all; the replay must not duplicate it
+        buffer.client.insert("decisions", rows[0])
+        assert buffer.flush() == 2
+        assert buffer.client.count("decisions") == 2
+        assert not (tmp_path / "spill.jsonl").exists()
+        assert buffer.stats()["spilled"] == 2
+
+    def test_rejected_rows_are_quarantined(self, buffer, project_id, tmp_path):
+        for n in range(5):
+            buffer.append("decisions", self._decision(project_id, f"d{n}"))
+        buffer.append("decisions", {**self._decision(project_id, "bad"), "no_such_column": 1})
+        buffer.append("decisions", self._decision(project_id, "d5"))
+        # The batch is split until only the bad row is left out
+        assert buffer.flush() == 6
+        assert buffer.client.count("decisions") == 6
+        rejected = [json.loads(line) for line in (tmp_path / "spill.rejected.jsonl").read_text().splitlines()]
+        assert [entry["row"]["decision"] for entry in rejected] == ["bad"]
+        assert not (tmp_path / "spill.jsonl").exists()
+        assert buffer.stats()["rejected"] == 1
+
+
+class TestCodec:
+    """orjson fast path and stdlib fallback produce the same JSON."""
+
+    VALUE = {
+        "text": "Capítulo «uno» 😀", "n": 1, "x": 1.5, "none": None, 2: "int key",
+        "at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "id": uuid.UUID(int=1),
+        "rows": [{"id": "r1", "created_at": "2026-01-01", "note": None}],
+    }
+
+    @pytest.fixture(params=["stdlib", "orjson"])
+    def json_codec(self, request):
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+        return get_codec(request.param)
+
+    def test_compact_utf8_output(self, json_codec):
+        body = json_codec.encode(self.VALUE)
+        assert body == StdlibCodec().encode(self.VALUE)
+        assert "Capítulo «uno» 😀".encode() in body and b'"n":1,"x":1.5,"none":null,' in body
+        decoded = json_codec.decode(body)
+        assert decoded["text"] == self.VALUE["text"] and decoded["2"] == "int key"
+        assert decoded["at"] == "2026-01-02 03:04:05+00:00"
+        assert json_codec.decode(body.decode()) == decoded
+
+    def test_dumps_prunes(self, json_codec):
+        text = json_codec.dumps(self.VALUE["rows"], drop_nulls=True, drop_columns=BOOKKEEPING_COLUMNS)
+        assert text == '[{"id":"r1"}]'
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(codec_module, "orjson", None)
+        assert isinstance(get_codec("auto"), StdlibCodec)
+        with pytest.raises(ImportError):
+            get_codec("orjson")
+
+    def test_import_without_orjson(self):
+        # A fresh interpreter where importing orjson fails
+        script = (
+            "import sys; sys.modules['orjson'] = None; sys.path.insert(0, 'src'); "
+            "from backend.memory.codec import codec; print(codec.name, codec.encode({'a': 'é'}).decode())"
+        )
+        out = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).parent.parent,
+                             capture_output=True, text=True, check=True).stdout
+        assert out.split() == ["stdlib", '{"a":"é"}']
+
+
+class TestCompression:
+    """Request bodies gzipped at or above the threshold."""
+
+    def test_threshold(self):
+        compression = Compression(threshold=200)
+        small = {"action": "select", "table": "chapters"}
+        body, headers = compression.encode(small)
+        assert "Content-Encoding" not in headers and codec.decode(body) == small
+
+        large = {"action": "insert", "table": "chapters", "data": {"original_text": "word " * 1000}}
+        body, headers = compression.encode(large)
+        assert headers["Content-Encoding"] == "gzip" and codec.decode(gzip.decompress(body)) == large
+
+        stats = compression.stats()
+        assert stats.requests_compressed == 1 and stats.bytes_saved > 4000
+        body, headers = Compression(enabled=False).encode(large)
+        assert "Content-Encoding" not in headers
+
+    def test_round_trip_through_local_backend(self, api, project_id):
+        client = AdminAPIClient("sqlite://", "secret", transport=LocalTransport(api),
+                                retry=RetryPolicy(max_retries=0), compression=Compression(threshold=512))
+        text = "palabra " * 2000
+        chapter = client.insert("chapters", {"project_id": project_id, "chapter_number": 1, "original_text": text})[0]
+        assert client.select_single("chapters", {"id.eq": chapter["id"]})["original_text"] == text
+        stats = client.compression_stats()
+        assert stats.requests_compressed == 1
+        assert stats.request_wire_bytes < stats.request_raw_bytes
+
+
+class TestInsertMany:
+    """Chunked, parallel bulk inserts."""
+
+    def _terms(self, project_id, count):
+        return [{"project_id": project_id, "english_term": f"term {n}"} for n in range(count)]
+
+    def test_chunks_by_rows_and_bytes(self):
+        rows = [{"n": n, "text": "x" * 100} for n in range(10)]
+        assert [len(c) for _, c in ChunkPolicy(max_rows=4).chunks(rows)] == [4, 4, 2]
+        assert [start for start, _ in ChunkPolicy(max_bytes=250).chunks(rows)] == [0, 2, 4, 6, 8]
+        # A row over the byte limit still goes out, alone
+        assert [len(c) for _, c in ChunkPolicy(max_bytes=10).chunks(rows[:2])] == [1, 1]
+
+    def test_results_merged_in_order(self, client, project_id):
+        client.chunking = ChunkPolicy(max_rows=7, parallelism=3)
+        rows = client.insert_many("glossary", self._terms(project_id, 50))
+        assert [row["english_term"] for row in rows] == [f"term {n}" for n in range(50)]
+        assert client.count("glossary") == 50
+
+    def test_partial_failure_reports_landed_rows(self, client, project_id):
+        client.chunking = ChunkPolicy(max_rows=3)
+        chapters = [{"project_id": project_id, "chapter_number": n} for n in range(1, 10)]
+        chapters[4]["status"] = "bogus"
+        with pytest.raises(BulkInsertError) as e:
+            client.insert_many("chapters", chapters)
+        assert e.value.failed == [3, 4, 5]
+        assert [row["chapter_number"] for row in e.value.inserted] == [1, 2, 3, 7, 8, 9]
+        assert e.value.code == "DATABASE_ERROR"
+        assert client.count("chapters") == 6
+
+    def test_chunks_share_one_long_lived_pool(self, client, project_id):
+        client.chunking = ChunkPolicy(max_rows=5, parallelism=2)
+        client.insert_many("glossary", [{"project_id": project_id, "english_term": f"a{n}"} for n in range(20)])
+        pool = client._bulk_pool
+        client.insert_many("glossary", [{"project_id": project_id, "english_term": f"b{n}"} for n in range(20)])
+        assert client._bulk_pool is pool and len(pool._threads) <= 2
+        client.close()
+        assert client._bulk_pool is None
+
+
+class GatedTransport(LocalTransport):
+    """LocalTransport that holds the first select until released."""
+
+    def __init__(self, api):
+        super().__init__(api)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._held = False
+
+    def post(self, url, data=None, json=None, headers=None):
+        if b'"select"' in (data or b"") and not self._held:
+            self._held = True
+            self.started.set()
+            self.release.wait(5)
+        return super().post(url, data=data, json=json, headers=headers)
+
+
+class TestSingleFlight:
+    """Identical concurrent reads coalesced into one request."""
+
+    @pytest.fixture
+    def gated(self, api):
+        transport = GatedTransport(api)
+        client = AdminAPIClient("sqlite://", "secret", transport=transport, retry=RetryPolicy(max_retries=0))
+        return client, transport
+
+    def _read_in_thread(self, client, results):
+        thread = threading.Thread(target=lambda: results.append(client.select("glossary")))
+        thread.start()
+        return thread
+
+    def test_read_after_write_does_not_join_older_flight(self, gated, project_id):
+        client, transport = gated
+        before: list = []
+        thread = self._read_in_thread(client, before)
+        assert transport.started.wait(5)
+        client.insert("glossary", {"project_id": project_id, "english_term": "fresh"})
+        # The held read started before the write, so this one must not share it
+        assert [row["english_term"] for row in client.select("glossary")] == ["fresh"]
+        assert client.flight_stats().shared == 0
+        transport.release.set()
+        thread.join()
+
+    def test_leader_and_followers_get_their_own_copies(self, gated, project_id):
+        client, transport = gated
+        client.insert("glossary", {"project_id": project_id, "english_term": "term"})
+        results: list = []
+        leader = self._read_in_thread(client, results)
+        assert transport.started.wait(5)
+        follower = self._read_in_thread(client, results)
+        while client.flight_stats().shared == 0:
+            follower.join(0.01)
+        transport.release.set()
+        leader.join()
+        follower.join()
+        assert results[0] == results[1] and results[0] is not results[1]
+        assert results[0][0] is not results[1][0]
+
+
+class TestReadCache:
+    """Read-through cache with row-aware invalidation."""
+
+    @pytest.fixture
+    def cached(self, api):
+        transport = GatedTransport(api)
+        transport.release.set()
+        client = AdminAPIClient("sqlite://", "secret", transport=transport,
+                                retry=RetryPolicy(max_retries=0), cache=ReadCache(ttls={"glossary": 60}))
+        return client, transport
+
+    def _terms(self, client, term):
+        return [row["english_term"] for row in client.select("glossary", {"english_term.eq": term})]
+
+    def _insert_behind_cache(self, api, project_id, term):
+        """A write made elsewhere (another worker), which the cache can't see."""
+        api.execute({"action": "insert", "table": "glossary", "data": {"project_id": project_id, "english_term": term}})
+
+    def test_writes_invalidate_only_matching_reads(self, cached, api, project_id):
+        client, _ = cached
+        assert self._terms(client, "a") == [] and self._terms(client, "b") == []
+        self._insert_behind_cache(api, project_id, "b")
+        client.insert("glossary", {"project_id": project_id, "english_term": "a"})
+        assert self._terms(client, "a") == ["a"]
+        # The insert can't match english_term = "b", so that read stays cached
+        assert self._terms(client, "b") == []
+        assert client.cache_stats().invalidations == 1
+
+    def test_entries_expire_after_ttl(self, cached, api, project_id, monkeypatch):
+        client, _ = cached
+        now = [1000.0]
+        monkeypatch.setattr("backend.memory.cache.time.monotonic", lambda: now[0])
+        assert self._terms(client, "a") == []
+        self._insert_behind_cache(api, project_id, "a")
+        now[0] += 59
+        assert self._terms(client, "a") == []
+        now[0] += 2
+        assert self._terms(client, "a") == ["a"]
+
+    def test_read_racing_a_write_is_not_cached(self, cached, project_id):
+        client, transport = cached
+        transport.release.clear()
+        results: list = []
+        reader = threading.Thread(target=lambda: results.append(self._terms(client, "a")))
+        reader.start()
+        assert transport.started.wait(5)
+        client.insert("glossary", {"project_id": project_id, "english_term": "a"})
+        transport.release.set()
+        reader.join()
+        # The read may have run before or after the write, so it isn't kept
+        assert client.cache_stats().entries == 0
+        assert self._terms(client, "a") == ["a"]
+
+
+class TestMetrics:
+    """Per-(action, table) instrumentation recorded by the client."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_metrics(self):
+        metrics.reset()
+
+    def _operation(self, action, table):
+        for op in metrics.snapshot()["operations"]:
+            if (op["action"], op["table"]) == (action, table):
+                return op
+        return None
+
+    def test_latency_bytes_and_errors(self, client, project_id):
+        client.insert("chapters", {"project_id": project_id, "chapter_number": 1})
+        client.select("chapters", {"project_id.eq": project_id})
+        with pytest.raises(AdminAPIError):
+            client.select("chapters", {"no_such_column.eq": 1})
+
+        select = self._operation("select", "chapters")
+        assert select["latency"]["count"] == 2
+        assert select["request_bytes"] > 0 and select["response_bytes"] > 0
+        assert select["errors"] == {"DATABASE_ERROR": 1}
+        assert select["in_flight"] == 0
+        assert self._operation("insert", "chapters")["attempts"] == 1
+        assert 'bookmaker_memory_errors_total{action="select",table="chapters",code="DATABASE_ERROR"} 1' \
+            in metrics.to_prometheus()
+
+    def test_cache_hits_and_attribution(self, api, project_id):
+        client = AdminAPIClient(
+            "sqlite://", "secret",
+            transport=LocalTransport(api),
+            retry=RetryPolicy(max_retries=0),
+            cache=ReadCache(),
+        )
+        with attribute_to(agent="glossary_builder", chapter_id="c1") as io:
+            client.select("glossary", {"project_id.eq": project_id})
+            client.select("glossary", {"project_id.eq": project_id})
+        client.count("chapters")
+
+        assert self._operation("select", "glossary")["sources"] == {"api": 1, "cache": 1}
+        assert io.requests == 2 and io.seconds > 0
+        snapshot = metrics.snapshot()
+        assert {a["agent"]: a["requests"] for a in snapshot["by_agent"]} == {"glossary_builder": 2, None: 1}
+        assert [(c["agent"], c["chapter_id"], c["requests"]) for c in snapshot["by_chapter"]] == \
+            [("glossary_builder", "c1", 2)]
+        assert 'bookmaker_memory_agent_seconds_total{agent="glossary_builder"}' in metrics.to_prometheus()
+
+    def test_chapter_totals_are_bounded(self, client, monkeypatch):
+        registry = MemoryMetrics(max_chapters=3)
+        monkeypatch.setattr("backend.memory.client.metrics", registry)
+        for n in range(10):
+            with attribute_to(agent="writer", chapter_id=f"c{n}"):
+                client.count("chapters")
+        snapshot = registry.snapshot()
+        assert [c["chapter_id"] for c in snapshot["by_chapter"]] == ["c7", "c8", "c9"]
+        assert [(a["agent"], a["requests"]) for a in snapshot["by_agent"]] == [("writer", 10)]
+        assert "chapter_id" not in registry.to_prometheus()
+
+
+class TestHTTPServer:
+    """The stand-in served over HTTP, as a drop-in ADMIN_API_URL."""
+
+    def test_auth_and_compressed_round_trip(self, api, project_id):
+        api.secret = "secret"
+        server = make_server(api, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/"
+        try:
+            client = AdminAPIClient(url, "secret", retry=RetryPolicy(max_retries=0))
+            text = "word " * 2000
+            chapter = client.insert("chapters", {"project_id": project_id, "chapter_number": 1, "original_text": text})[0]
+            assert client.select_single("chapters", {"id.eq": chapter["id"]})["original_text"] == text
+            stats = client.compression_stats()
+            assert stats.requests_compressed == 1 and stats.responses_compressed >= 1
+
+            with pytest.raises(AdminAPIError) as e:
+                AdminAPIClient(url, "wrong", retry=RetryPolicy(max_retries=0)).select("chapters")
+            assert e.value.code == "UNAUTHORIZED"
+            assert e.value.status == 401
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_worker_threads_share_pooled_connections(self, api, project_id):
+        server = make_server(api, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = AdminAPIClient(
+                f"http://127.0.0.1:{server.server_port}/", "secret", retry=RetryPolicy(max_retries=0)
+            )
+            for _ in range(20):
+                # A new short-lived thread per call, like a per-turn worker pool
+                thread = threading.Thread(target=client.select, args=("chapters",))
+                thread.start()
+                thread.join()
+            stats = client.transport_stats()
+            assert stats.sessions == 1 and stats.requests == 20
+            assert stats.connections_opened == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_async_client_closes_each_loops_pool(self, api, project_id):
+        server = make_server(api, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = AsyncAdminAPIClient(
+                f"http://127.0.0.1:{server.server_port}/", "secret", retry=RetryPolicy(max_retries=0)
+            )
+            pools = []
+
+            async def count():
+                pools.append(client._client())
+                return await client.count("chapters")
+
+            # Each asyncio.run is a new loop; its pool is closed as it shuts down
+            assert asyncio.run(count()) == 0 and asyncio.run(count()) == 0
+            assert pools[0] is not pools[1] and all(pool.is_closed for pool in pools)
+            assert client._clients == {}
+
+            async def count_and_close():
+                await count()
+                await client.aclose()
+            asyncio.run(count_and_close())
+            assert pools[2].is_closed and client._clients == {}
+        finally:
+            server.shutdown()
+            server.server_close()
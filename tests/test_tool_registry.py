@@ -0,0 +1,237 @@
+"""
+Tool registry tests: schema validation and dispatch, no database needed.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from backend.agents import memory_tools
+from backend.agents.memory_tools import MEMORY_TOOLS, execute_tool, execute_tools, registry, tool_session
+from backend.agents.result_budget import MAX_SPILLED_RESULTS, ResultBudget, estimate_tokens
+from backend.agents.tool_registry import ToolRegistry, compile_schema, row, tables
+
+
+def problems(schema, value):
+    found = []
+    compile_schema(schema)(value, "", found)
+    return found
+
+
+class TestCompileSchema:
+
+    SCHEMA = {
+        "type": "object",
+        "properties": {
+            "project_id": {"type": "string"},
+            "limit": {"type": "integer"},
+            "parts": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+        },
+        "required": ["project_id"],
+    }
+
+    def test_valid_input(self):
+        assert problems(self.SCHEMA, {"project_id": "p", "limit": 3, "parts": ["a"], "extra": 1}) == []
+
+    def test_reports_every_problem_with_its_path(self):
+        assert problems(self.SCHEMA, {"limit": True, "parts": ["a", "c", 1]}) == [
+            "project_id: required",
+            "limit: expected integer, got boolean",
+            "parts[1]: must be one of 'a', 'b'",
+            "parts[2]: expected string, got integer",
+        ]
+        assert problems(self.SCHEMA, "p") == ["input: expected object, got string"]
+
+    def test_additional_properties(self):
+        schema = {"type": "object", "properties": {}, "additionalProperties": False}
+        assert problems(schema, {"x": 1}) == ["x: unexpected property"]
+
+    def test_unsupported_keyword_fails_at_compile_time(self):
+        with pytest.raises(ValueError):
+            compile_schema({"type": "string", "pattern": "^a"})
+
+
+class TestRegistry:
+
+    def test_every_memory_tool_has_a_handler(self):
+        assert registry.names() == [tool["name"] for tool in MEMORY_TOOLS]
+
+    def test_invalid_input_is_reported_before_dispatch(self):
+        result = json.loads(execute_tool("memory_write_tactic", {"project_id": "p", "tactic": []}))
+        assert result["problems"] == ["chapter_id: required", "tactic: expected object, got array"]
+        assert "Unknown tool" in json.loads(execute_tool("memory_nope", {}))["error"]
+
+    def test_decorator_defines_new_tools(self):
+        definitions = []
+        tools = ToolRegistry(definitions)
+
+        @tools.tool("echo", "Echo a value.", {
+            "type": "object", "properties": {"value": {"type": "string"}}, "required": ["value"]
+        })
+        def echo(value):
+            return value
+
+        assert definitions[0]["name"] == "echo"
+        # Undeclared properties aren't passed to the handler
+        assert tools.get("echo")({"value": "hi", "other": 1}) == "hi"
+        with pytest.raises(ValueError):
+            tools.tool("missing")(echo)
+
+
+class TestConcurrentCalls:
+
+    SCHEMA = {"type": "object", "properties": {"id": {"type": "string"}, "value": {"type": "integer"}}}
+
+    def test_dependencies_order_conflicting_writes_only(self):
+        calls = [
+            ("memory_read_chapter", {"chapter_id": "c1"}),
+            ("memory_write_chapter", {"chapter_id": "c1", "data": {}}),
+            ("memory_write_chapter", {"chapter_id": "c2", "data": {}}),
+            ("memory_read_chapters", {"project_id": "p"}),
+            ("memory_read_glossary", {"project_id": "p"}),
+            ("memory_write_tactic", {"project_id": "p", "chapter_id": "c1", "tactic": {}}),
+            ("memory_write_tactics_batch", {"tactics": []}),
+            ("memory_read_chapter", {"chapter_id": "c1"}),
+        ]
+        assert registry.dependencies(calls) == [[], [0], [], [1, 2], [], [], [5], [1]]
+
+    def test_tools_without_touches_are_ordered_against_everything(self):
+        tools = ToolRegistry([])
+        for name in ("read", "other"):
+            tools.tool(name, "", self.SCHEMA, touches=tables(name))(lambda id=None: "")
+        tools.tool("legacy", "", self.SCHEMA)(lambda id=None: "")
+        calls = [("read", {}), ("legacy", {}), ("other", {}), ("unknown", {})]
+        assert tools.dependencies(calls) == [[], [0], [1], []]
+
+    def test_execute_tools_runs_reads_in_parallel_and_keeps_write_order(self, monkeypatch):
+        tools = ToolRegistry([])
+        events = []
+        lock = threading.Lock()
+        both_reading = threading.Barrier(2, timeout=5)
+
+        @tools.tool("read", "", self.SCHEMA, touches=row("rows", "id"))
+        def read(id):
+            # Only passes if the two reads run at the same time
+            both_reading.wait()
+            return f"read {id}"
+
+        @tools.tool("write", "", self.SCHEMA, touches=row("rows", "id"), writes=True)
+        def write(id, value):
+            # The first write is slower, and must still land first
+            time.sleep(0.05 if value == 1 else 0)
+            with lock:
+                events.append(value)
+            return f"wrote {id}={value}"
+
+        monkeypatch.setattr(memory_tools, "registry", tools)
+        calls = [
+            ("write", {"id": "a", "value": 1}),
+            ("read", {"id": "x"}),
+            ("read", {"id": "y"}),
+            ("write", {"id": "a", "value": 2}),
+        ]
+        assert execute_tools(calls, max_workers=4) == ["wrote a=1", "read x", "read y", "wrote a=2"]
+        assert events == [1, 2]
+
+    def test_turns_share_one_long_lived_pool(self, monkeypatch):
+        tools = ToolRegistry([])
+        threads = set()
+
+        @tools.tool("read", "", self.SCHEMA, touches=row("rows", "id"))
+        def read(id):
+            threads.add(threading.current_thread())
+            return id
+
+        monkeypatch.setattr(memory_tools, "registry", tools)
+        for _ in range(10):
+            assert execute_tools([("read", {"id": "a"}), ("read", {"id": "b"})], max_workers=3) == ["a", "b"]
+        assert len(threads) <= 3
+
+
+class TestResultBudget:
+
+    def test_results_within_budget_are_unchanged(self):
+        result = json.dumps({"chapters": [{"id": "c1"}]})
+        assert ResultBudget(100).fit(result) == result
+
+    def test_list_results_are_paged_by_item(self):
+        budget = ResultBudget(1000)
+        items = [{"id": i, "text": "x" * 100} for i in range(100)]
+        page = json.loads(budget.fit(json.dumps({"chapters": items, "count": 100})))
+        assert estimate_tokens(json.dumps(page)) <= 1000
+        assert page["count"] == 100
+
+        seen = page["chapters"]
+        while "next_offset" in page["continuation"]:
+            page = budget.expand(page["continuation"]["result_id"], page["continuation"]["next_offset"])
+            seen += page["chapters"]
+        assert seen == items and budget.truncated == 1
+
+    def _pages(self, budget, result):
+        page = json.loads(budget.fit(result))
+        pages = [page]
+        while "next_offset" in page["continuation"]:
+            page = budget.expand(page["continuation"]["result_id"], page["continuation"]["next_offset"])
+            pages.append(page)
+        return pages
+
+    def test_objects_are_cut_between_fields(self):
+        budget = ResultBudget(500)
+        chapter = {"id": "c1", "title": "One", "original_text": "line \"quoted\"\n" * 500, "outline": {"beats": ["a"] * 400}}
+        pages = self._pages(budget, json.dumps(chapter))
+        assert pages[0]["field_tokens"]["original_text"] > 1000
+        assert all(len(json.dumps(page)) <= 500 * 3 for page in pages)
+
+        fields: dict = {}
+        for page in pages:
+            for name, value in page.items():
+                if name not in ("continuation", "field_parts", "field_tokens"):
+                    fields[name] = fields.get(name, "") + value if name in page.get("field_parts", {}) else value
+        assert pages[0]["field_parts"]["original_text"]["part"] == 1
+        assert any(page.get("field_parts", {}).get("outline", {}).get("json_text") for page in pages)
+        fields["outline"] = json.loads(fields["outline"])
+        assert fields == chapter
+
+    def test_oversized_item_keeps_fitting_fields(self):
+        budget = ResultBudget(300)
+        items = [{"id": "c1", "text": "x" * 5000}, {"id": "c2", "text": "y"}]
+        page = json.loads(budget.fit(json.dumps({"chapters": items})))
+        assert page["chapters"] == [{"id": "c1"}] and "text" in page["omitted_fields"]
+        assert budget.expand(page["continuation"]["result_id"], 1)["chapters"] == [items[1]]
+
+    def test_plain_text_is_cut_by_characters(self):
+        budget = ResultBudget(300)
+        text = "z" * 5000
+        assert "".join(page["partial"] for page in self._pages(budget, text)) == text
+
+    def test_evicted_results_report_an_error(self):
+        budget = ResultBudget(300)
+        handles = [json.loads(budget.fit(json.dumps({"rows": list(range(2000))})))["continuation"]
+                   for _ in range(MAX_SPILLED_RESULTS + 1)]
+        assert "error" in budget.expand(handles[0]["result_id"], handles[0]["next_offset"])
+        assert "rows" in budget.expand(handles[-1]["result_id"], handles[-1]["next_offset"])
+
+    def test_read_result_tool(self, monkeypatch):
+        tools = ToolRegistry([])
+
+        @tools.tool("big", "", {"type": "object", "properties": {}})
+        def big():
+            return json.dumps({"rows": list(range(2000))})
+
+        read_result = registry.get("memory_read_result")
+        tools.tool(read_result.name, "", read_result.definition["input_schema"])(read_result.handler)
+        monkeypatch.setattr(memory_tools, "registry", tools)
+        with tool_session(result_tokens=300) as budget:
+            page = json.loads(execute_tool("big", {}))
+            more = json.loads(execute_tool("memory_read_result", {
+                "result_id": page["continuation"]["result_id"], "offset": page["continuation"]["next_offset"]
+            }))
+        assert more["rows"][0] == page["continuation"]["next_offset"]
+        assert budget.truncated == 1